@@ -0,0 +1,52 @@
+"""File search indexes
+
+Revision ID: 3f6b2d8e1a47
+Revises: e9c1f3b7a265
+Create Date: 2026-10-19 17:05:12.630951
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6b2d8e1a47"
+down_revision: Union[str, None] = "e9c1f3b7a265"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_file_meta_created_at_id", "file_meta", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_file_meta_format",
+        "file_meta",
+        ["format"],
+        unique=False,
+        postgresql_ops={"format": "varchar_pattern_ops"},
+    )
+    op.create_index("ix_file_meta_size", "file_meta", ["size"], unique=False)
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_file_meta_title_trgm",
+            "file_meta",
+            [sa.text("lower(title) gin_trgm_ops")],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == "postgresql":
+        op.drop_index("ix_file_meta_title_trgm", table_name="file_meta")
+    op.drop_index("ix_file_meta_size", table_name="file_meta")
+    op.drop_index("ix_file_meta_format", table_name="file_meta")
+    op.drop_index("ix_file_meta_created_at_id", table_name="file_meta")
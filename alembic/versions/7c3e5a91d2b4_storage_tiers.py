@@ -0,0 +1,49 @@
+"""Storage tiers and access tracking
+
+Revision ID: 7c3e5a91d2b4
+Revises: 441b8c25ef72
+Create Date: 2026-10-19 10:12:31.208113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e5a91d2b4"
+down_revision: Union[str, None] = "441b8c25ef72"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "file_meta",
+        sa.Column("tier", sa.String(length=16), server_default="hot", nullable=False),
+    )
+    op.add_column(
+        "file_meta",
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "file_meta",
+        sa.Column("read_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_index(
+        "ix_file_meta_tier_last_accessed_at",
+        "file_meta",
+        ["tier", "last_accessed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_file_meta_tier_last_accessed_at", table_name="file_meta")
+    op.drop_column("file_meta", "read_count")
+    op.drop_column("file_meta", "last_accessed_at")
+    op.drop_column("file_meta", "tier")
@@ -0,0 +1,40 @@
+"""File tags
+
+Revision ID: a4d8c2e6f931
+Revises: 3f6b2d8e1a47
+Create Date: 2026-10-19 18:31:44.092517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d8c2e6f931"
+down_revision: Union[str, None] = "3f6b2d8e1a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "file_tag",
+        sa.Column("file_id", sa.UUID(), nullable=False),
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("value", sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(["file_id"], ["file_meta.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("file_id", "key"),
+    )
+    op.create_index(
+        "ix_file_tag_key_value", "file_tag", ["key", "value", "file_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_file_tag_key_value", table_name="file_tag")
+    op.drop_table("file_tag")
@@ -0,0 +1,36 @@
+"""File checksums
+
+Revision ID: b18f4e6c09a3
+Revises: 7c3e5a91d2b4
+Create Date: 2026-10-19 11:02:47.553019
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b18f4e6c09a3"
+down_revision: Union[str, None] = "7c3e5a91d2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "file_meta",
+        sa.Column("checksum_algorithm", sa.String(length=16), nullable=True),
+    )
+    op.add_column(
+        "file_meta", sa.Column("checksum", sa.String(length=128), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("file_meta", "checksum")
+    op.drop_column("file_meta", "checksum_algorithm")
@@ -0,0 +1,48 @@
+"""File expiry
+
+Revision ID: c5e7a9b3d182
+Revises: a4d8c2e6f931
+Create Date: 2026-10-19 19:14:27.518304
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e7a9b3d182"
+down_revision: Union[str, None] = "a4d8c2e6f931"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "file_meta",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_file_meta_expires_at",
+        "file_meta",
+        ["expires_at"],
+        unique=False,
+        postgresql_where=sa.text("expires_at IS NOT NULL AND is_deleted IS false"),
+        sqlite_where=sa.text("expires_at IS NOT NULL AND is_deleted = 0"),
+    )
+    op.create_index(
+        "ix_file_meta_owner_id_created_at",
+        "file_meta",
+        ["owner_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_file_meta_owner_id_created_at", table_name="file_meta")
+    op.drop_index("ix_file_meta_expires_at", table_name="file_meta")
+    op.drop_column("file_meta", "expires_at")
@@ -0,0 +1,59 @@
+"""Optional partitioning of file_meta
+
+Revision ID: d7f1b4c8e2a9
+Revises: c5e7a9b3d182
+Create Date: 2026-10-19 19:42:08.214675
+
+PostgreSQL only, and only when asked for:
+
+    alembic -x partition=hash -x partitions=16 upgrade head
+    alembic -x partition=range -x months_ahead=3 upgrade head
+
+`hash` partitions by `owner_id`, `range` by month of `created_at`. The
+table is rebuilt and its rows copied, so run it in a maintenance window.
+Without `-x partition` the revision changes nothing; to partition later,
+downgrade to the previous revision and upgrade again with the option.
+Set `partitioning.scheme` in the config to the chosen scheme.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+from src.core.partitioning import (
+    HASH,
+    RANGE,
+    is_partitioned,
+    partition_file_meta,
+    unpartition_file_meta,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "d7f1b4c8e2a9"
+down_revision: Union[str, None] = "c5e7a9b3d182"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    options = context.get_x_argument(as_dictionary=True)
+    scheme = options.get("partition")
+    if scheme is None or op.get_context().dialect.name != "postgresql":
+        return
+    if scheme not in (HASH, RANGE):
+        raise ValueError(f"Unknown partition scheme {scheme!r}, use hash or range")
+    partition_file_meta(
+        op.get_bind(),
+        scheme,
+        partitions=int(options.get("partitions", 16)),
+        months_ahead=int(options.get("months_ahead", 3)),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    if is_partitioned(op.get_bind()):
+        unpartition_file_meta(op.get_bind())
@@ -0,0 +1,35 @@
+"""Reconciliation checkpoint
+
+Revision ID: e9c1f3b7a265
+Revises: 5d2a7e0c4f18
+Create Date: 2026-10-19 15:47:31.402716
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e9c1f3b7a265"
+down_revision: Union[str, None] = "5d2a7e0c4f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "reconciliation_checkpoint",
+        sa.Column("location", sa.String(length=64), nullable=False),
+        sa.Column("last_key", sa.String(length=255), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("location"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("reconciliation_checkpoint")
@@ -0,0 +1,137 @@
+"""
+Worker throughput of the file deletion task, in tasks per second.
+
+    CONFIG_FILE=configs/config.yaml python -m benchmarks.celery_tasks_bench
+    python -m benchmarks.celery_tasks_bench --tasks 1000 --latency 0.01
+
+`before` runs every task the way the worker used to: `async_to_sync` spins
+up an event loop and a fresh aioboto3 client is created per task. `after`
+submits tasks one by one to the process-wide `WorkerRuntime` loop, where
+the storage and the engine are opened once. `batch` hands all ids to
+`delete_files_from_s3`, which runs the deletes concurrently on that loop.
+
+Objects live in the in-memory S3 stand-in answering after `--latency`
+seconds, metadata in a temporary SQLite database. The configured database
+and S3 endpoint are never contacted.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+from asgiref.sync import async_to_sync
+
+from src.celery.runtime import WorkerRuntime
+from src.celery.tasks import delete_file_from_s3, delete_files_from_s3
+from src.core import database
+from src.core import storage as process_storage
+from src.core.config import S3Config
+from src.core.s3 import create_s3_client
+from src.entities import Base
+from src.entities.file_meta import FileMetaEntity
+from src.storage.s3 import S3Storage
+from tests.s3_stub import InMemoryS3Client
+
+BUCKET = "bench"
+# Never contacted: only the client construction cost is measured
+_S3_CONFIG = S3Config(
+    path="http://127.0.0.1:9",
+    region_name="us-east-1",
+    access_key_id="bench",
+    secret_access_key="bench",
+    bucket_name=BUCKET,
+)
+
+
+async def create_schema() -> None:
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed(client: InMemoryS3Client, count: int) -> list[UUID]:
+    ids = []
+    async for db in database.get_db():
+        for _ in range(count):
+            obj = FileMetaEntity(
+                id=uuid4(),
+                internal_id=uuid4().hex,
+                title="bench.bin",
+                size=1,
+                is_deleted=True,
+            )
+            db.add(obj)
+            client.put(BUCKET, obj.internal_id, b"x")
+            ids.append(obj.id)
+        await db.commit()
+    return ids
+
+
+@asynccontextmanager
+async def fresh_storage(client: InMemoryS3Client) -> AsyncIterator[None]:
+    async with create_s3_client(_S3_CONFIG):
+        process_storage.storage = S3Storage(client, BUCKET)
+        yield
+
+
+async def delete_with_fresh_storage(client: InMemoryS3Client, file_id: UUID) -> None:
+    async with fresh_storage(client):
+        await delete_file_from_s3(file_id)
+
+
+async def use_storage(client: InMemoryS3Client) -> None:
+    process_storage.storage = S3Storage(client, BUCKET)
+
+
+def bench(mode: str, client: InMemoryS3Client, count: int) -> float:
+    runtime = WorkerRuntime()
+    ids = runtime.run(seed(client, count))
+
+    started = time.perf_counter()
+    if mode == "before":
+        for file_id in ids:
+            async_to_sync(delete_with_fresh_storage)(client, file_id)
+    elif mode == "after":
+        runtime.run(use_storage(client))
+        for file_id in ids:
+            runtime.run(delete_file_from_s3(file_id))
+    else:
+        runtime.run(use_storage(client))
+        runtime.run(delete_files_from_s3(ids))
+    elapsed = time.perf_counter() - started
+
+    if client.objects:
+        raise RuntimeError(f"{mode}: {len(client.objects)} objects left")
+    return count / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--mode", action="append", choices=["before", "after", "batch"], default=None
+    )
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.005, help="S3 call, s")
+    args = parser.parse_args()
+
+    runtime = WorkerRuntime()
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        runtime.run(database.init_engine(uri))
+        runtime.run(create_schema())
+
+        print(f"{'mode':<8}{'tasks/s':>12}")
+        for mode in args.mode or ["before", "after", "batch"]:
+            client = InMemoryS3Client(latency=args.latency)
+            print(f"{mode:<8}{bench(mode, client, args.tasks):>12.1f}")
+
+        runtime.run(database.close_engine())
+        runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
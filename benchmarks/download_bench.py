@@ -0,0 +1,63 @@
+"""
+Download throughput of a single stream against parallel ranged reads.
+
+    python -m benchmarks.download_bench
+    python -m benchmarks.download_bench --size 256 --bandwidth 50 --window 8
+
+Objects live in the in-memory S3 stand-in, which answers every call after
+`--latency` seconds and streams each body at `--bandwidth` MB/s, like a
+single connection to S3. `single` reads the object with one `get_object`;
+the other rows use `read_ahead` with `--part-size` MB parts and the given
+windows, as `FileService.get` does for large files.
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.storage import StorageBackend
+from src.storage.s3 import S3Storage
+from tests.s3_stub import InMemoryS3Client
+
+MB = 1024 * 1024
+KEY = "download-bench.bin"
+
+
+async def download(storage: StorageBackend, size: int, part_size: int, window: int):
+    if window <= 1:
+        chunks = storage.read(KEY)
+    else:
+        chunks = storage.read_ahead(KEY, size, part_size, window)
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+    if received != size:
+        raise RuntimeError(f"received {received} of {size} bytes")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=128, help="object size, MB")
+    parser.add_argument("--part-size", type=int, default=8, help="range size, MB")
+    parser.add_argument("--window", type=int, action="append", default=None)
+    parser.add_argument("--latency", type=float, default=0.02, help="per call, s")
+    parser.add_argument("--bandwidth", type=float, default=100, help="per stream, MB/s")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    client = InMemoryS3Client(latency=args.latency, bandwidth=args.bandwidth * MB)
+    client.put("bench", KEY, bytes(args.size * MB))
+    storage = S3Storage(client, "bench", chunk_size=MB)
+
+    print(f"{'mode':<12}{'MB/s':>10}{'s':>10}")
+    for window in [1, *(args.window or [2, 4, 8, 16])]:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            await download(storage, args.size * MB, args.part_size * MB, window)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        mode = "single" if window <= 1 else f"window {window}"
+        print(f"{mode:<12}{args.size / elapsed:>10.1f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
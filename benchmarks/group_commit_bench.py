@@ -0,0 +1,92 @@
+"""
+File record inserts per second with and without group commit, as the
+number of concurrent uploads grows.
+
+    python -m benchmarks.group_commit_bench
+    python -m benchmarks.group_commit_bench --uri postgresql+asyncpg://.../scratch_db --records 20000
+
+Each of `--concurrency` clients creates file records one after another,
+like uploads finishing, until `--records` are created. `single` commits
+every record in its own transaction with `FileMetaRepository.create`;
+`group` submits them to `GroupCommitter`, which inserts the records that
+arrive within `--window` ms with one statement and one commit. Tables are
+created in the given database (a temporary SQLite file by default), so
+point `--uri` at a scratch database only.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import database
+from src.entities import Base
+from src.repositories.file_meta import FileMetaRepository
+from src.services.group_commit import GroupCommitter
+
+
+async def create_tables(uri: str) -> None:
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+async def create_single(i: int) -> None:
+    async for db in database.get_db():
+        await FileMetaRepository.create(db, uuid4().hex, uuid4(), f"{i}.txt", size=i)
+
+
+async def create_grouped(i: int) -> None:
+    await GroupCommitter().create(
+        internal_id=uuid4().hex, owner_id=uuid4(), title=f"{i}.txt", size=i
+    )
+
+
+async def run(mode: str, records: int, concurrency: int) -> float:
+    create = create_grouped if mode == "group" else create_single
+    counter = iter(range(records))
+
+    async def client() -> None:
+        for i in counter:
+            await create(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return records / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default=None, help="scratch database URI")
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, action="append", default=None)
+    parser.add_argument("--window", type=float, default=5, help="group window, ms")
+    parser.add_argument("--max-batch", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = args.uri or f"sqlite+aiosqlite:///{os.path.join(tmp, 'group.db')}"
+        await create_tables(uri)
+        await database.init_engine(uri)
+        print(f"{'clients':>8}{'single/s':>12}{'group/s':>12}{'speedup':>10}")
+        for concurrency in args.concurrency or [1, 8, 32, 128, 512]:
+            single = await run("single", args.records, concurrency)
+            GroupCommitter().start(args.window / 1000, args.max_batch)
+            group = await run("group", args.records, concurrency)
+            await GroupCommitter().stop()
+            print(
+                f"{concurrency:>8}{single:>12.0f}{group:>12.0f}{group / single:>10.1f}"
+            )
+        await database.close_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Cold start cost of the API and worker processes, from `python -X importtime`.
+
+    CONFIG_FILE=configs/config.yaml python -m benchmarks.import_bench
+    python -m benchmarks.import_bench --target api --top 20 --max-ms 800
+
+Each target is imported in a fresh interpreter `--repeat` times and the
+fastest run is reported: the total import time, without the interpreter's
+own startup imports, and the packages taking most of it. Modules a process
+must not load, like FastAPI in the worker, are reported as well; with
+`--max-ms` the run fails when a target is slower or loads such a module,
+so it can guard startup time in CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+TARGETS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "api": ("src.api.server", ("celery", "celery.worker")),
+    "worker": ("src.celery.app, src.celery.tasks", ("fastapi", "starlette")),
+    "runner": ("src.api.run", ("fastapi", "celery")),
+}
+
+
+@dataclass
+class ImportReport:
+    total_ms: float = 0.0
+    packages_ms: dict[str, float] = field(default_factory=dict)
+    modules: set[str] = field(default_factory=set)
+
+
+def import_time(statement: str) -> ImportReport:
+    """Run the statement with `-X importtime` and parse its report."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ,
+    ).stderr
+    report = ImportReport()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        module = name.strip()
+        report.modules.add(module)
+        package = module.split(".")[0]
+        report.packages_ms[package] = (
+            report.packages_ms.get(package, 0.0) + int(self_us) / 1000
+        )
+        if not name[1:].startswith(" "):
+            report.total_ms += int(cumulative_us) / 1000
+    return report
+
+
+def measure(statement: str, repeat: int) -> ImportReport:
+    startup = import_time("pass")
+    best: ImportReport | None = None
+    for _ in range(repeat):
+        report = import_time(statement)
+        report.total_ms -= startup.total_ms
+        for package, ms in startup.packages_ms.items():
+            report.packages_ms[package] = report.packages_ms.get(package, 0.0) - ms
+        if best is None or report.total_ms < best.total_ms:
+            best = report
+    assert best is not None
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", action="append", choices=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages listed")
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    failed = False
+    for target in args.target or list(TARGETS):
+        statement, forbidden = TARGETS[target]
+        report = measure(f"import {statement}", args.repeat)
+        loaded = sorted(set(forbidden) & report.modules)
+
+        print(f"{target}: import {statement}")
+        print(f"  total {report.total_ms:.1f} ms")
+        heaviest = sorted(report.packages_ms.items(), key=lambda item: -item[1])
+        for package, ms in heaviest[: args.top]:
+            print(f"  {package:<24}{ms:>10.1f} ms")
+        if loaded:
+            print(f"  must not load: {', '.join(loaded)}")
+
+        if args.max_ms is not None and (report.total_ms > args.max_ms or loaded):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
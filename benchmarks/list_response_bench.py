@@ -0,0 +1,161 @@
+"""
+Latency of the file list and info endpoints, serialization included.
+
+    CONFIG_FILE=configs/config.yaml python -m benchmarks.list_response_bench
+    python -m benchmarks.list_response_bench --page 1000 --page 100 --repeat 50
+
+`before` is the way the endpoints used to answer: ORM entities are validated
+into `FileResponse` models through `response_model` and encoded by the
+default JSON response. `after` are the current endpoints, which select only
+the response columns as rows and write them with orjson. Both apps are
+called in process through an ASGI transport, against a temporary SQLite
+database; the configured database is never contacted.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from fastapi import Depends, FastAPI, Query
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+
+from src.api.routes.v1.file import router
+from src.api.schemas.v1.file import FileListFilters, FileResponse, FilesListResponse
+from src.core import database
+from src.core.database import AsyncSession, get_db
+from src.entities import Base
+from src.entities.file_meta import FileMetaEntity
+from src.entities.file_tag import FileTagEntity
+from src.services.file import FileService
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/", response_model=FilesListResponse)
+    async def get_files_list(
+        db: AsyncSession = Depends(get_db), filters: FileListFilters = Query()
+    ) -> FilesListResponse:
+        files, count = await FileService().get_list(
+            db,
+            limit=filters.limit,
+            offset=filters.offset,
+            owner_id=filters.owner_id,
+            show_deleted=filters.show_deleted,
+        )
+        return FilesListResponse(
+            data=files,  # type:ignore[arg-type]
+            limit=filters.limit,
+            offset=filters.offset,
+            count=count,
+        )
+
+    @app.get("/{file_id}/info", response_model=FileResponse)
+    async def get_file_info_by_id(
+        file_id: UUID, db: AsyncSession = Depends(get_db)
+    ) -> FileResponse:
+        obj = await FileService().get_info(db, file_id)
+        return FileResponse.model_validate(obj)
+
+    return app
+
+
+def make_after_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def fill(rows: int) -> list[UUID]:
+    async with database.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rnd = random.Random(42)
+    ids = [uuid4() for _ in range(rows)]
+    files = [
+        {
+            "id": _id,
+            "internal_id": _id.hex,
+            "owner_id": uuid4(),
+            "title": f"file_{i}.pdf",
+            "size": rnd.randrange(1, 10**9),
+            "format": "application/pdf",
+            "created_at": START + timedelta(seconds=i),
+            "is_deleted": False,
+            "checksum_algorithm": "sha256",
+            "checksum": rnd.randbytes(32).hex(),
+        }
+        for i, _id in enumerate(ids)
+    ]
+    tags = [{"file_id": _id, "key": "project", "value": "apollo"} for _id in ids]
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(FileMetaEntity), files)
+        await conn.execute(insert(FileTagEntity), tags)
+    return ids
+
+
+async def measure(client: AsyncClient, url: str, repeat: int) -> dict[str, float]:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        size = len(response.content)
+    return {
+        "p50 ms": statistics.median(timings),
+        "max ms": max(timings),
+        "KiB": size / 1024,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, action="append", default=None)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    pages = args.page or [10, 100, 1000]
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await database.init_engine(
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'list.db')}"
+        )
+        ids = await fill(max(pages))
+
+        rows: list[tuple[str, str, dict[str, Any]]] = []
+        for mode, app in (("before", make_before_app()), ("after", make_after_app())):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                for page in pages:
+                    url = f"/?limit={page}"
+                    rows.append(
+                        (mode, f"list {page}", await measure(client, url, args.repeat))
+                    )
+                url = f"/{ids[0]}/info"
+                rows.append((mode, "info", await measure(client, url, args.repeat)))
+        await database.close_engine()
+
+    columns = list(rows[0][2])
+    print(f"{'mode':<8}{'request':<12}" + "".join(f"{c:>10}" for c in columns))
+    for mode, name, result in rows:
+        print(f"{mode:<8}{name:<12}" + "".join(f"{result[c]:>10.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
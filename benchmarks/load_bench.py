@@ -0,0 +1,121 @@
+"""
+Load test of a running API server: requests per second per core for file
+info and for downloads.
+
+    CONFIG_FILE=configs/config.yaml poe run_api  # in another shell
+    python -m benchmarks.load_bench --url http://127.0.0.1:8000 --server-cores 4
+    python -m benchmarks.load_bench --url https://host:8443 --http2 --clients 4
+
+A file of `--size` MiB is uploaded first, then each scenario runs for
+`--duration` seconds from `--clients` processes keeping `--concurrency`
+requests in flight each. Run the clients on another machine, or pin them
+to other cores than the server, and pass the number of cores given to the
+server as `--server-cores`: the `rps/core` column divides by it. The
+client negotiates HTTP/2 over TLS only, so `--http2` needs an `https` URL
+and hypercorn with `server.certfile` set.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from uuid import uuid4
+
+import httpx
+
+MB = 1024 * 1024
+
+
+def upload(url: str, size: int) -> str:
+    content = (b"0123456789abcdef" * (size // 16 + 1))[:size]
+    response = httpx.post(
+        f"{url}/api/v1/file/",
+        params={"owner_id": str(uuid4())},
+        files={"file": ("load-bench.bin", content, "application/octet-stream")},
+        timeout=60,
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def hammer(
+    url: str, concurrency: int, duration: float, http2: bool
+) -> tuple[list[float], int, int]:
+    latencies: list[float] = []
+    received = errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, http2=http2, timeout=60) as client:
+
+        async def loop() -> None:
+            nonlocal received, errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                received += len(response.content)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies, received, errors
+
+
+def run_client(
+    url: str, concurrency: int, duration: float, http2: bool
+) -> tuple[list[float], int, int]:
+    return asyncio.run(hammer(url, concurrency, duration, http2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--size", type=float, default=1, help="download size, MiB")
+    parser.add_argument("--duration", type=float, default=10, help="per scenario, s")
+    parser.add_argument("--clients", type=int, default=2, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="per client")
+    parser.add_argument("--server-cores", type=int, default=1)
+    parser.add_argument("--http2", action="store_true", help="needs the h2 package")
+    args = parser.parse_args()
+
+    file_id = upload(args.url, int(args.size * MB))
+    scenarios = {
+        "info": f"{args.url}/api/v1/file/{file_id}/info",
+        f"download {args.size:g} MiB": f"{args.url}/api/v1/file/{file_id}",
+    }
+
+    print(
+        f"{'scenario':<18}{'rps':>10}{'rps/core':>10}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'MiB/s':>10}{'errors':>8}"
+    )
+    with ProcessPoolExecutor(args.clients) as pool:
+        for name, url in scenarios.items():
+            futures = [
+                pool.submit(
+                    run_client, url, args.concurrency, args.duration, args.http2
+                )
+                for _ in range(args.clients)
+            ]
+            latencies: list[float] = []
+            received = errors = 0
+            for future in futures:
+                client_latencies, client_received, client_errors = future.result()
+                latencies += client_latencies
+                received += client_received
+                errors += client_errors
+
+            rps = len(latencies) / args.duration
+            quantiles = statistics.quantiles(latencies, n=100) if latencies else [0.0]
+            print(
+                f"{name:<18}{rps:>10.0f}{rps / args.server_cores:>10.0f}"
+                f"{statistics.median(latencies or [0.0]) * 1000:>10.1f}"
+                f"{quantiles[-1] * 1000:>10.1f}"
+                f"{received / MB / args.duration:>10.1f}{errors:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
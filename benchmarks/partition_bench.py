@@ -0,0 +1,248 @@
+"""
+Insert rate, listing and lookup latency of `file_meta` with and without
+partitioning.
+
+    python -m benchmarks.partition_bench --uri postgresql+asyncpg://.../scratch_db
+    python -m benchmarks.partition_bench --uri ... --rows 1000000 --partitions 32 --check
+
+Partitioning is PostgreSQL only, so `--uri` is required; the schemas
+`bench_plain`, `bench_hash` and `bench_range` are dropped and recreated in
+it, so point it at a scratch database only. Each gets the tables of the
+model, partitioned like the migration does it, and `--rows` records of
+`--owners` owners created over the last `--months` months.
+
+`fill` is the rate of batched inserts, `create` of single records created
+by the repository. `list` is an owner listing, `get` a lookup by id as
+`FileService` makes it: with a `created_at` bound from the UUIDv7 time
+for the range scheme. `parts` columns count the partitions left in the
+plan of the query, `purge` is the time to remove the oldest month: a
+`DELETE` without range partitions, a partition drop with them.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, cast
+from uuid import UUID, uuid4
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.core.partitioning import (
+    HASH,
+    RANGE,
+    PartitionScheme,
+    add_months,
+    month_start,
+    partition_file_meta,
+)
+from src.entities import Base
+from src.entities.file_meta import FileMetaEntity
+from src.repositories.file_meta import FileMetaRepository
+from src.repositories.partition import PartitionRepository
+from src.utils import uuid7, uuid7_time
+
+LAYOUTS = ["plain", HASH, RANGE]
+BATCH_SIZE = 10000
+
+
+def make_row(rnd: random.Random, owners: list[UUID], start: datetime, span: float):
+    created_at = start + timedelta(seconds=rnd.random() * span)
+    return {
+        "id": uuid7(created_at),
+        "internal_id": uuid4().hex,
+        "owner_id": rnd.choice(owners),
+        "title": f"file_{rnd.randrange(1000000)}",
+        "size": rnd.randrange(1, 10_000_000),
+        "created_at": created_at,
+    }
+
+
+async def setup(engine: AsyncEngine, schema: str, layout: str, args) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+    async with engine.begin() as conn:
+        # The schema is empty, while tables of the same name may be in public
+        await conn.run_sync(Base.metadata.create_all, checkfirst=False)
+        if layout != "plain":
+            await conn.run_sync(
+                partition_file_meta,
+                cast(PartitionScheme, layout),
+                partitions=args.partitions,
+                since=args.start,
+            )
+
+
+async def fill(engine: AsyncEngine, args, ids: list[UUID]) -> float:
+    rnd = random.Random(42)
+    span = (datetime.now(timezone.utc) - args.start).total_seconds()
+    started = time.perf_counter()
+    for start in range(0, args.rows, BATCH_SIZE):
+        rows = [
+            make_row(rnd, args.owner_ids, args.start, span)
+            for _ in range(min(BATCH_SIZE, args.rows - start))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert(FileMetaEntity), rows)
+        ids.extend(rnd.sample([row["id"] for row in rows], min(len(rows), 100)))
+    elapsed = time.perf_counter() - started
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    return args.rows / elapsed
+
+
+async def create(engine: AsyncEngine, count: int) -> float:
+    started = time.perf_counter()
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        for i in range(count):
+            await FileMetaRepository.create(db, uuid4().hex, uuid4(), f"new_{i}")
+    return count / (time.perf_counter() - started)
+
+
+async def latency(repeat: int, call: Callable[[int], Awaitable[Any]]) -> float:
+    times = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        await call(i)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def relations(plan: Any) -> set[str]:
+    if isinstance(plan, list):
+        return set().union(*(relations(item) for item in plan))
+    if not isinstance(plan, dict):
+        return set()
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    return found.union(*(relations(value) for value in plan.values()))
+
+
+async def scanned_partitions(engine: AsyncEngine, call: Callable[[], Awaitable[Any]]):
+    """Partitions of `file_meta` in the plan of the first query of `call`"""
+    statements: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM file_meta" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await call()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    statement, parameters = statements[0]
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return len([name for name in relations(plan) if name.startswith("file_meta")])
+
+
+async def purge(engine: AsyncEngine, layout: str, month: datetime) -> float:
+    bound = add_months(month_start(month), 1)
+    started = time.perf_counter()
+    if layout == RANGE:
+        async with AsyncSession(engine) as db:
+            await PartitionRepository.drop_month(db, month_start(month))
+    else:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "DELETE FROM file_tag WHERE file_id IN "
+                    "(SELECT id FROM file_meta WHERE created_at < :bound)"
+                ),
+                {"bound": bound},
+            )
+            await conn.execute(
+                text("DELETE FROM file_meta WHERE created_at < :bound"),
+                {"bound": bound},
+            )
+    return (time.perf_counter() - started) * 1000
+
+
+async def bench(uri: str, layout: str, args) -> dict[str, float]:
+    schema = f"bench_{layout}"
+    engine = create_async_engine(
+        uri, connect_args={"server_settings": {"search_path": f"{schema},public"}}
+    )
+    await setup(engine, schema, layout, args)
+    ids: list[UUID] = []
+    result = {"fill/s": await fill(engine, args, ids)}
+    result["create/s"] = await create(engine, args.creates)
+
+    rnd = random.Random(7)
+    near = layout == RANGE
+    async with AsyncSession(engine) as db:
+
+        async def list_files(_: int = 0) -> None:
+            await FileMetaRepository.get_list(db, owner_id=rnd.choice(args.owner_ids))
+            db.expunge_all()
+
+        async def get_file(_: int = 0) -> None:
+            _id = rnd.choice(ids)
+            await FileMetaRepository.get_by_id(
+                db, _id, uuid7_time(_id) if near else None
+            )
+            db.expunge_all()
+
+        result["list ms"] = await latency(args.repeat, list_files)
+        result["get ms"] = await latency(args.repeat, get_file)
+        result["list parts"] = await scanned_partitions(engine, list_files)
+        result["get parts"] = await scanned_partitions(engine, get_file)
+
+    result["purge ms"] = await purge(engine, layout, args.start)
+    await engine.dispose()
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", required=True, help="scratch PostgreSQL URI")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12, help="age of the oldest")
+    parser.add_argument("--partitions", type=int, default=16, help="hash scheme")
+    parser.add_argument("--creates", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail unless hash listings and range lookups are pruned",
+    )
+    args = parser.parse_args()
+    rnd = random.Random(1)
+    args.owner_ids = [UUID(int=rnd.getrandbits(128)) for _ in range(args.owners)]
+    now = datetime.now(timezone.utc)
+    first = add_months(month_start(now), -args.months)
+    args.start = datetime(first.year, first.month, first.day, tzinfo=timezone.utc)
+
+    results = {layout: await bench(args.uri, layout, args) for layout in LAYOUTS}
+
+    columns = list(results["plain"])
+    print(f"{'layout':<8}" + "".join(f"{c:>12}" for c in columns))
+    for layout, result in results.items():
+        print(f"{layout:<8}" + "".join(f"{result[c]:>12.1f}" for c in columns))
+
+    if args.check:
+        failures = []
+        if results[HASH]["list parts"] > 1:
+            failures.append("hash listing is not pruned to one partition")
+        if results[RANGE]["get parts"] > 2:
+            failures.append("range lookup by id is not pruned to its months")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
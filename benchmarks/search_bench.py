@@ -0,0 +1,156 @@
+"""
+Latency of file search queries on a large `file_meta` table.
+
+    python -m benchmarks.search_bench --rows 1000000
+    python -m benchmarks.search_bench --uri postgresql+asyncpg://.../scratch_db
+
+The table is created and filled in the given database (a temporary SQLite
+file by default), so point `--uri` at a scratch database only. The indexes
+come from the model, including the PostgreSQL trigram index on the title.
+`first` is the latency of the first page of results, `next` of the
+following keyset pages.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.entities import Base
+from src.entities.file_meta import FileMetaEntity
+from src.repositories.file_meta import FileMetaRepository
+
+WORDS = [
+    "report", "invoice", "holiday", "scan", "contract", "draft", "photo",
+    "backup", "notes", "budget", "slides", "summary", "receipt", "diagram",
+]  # fmt: skip
+FORMATS = [
+    "application/pdf", "image/png", "image/jpeg", "text/plain",
+    "application/zip", "video/mp4", "application/msword",
+]  # fmt: skip
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 10000
+
+
+def make_row(rnd: random.Random) -> dict[str, Any]:
+    title = f"{rnd.choice(WORDS)}_{rnd.choice(WORDS)}_{rnd.randrange(100000)}"
+    return {
+        "id": uuid4(),
+        "internal_id": uuid4().hex,
+        "owner_id": uuid4(),
+        "title": title,
+        "size": int(rnd.lognormvariate(12, 2)),
+        "format": rnd.choice(FORMATS),
+        "created_at": START + timedelta(seconds=rnd.randrange(2 * 365 * 86400)),
+        "is_deleted": rnd.random() < 0.02,
+    }
+
+
+async def fill(engine: AsyncEngine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    rnd = random.Random(42)
+    started = time.perf_counter()
+    for start in range(0, rows, BATCH_SIZE):
+        count = min(BATCH_SIZE, rows - start)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(FileMetaEntity), [make_row(rnd) for _ in range(count)]
+            )
+    print(f"Inserted {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+QUERIES: dict[str, dict[str, Any]] = {
+    "title substring": {"q": "invoice_rec"},
+    "title, rare": {"q": "_4242"},
+    "exact format": {"format": "image/png"},
+    "format prefix": {"format": "image/*"},
+    "size range": {"size_min": 1_000_000, "size_max": 2_000_000},
+    "date range": {
+        "created_from": START + timedelta(days=200),
+        "created_to": START + timedelta(days=201),
+    },
+    "combined": {
+        "q": "photo",
+        "format": "image/*",
+        "size_min": 100_000,
+        "created_from": START + timedelta(days=100),
+    },
+    "no filters": {},
+}
+
+
+async def bench_query(
+    db: AsyncSession, filters: dict[str, Any], repeat: int, pages: int
+) -> dict[str, float]:
+    first: list[float] = []
+    deep: list[float] = []
+    for _ in range(repeat):
+        after = None
+        for page in range(pages):
+            started = time.perf_counter()
+            records = await FileMetaRepository.search(
+                db, after=after, limit=50, **filters
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            (first if page == 0 else deep).append(elapsed)
+            if len(records) < 50:
+                break
+            after = (records[-1].created_at, records[-1].id)
+        db.expunge_all()
+    return {
+        "first p50 ms": statistics.median(first),
+        "first max ms": max(first),
+        "next p50 ms": statistics.median(deep) if deep else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--uri", default=None, help="scratch database URI")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=5, help="keyset pages per run")
+    parser.add_argument(
+        "--skip-fill", action="store_true", help="reuse the rows of a previous run"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = args.uri or f"sqlite+aiosqlite:///{os.path.join(tmp, 'search.db')}"
+        engine = create_async_engine(uri)
+        if not args.skip_fill:
+            await fill(engine, args.rows)
+
+        rows = []
+        async with AsyncSession(engine) as db:
+            for name, filters in QUERIES.items():
+                rows.append(
+                    (name, await bench_query(db, filters, args.repeat, args.pages))
+                )
+        await engine.dispose()
+
+    columns = list(rows[0][1])
+    print(f"{'query':<18}" + "".join(f"{c:>14}" for c in columns))
+    for name, result in rows:
+        print(f"{name:<18}" + "".join(f"{result[c]:>14.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Throughput benchmark shared by all storage engines.
+
+    python -m benchmarks.storage_bench --size 64 --part-size 5
+    python -m benchmarks.storage_bench --engine local --path /mnt/nvme/bench
+    python -m benchmarks.storage_bench --engine s3  # uses CONFIG_FILE settings
+
+The `stub` engine is the in-memory S3 stand-in from the test suite; it
+measures the `S3Storage` overhead without any network.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.storage import StorageBackend
+
+MB = 1024 * 1024
+
+
+@asynccontextmanager
+async def open_engine(
+    name: str, path: str | None, part_size: int
+) -> AsyncIterator[StorageBackend]:
+    if name == "local":
+        from src.storage.local import LocalStorage
+
+        with tempfile.TemporaryDirectory(dir=path) as root:
+            yield LocalStorage(root, chunk_size=part_size)
+    elif name == "stub":
+        from src.storage.s3 import S3Storage
+        from tests.s3_stub import InMemoryS3Client
+
+        yield S3Storage(InMemoryS3Client(), "bench", chunk_size=part_size)
+    else:
+        from src.core.config import Config
+        from src.core.storage import open_storage
+
+        async with open_storage(Config.storage, Config.s3) as storage:
+            yield storage
+
+
+async def bench_engine(
+    storage: StorageBackend, size: int, part_size: int, repeat: int
+) -> dict[str, float]:
+    payload = os.urandom(part_size)
+    parts_count = max(1, size // part_size)
+    key = "storage-bench.bin"
+    results: dict[str, float] = {}
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        upload_id = await storage.create_multipart_upload(key)
+        parts = [
+            await storage.upload_part(key, upload_id, number, payload)
+            for number in range(1, parts_count + 1)
+        ]
+        await storage.complete_multipart_upload(key, upload_id, parts)
+    elapsed = time.perf_counter() - started
+    results["write MB/s"] = parts_count * part_size * repeat / MB / elapsed
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        async for _chunk in storage.read(key):
+            pass
+    elapsed = time.perf_counter() - started
+    results["read MB/s"] = parts_count * part_size * repeat / MB / elapsed
+
+    started = time.perf_counter()
+    for i in range(repeat * 10):
+        offset = (i * 7919 * 4096) % max(1, parts_count * part_size - 4096)
+        async for _chunk in storage.read(key, offset=offset, length=4096):
+            pass
+    results["4K range read ms"] = (time.perf_counter() - started) * 1000 / (repeat * 10)
+
+    started = time.perf_counter()
+    for _ in range(repeat * 10):
+        await storage.head(key)
+    results["head ms"] = (time.perf_counter() - started) * 1000 / (repeat * 10)
+
+    started = time.perf_counter()
+    for i in range(repeat):
+        await storage.copy(key, f"{key}.copy{i}")
+    results["copy ms"] = (time.perf_counter() - started) * 1000 / repeat
+
+    await storage.delete_many([key, *(f"{key}.copy{i}" for i in range(repeat))])
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--engine", action="append", choices=["local", "stub", "s3"], default=None
+    )
+    parser.add_argument("--size", type=int, default=64, help="object size, MB")
+    parser.add_argument("--part-size", type=int, default=5, help="part size, MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--path", default=None, help="parent dir for local engine")
+    args = parser.parse_args()
+
+    engines = args.engine or ["local", "stub"]
+    part_size = args.part_size * MB
+    rows = []
+    for name in engines:
+        async with open_engine(name, args.path, part_size) as storage:
+            rows.append(
+                (
+                    name,
+                    await bench_engine(storage, args.size * MB, part_size, args.repeat),
+                )
+            )
+
+    columns = list(rows[0][1])
+    print(f"{'engine':<8}" + "".join(f"{c:>18}" for c in columns))
+    for name, result in rows:
+        print(f"{name:<8}" + "".join(f"{result[c]:>18.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
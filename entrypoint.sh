@@ -3,14 +3,17 @@ set -e
 
 case "$1" in
     "api")
-        exec uvicorn src:rest_app --host 0.0.0.0 --port 8000
+        exec python -m src.api.run
         ;;
     "worker")
         exec celery -A src:worker_app worker --pool=prefork --loglevel=info
         ;;
+    "beat")
+        exec celery -A src:worker_app beat --loglevel=info
+        ;;
     *)
         echo "Unknown command: $1"
-        echo "Usage: $0 {api|worker}"
+        echo "Usage: $0 {api|worker|beat}"
         exit 1
         ;;
 esac
@@ -1,4 +1,24 @@
-from .api.server import app as rest_app
-from .celery.app import app as worker_app
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+    from celery import Celery
+
+    rest_app: FastAPI
+    worker_app: Celery
 
 __all__ = ["rest_app", "worker_app"]
+
+
+def __getattr__(name: str) -> Any:
+    # The API and the worker import only their own application and its dependencies
+    if name == "rest_app":
+        from .api.server import app
+
+        return app
+    if name == "worker_app":
+        from .celery.app import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,8 +2,25 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import NoResultFound
 
+from ..core.limiter import AdmissionRejected
+from ..services.inspection import ContentRejected
+
 
 async def handle_object_not_found(req: Request, exc: NoResultFound) -> JSONResponse:
     return JSONResponse(
         content={"msg": "Object not found"}, status_code=status.HTTP_404_NOT_FOUND
     )
+
+
+async def handle_admission_rejected(
+    req: Request, exc: AdmissionRejected
+) -> JSONResponse:
+    return JSONResponse(
+        content={"msg": exc.msg},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def handle_content_rejected(req: Request, exc: ContentRejected) -> JSONResponse:
+    return JSONResponse(content={"msg": exc.msg}, status_code=exc.status_code)
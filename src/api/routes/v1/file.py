@@ -1,45 +1,187 @@
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Coroutine, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, UploadFile, status
+from fastapi import APIRouter, Depends, Query, Request, UploadFile, status
 from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
 
-from ....celery.tasks import delete_file_from_s3_task
 from ....core.database import AsyncSession, get_db
-from ....core.s3 import Session, get_s3_session
+from ....core.limiter import AdmissionController, TransferSlot
+from ....core.storage import get_storage
 from ....services.file import FileService
-from ...schemas.v1.file import FileListFilters, FileResponse, FilesListResponse
+from ....storage import StorageBackend
+from ...schemas.v1.file import (
+    FileCopyRequest,
+    FileExportFilters,
+    FileListFilters,
+    FileOwnerUpdate,
+    FileResponse,
+    FileSearchFilters,
+    FileSearchResponse,
+    FilesListResponse,
+    FileTagsPatch,
+    TagQuery,
+    accepts_encoding,
+    decode_cursor,
+    dump_json,
+    dump_ndjson,
+    encode_cursor,
+    parse_tags,
+)
 
 router = APIRouter(tags=["files"])
 
 
+class AdmittedRoute(APIRoute):
+    """
+    Admits the transfer before the request body is read, so that a rejected
+    upload is answered with 429 or 503 before the client sends the file.
+    The slot is in `request.state.transfer_slot` until the response is ready.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def admitted(request: Request) -> Response:
+            try:
+                owner_id = UUID(request.query_params.get("owner_id", ""))
+            except ValueError:
+                # Only the global limit then, the request fails validation anyway
+                owner_id = None
+            slot = await AdmissionController().admit(owner_id)
+            request.state.transfer_slot = slot
+            async with slot:
+                return await handler(request)
+
+        return admitted
+
+
+# Uploads, admitted before their body is received
+uploads = APIRouter(tags=["files"], route_class=AdmittedRoute)
+
+
 @router.get("/", response_model=FilesListResponse, status_code=status.HTTP_200_OK)
 async def get_files_list(
     db: AsyncSession = Depends(get_db), filters: FileListFilters = Query()
-) -> FilesListResponse:
-    files, count = await FileService().get_list(
+) -> Response:
+    # Rows go straight to JSON, `response_model` only documents the schema
+    files, count = await FileService().get_list_rows(
         db,
         limit=filters.limit,
         offset=filters.offset,
         owner_id=filters.owner_id,
         show_deleted=filters.show_deleted,
+        tags=parse_tags(filters.tags),
+    )
+    content = {
+        "data": files,
+        "limit": filters.limit,
+        "offset": filters.offset,
+        "count": count,
+    }
+    return Response(dump_json(content), media_type="application/json")
+
+
+@router.get(
+    "/search", response_model=FileSearchResponse, status_code=status.HTTP_200_OK
+)
+async def search_files(
+    db: AsyncSession = Depends(get_db), filters: FileSearchFilters = Query()
+) -> FileSearchResponse:
+    files, next_position = await FileService().search(
+        db,
+        limit=filters.limit,
+        after=decode_cursor(filters.cursor) if filters.cursor else None,
+        q=filters.q,
+        format=filters.format,
+        owner_id=filters.owner_id,
+        size_min=filters.size_min,
+        size_max=filters.size_max,
+        created_from=filters.created_from,
+        created_to=filters.created_to,
+        tags=parse_tags(filters.tags),
     )
-    return FilesListResponse(
+    return FileSearchResponse(
         data=files,  # type:ignore[arg-type]
         limit=filters.limit,
-        offset=filters.offset,
-        count=count,
+        next_cursor=encode_cursor(next_position) if next_position else None,
     )
 
 
-@router.post("/", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_files(
+    request: Request, filters: FileExportFilters = Query()
+) -> StreamingResponse:
+    # The request session is closed before the body is sent, the stream opens its own
+    compress = accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+
+    async def content():
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        async for db in get_db():
+            async for files in FileService().export(
+                db,
+                show_deleted=filters.show_deleted,
+                q=filters.q,
+                format=filters.format,
+                owner_id=filters.owner_id,
+                size_min=filters.size_min,
+                size_max=filters.size_max,
+                created_from=filters.created_from,
+                created_to=filters.created_to,
+                tags=parse_tags(filters.tags),
+            ):
+                chunk = dump_ndjson(files)
+                if compressor is None:
+                    yield chunk
+                else:
+                    # Flush every batch, so that the client never waits for the next one
+                    yield compressor.compress(chunk) + compressor.flush(
+                        zlib.Z_SYNC_FLUSH
+                    )
+        if compressor is not None:
+            yield compressor.flush()
+
+    headers = {"Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        content(), media_type="application/x-ndjson", headers=headers
+    )
+
+
+@uploads.post("/", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
 async def upload_file(
+    request: Request,
     file: UploadFile,
     owner_id: UUID,
+    tags: List[TagQuery] = Query([], description="`key` or `key=value`"),
+    expires_in: int | None = Query(
+        None, gt=0, description="Seconds after which the file is deleted"
+    ),
     db: AsyncSession = Depends(get_db),
-    s3: Session = Depends(get_s3_session),
+    storage: StorageBackend = Depends(get_storage),
 ) -> FileResponse:
+    expires_at = None
+    if expires_in is not None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    slot: TransferSlot = request.state.transfer_slot
     obj = await FileService().upload(
-        db, s3, owner_id, file.filename or "unnamed_file", file
+        db,
+        storage,
+        owner_id,
+        file.filename or "unnamed_file",
+        file,
+        on_chunk=slot.throttle,
+        tags=parse_tags(tags),
+        expires_at=expires_at,
     )  # type:ignore[arg-type]
     return FileResponse.model_validate(obj)
 
@@ -50,13 +192,29 @@ async def upload_file(
 async def get_file_by_id(
     file_id: UUID,
     db: AsyncSession = Depends(get_db),
-    s3: Session = Depends(get_s3_session),
+    storage: StorageBackend = Depends(get_storage),
 ) -> StreamingResponse:
-    chunk_generator, headers = await FileService().get(db, s3, file_id)
+    obj = await FileService().get_info(db, file_id)
+    slot = await AdmissionController().admit(obj.owner_id)
+    try:
+        chunk_generator, headers = await FileService().open(storage, obj)
+    except BaseException:
+        await slot.release()
+        raise
+
+    async def content():
+        try:
+            async for chunk in chunk_generator():
+                await slot.throttle(len(chunk))
+                yield chunk
+        finally:
+            await slot.release()
+
     return StreamingResponse(
-        content=chunk_generator(),
+        content=content(),
         headers=headers,
         media_type=headers.get("ContentType"),
+        background=BackgroundTask(slot.release),
     )
 
 
@@ -65,8 +223,43 @@ async def get_file_by_id(
 )
 async def get_file_info_by_id(
     file_id: UUID, db: AsyncSession = Depends(get_db)
+) -> Response:
+    obj = await FileService().get_info_row(db, file_id)
+    return Response(dump_json(obj), media_type="application/json")
+
+
+@router.patch(
+    "/{file_id}/tags", response_model=FileResponse, status_code=status.HTTP_200_OK
+)
+async def update_file_tags(
+    file_id: UUID, patch: FileTagsPatch, db: AsyncSession = Depends(get_db)
 ) -> FileResponse:
-    obj = await FileService().get_info(db, file_id)
+    obj = await FileService().update_tags(db, file_id, patch.tags, patch.remove)
+    return FileResponse.model_validate(obj)
+
+
+@router.post(
+    "/{file_id}/copy", response_model=FileResponse, status_code=status.HTTP_201_CREATED
+)
+async def copy_file(
+    file_id: UUID,
+    request: FileCopyRequest,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> FileResponse:
+    obj = await FileService().copy(
+        db, storage, file_id, owner_id=request.owner_id, title=request.title
+    )
+    return FileResponse.model_validate(obj)
+
+
+@router.patch(
+    "/{file_id}/owner", response_model=FileResponse, status_code=status.HTTP_200_OK
+)
+async def update_file_owner(
+    file_id: UUID, update: FileOwnerUpdate, db: AsyncSession = Depends(get_db)
+) -> FileResponse:
+    obj = await FileService().reassign(db, file_id, update.owner_id)
     return FileResponse.model_validate(obj)
 
 
@@ -75,5 +268,7 @@ async def delete_file_by_id(
     file_id: UUID, db: AsyncSession = Depends(get_db)
 ) -> Response:
     await FileService().delete(db, file_id)
-    delete_file_from_s3_task.delay(file_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+router.include_router(uploads)
@@ -0,0 +1,65 @@
+import os
+from importlib.util import find_spec
+
+from ..core.config import Config, ServerConfig
+from ..core.logger import logger
+
+APP = "src:rest_app"
+
+
+def get_workers(config: ServerConfig) -> int:
+    """Число процессов сервера, 0 — по одному на ядро"""
+    return config.workers or os.cpu_count() or 1
+
+
+def run_uvicorn(config: ServerConfig) -> None:
+    """Запуск uvicorn: HTTP/1.1, uvloop и httptools, если они установлены"""
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=config.host,
+        port=config.port,
+        workers=get_workers(config),
+        loop=config.loop,
+        http=config.http,
+        timeout_keep_alive=config.keep_alive,
+        backlog=config.backlog,
+        limit_concurrency=config.limit_concurrency,
+        ssl_certfile=config.certfile,
+        ssl_keyfile=config.keyfile,
+    )
+
+
+def run_hypercorn(config: ServerConfig) -> None:
+    """Запуск hypercorn: HTTP/1.1 и HTTP/2 (h2 по TLS, h2c без него)"""
+    try:
+        from hypercorn.config import Config as HypercornConfig
+        from hypercorn.run import run
+    except ImportError as e:
+        raise RuntimeError("HTTP/2 requires the optional `hypercorn` package") from e
+
+    server = HypercornConfig()
+    server.application_path = APP
+    server.bind = [f"{config.host}:{config.port}"]
+    server.workers = get_workers(config)
+    use_uvloop = config.loop != "asyncio" and find_spec("uvloop") is not None
+    server.worker_class = "uvloop" if use_uvloop else "asyncio"
+    server.keep_alive_timeout = config.keep_alive
+    server.backlog = config.backlog
+    server.certfile = config.certfile
+    server.keyfile = config.keyfile
+    if config.limit_concurrency is not None:
+        logger.warning("server.limit_concurrency is not supported by hypercorn")
+    run(server)
+
+
+def main() -> None:
+    if Config.server.engine == "hypercorn":
+        run_hypercorn(Config.server)
+    else:
+        run_uvicorn(Config.server)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,48 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime
-from typing import List
+from typing import Annotated, Any, List, Mapping, Tuple
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
+
+TagKey = Annotated[
+    str, StringConstraints(min_length=1, max_length=64, pattern="^[^=]+$")
+]
+TagValue = Annotated[str, StringConstraints(max_length=255)]
+# `key` for a plain tag or `key=value` for an attribute, as a query parameter
+TagQuery = Annotated[str, StringConstraints(pattern="^[^=]{1,64}(=.{0,255})?$")]
+
+
+def parse_tags(values: List[str]) -> dict[str, str | None]:
+    tags: dict[str, str | None] = {}
+    for item in values:
+        key, sep, value = item.partition("=")
+        tags[key] = value if sep else None
+    return tags
+
+
+def accepts_encoding(header: str, coding: str) -> bool:
+    """
+    Whether an `Accept-Encoding` header allows a content coding: listed by
+    name, or else covered by `*`, with a q-value above 0.
+    """
+    qualities: dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities.get(coding, qualities.get("*", 0.0)) > 0
 
 
 class FileResponse(BaseModel):
@@ -13,12 +53,41 @@ class FileResponse(BaseModel):
     size: int
     format: str | None = None
     created_at: datetime
+    expires_at: datetime | None = None
     is_deleted: bool
+    tier: str = "hot"
+    checksum_algorithm: str | None = None
+    checksum: str | None = None
+    tags: dict[str, str | None] = {}
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tags_to_dict(cls, value: Any) -> Mapping[str, str | None]:
+        if isinstance(value, Mapping):
+            return value
+        return {tag.key: tag.value for tag in value}
+
+
+def dump_ndjson(items: List[Any]) -> bytes:
+    return b"".join(
+        orjson.dumps(item, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+        for item in items
+    )
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serialize plain dicts and lists straight to JSON bytes, without building
+    pydantic models. UUIDs and datetimes are written the way pydantic writes
+    them, so the result matches the declared response model.
+    """
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
 
 
 class FileListFilters(BaseModel):
     owner_id: UUID | None = None
     show_deleted: bool = False
+    tags: List[TagQuery] = Field([], description="`key` or `key=value`, all must match")
     limit: int = 10
     offset: int = 0
 
@@ -28,3 +97,71 @@ class FilesListResponse(BaseModel):
     limit: int = 100
     offset: int = 0
     count: int = 0
+
+
+def encode_cursor(position: Tuple[datetime, UUID]) -> str:
+    created_at, _id = position
+    raw = f"{created_at.isoformat()}|{_id}".encode()
+    return urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, _, _id = raw.partition("|")
+    return datetime.fromisoformat(created_at), UUID(_id)
+
+
+class FileQueryFilters(BaseModel):
+    q: str | None = Field(None, max_length=255, description="Title substring")
+    format: str | None = Field(
+        None, description="MIME type, or a `type/*` prefix such as `image/*`"
+    )
+    owner_id: UUID | None = None
+    size_min: int | None = Field(None, ge=0)
+    size_max: int | None = Field(None, ge=0)
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    tags: List[TagQuery] = Field([], description="`key` or `key=value`, all must match")
+
+
+class FileExportFilters(FileQueryFilters):
+    show_deleted: bool = False
+
+
+class FileSearchFilters(FileQueryFilters):
+    limit: int = Field(10, ge=1, le=100)
+    cursor: str | None = Field(None, description="`next_cursor` of the previous page")
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, value: str | None) -> str | None:
+        if value is not None:
+            try:
+                decode_cursor(value)
+            except (ValueError, UnicodeDecodeError) as e:
+                raise ValueError("Invalid cursor") from e
+        return value
+
+
+class FileSearchResponse(BaseModel):
+    data: List[FileResponse] = []
+    limit: int = 10
+    next_cursor: str | None = None
+
+
+class FileTagsPatch(BaseModel):
+    tags: dict[TagKey, TagValue | None] = Field(
+        {}, description="Tags to add or change; null for a tag without a value"
+    )
+    remove: List[TagKey] = Field([], description="Keys of the tags to remove")
+
+
+class FileCopyRequest(BaseModel):
+    owner_id: UUID | None = Field(None, description="Defaults to the file's owner")
+    title: str | None = Field(
+        None, min_length=1, max_length=255, description="Defaults to the file's title"
+    )
+
+
+class FileOwnerUpdate(BaseModel):
+    owner_id: UUID
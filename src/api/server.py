@@ -3,22 +3,59 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from ..core.config import Config
-from ..core.database import init_engine
-from ..core.logger import logger
+from ..core.database import close_engine, init_engine
+from ..core.limiter import AdmissionController
+from ..core.logger import logger, setup_logger
+from ..core.storage import close_storage, init_storage
+from ..services.access import AccessTracker
 from ..services.file import FileService
-from .exceptions import NoResultFound, handle_object_not_found
+from ..services.group_commit import GroupCommitter
+from ..services.inspection import ContentInspector
+from .exceptions import (
+    AdmissionRejected,
+    ContentRejected,
+    NoResultFound,
+    handle_admission_rejected,
+    handle_content_rejected,
+    handle_object_not_found,
+)
 from .routes import router
 
+setup_logger()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Rest initialization - START")
-    await init_engine(Config.db.uri)
-    FileService().bucket_name = Config.s3.bucket_name
+    await init_engine(
+        Config.db.uri,
+        Config.db.replicas,
+        check_interval=Config.db.replica_check_interval,
+        read_your_writes=Config.db.read_your_writes,
+        redis_uri=Config.db.redis_uri,
+    )
+    await init_storage(Config.storage, Config.s3)
     FileService().chunk_size = Config.s3.chunk_size
     FileService().max_file_size = Config.s3.max_file_size
+    FileService().checksum_algorithm = Config.integrity.checksum_algorithm
+    FileService().export_batch_size = Config.export.batch_size
+    FileService().read_ahead_part_size = Config.download.read_ahead_part_size
+    FileService().read_ahead_window = Config.download.read_ahead_window
+    FileService().prune_by_id_time = Config.partitioning.scheme == "range"
+    AdmissionController().configure(Config.limits)
+    ContentInspector().configure(Config.inspection)
+    AccessTracker().start(Config.tiering.access_flush_interval)
+    if Config.group_commit.enabled:
+        GroupCommitter().start(
+            Config.group_commit.window, Config.group_commit.max_batch
+        )
     logger.info("Rest initialization - START")
     yield
+    await AccessTracker().stop()
+    await GroupCommitter().stop()
+    await AdmissionController().close()
+    await close_storage()
+    await close_engine()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -28,3 +65,9 @@ app.include_router(router, prefix="/api")
 app.add_exception_handler(
     NoResultFound, handle_object_not_found  # type:ignore[arg-type]
 )
+app.add_exception_handler(
+    AdmissionRejected, handle_admission_rejected  # type:ignore[arg-type]
+)
+app.add_exception_handler(
+    ContentRejected, handle_content_rejected  # type:ignore[arg-type]
+)
@@ -1,18 +1,87 @@
-from asgiref.sync import async_to_sync
-
 from celery import Celery, signals
 
 from ..core.config import Config
-from ..core.database import init_engine
-from ..core.logger import logger
+from ..core.database import close_engine, init_engine
+from ..core.logger import logger, setup_logger
+from ..core.storage import close_storage, init_storage
+from ..services.file import FileService
+from .runtime import WorkerRuntime
+
+setup_logger()
 
 app = Celery(
-    "file_service_worker", broker=Config.celery.broker, worker_hijack_root_logger=False
+    "file_service_worker",
+    broker=Config.celery.broker,
+    include=[f"{__package__}.tasks"],
+    worker_hijack_root_logger=False,
 )
 
+app.conf.beat_schedule = {
+    "relay-outbox": {
+        "task": "relay_outbox",
+        "schedule": Config.outbox.relay_interval,
+        "options": {"expires": Config.outbox.relay_interval},
+    },
+}
+if Config.tiering.enabled:
+    app.conf.beat_schedule["migrate-storage-tiers"] = {
+        "task": "migrate_storage_tiers",
+        "schedule": Config.tiering.interval,
+    }
+if Config.lifecycle.enabled:
+    app.conf.beat_schedule["expire-files"] = {
+        "task": "expire_files",
+        "schedule": Config.lifecycle.interval,
+        "options": {"expires": Config.lifecycle.interval},
+    }
+if Config.integrity.scrub_enabled:
+    app.conf.beat_schedule["scrub-checksums"] = {
+        "task": "scrub_checksums",
+        "schedule": Config.integrity.scrub_interval,
+    }
+
+
+async def open_resources() -> None:
+    # Tasks act on the state they were sent for, replicas may lag behind it.
+    # Their changes are still marked for the API to read from the primary
+    await init_engine(
+        Config.db.uri,
+        read_your_writes=Config.db.read_your_writes,
+        redis_uri=Config.db.redis_uri,
+    )
+    FileService().prune_by_id_time = Config.partitioning.scheme == "range"
+    await init_storage(Config.storage, Config.s3)
+
+
+async def close_resources() -> None:
+    await close_storage()
+    await close_engine()
+
+
+if Config.reconciliation.enabled:
+    app.conf.beat_schedule["reconcile-storage"] = {
+        "task": "reconcile_storage",
+        "schedule": Config.reconciliation.interval,
+    }
+if Config.partitioning.scheme == "range":
+    app.conf.beat_schedule["maintain-partitions"] = {
+        "task": "maintain_partitions",
+        "schedule": Config.partitioning.interval,
+    }
+
 
 @signals.worker_process_init.connect
 def on_start(*args, **kwargs):
     logger.info("Worker initialization - START")
-    async_to_sync(init_engine)(Config.db.uri)
+    WorkerRuntime().start()
+    WorkerRuntime().run(open_resources())
     logger.info("Worker initialization - END")
+
+
+@signals.worker_process_shutdown.connect
+def on_shutdown(*args, **kwargs):
+    logger.info("Worker shutdown - START")
+    if WorkerRuntime().running:
+        WorkerRuntime().run(close_resources())
+        WorkerRuntime().stop()
+    logger.info("Worker shutdown - END")
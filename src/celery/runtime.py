@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, TypeVar
+
+from ..utils import singleton
+
+T = TypeVar("T")
+
+
+@singleton
+class WorkerRuntime:
+    """
+    Event loop living for the whole worker process.
+
+    The loop runs in a dedicated thread, so database and S3 connection pools
+    created on it survive between tasks. Synchronous Celery tasks submit their
+    coroutines with `run`; with a thread pool several tasks share the loop
+    concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self) -> None:
+        """Start the loop thread if it is not running yet."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="worker-event-loop", daemon=True
+            )
+            thread.start()
+            self._loop, self._thread = loop, thread
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run the coroutine on the process loop and wait for its result."""
+        if self._loop is None:
+            self.start()
+        assert self._loop is not None
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
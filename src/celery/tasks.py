@@ -1,27 +1,33 @@
+import asyncio
 import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any
 from uuid import UUID
 
-from asgiref.sync import async_to_sync
-
-from celery import shared_task
+from celery import current_app, shared_task
 
 from ..core.config import Config
 from ..core.database import get_db
 from ..core.logger import logger
-from ..core.s3 import get_s3_session
+from ..core.storage import get_storage
 from ..services.file import FileService
+from ..services.outbox import OutboxService
+from ..services.partition import PartitionService
+from ..services.reconciliation import ReconciliationService
+from ..storage import COLD, HOT
+from .runtime import WorkerRuntime
 
 
 async def delete_file_from_s3(file_id: UUID):
-    async for s3_session in get_s3_session():
+    async for storage in get_storage():
         async for db in get_db():
             try:
                 obj = await FileService().get_info(db, file_id)
                 if not obj.is_deleted:
                     return
 
-                await s3_session.delete_object(
-                    Bucket=Config.s3.bucket_name, Key=obj.internal_id
+                await storage.delete_many(
+                    [obj.internal_id], tier=COLD if obj.tier == COLD else HOT
                 )
                 await FileService().delete(db, file_id, mark=False)
             except Exception:
@@ -29,5 +35,148 @@ async def delete_file_from_s3(file_id: UUID):
 
 
 @shared_task(name="delete_file_from_s3", ignore_result=True)
-def delete_file_from_s3_task(file_id: UUID):
-    async_to_sync(delete_file_from_s3)(file_id)
+def delete_file_from_s3_task(file_id: UUID | str):
+    WorkerRuntime().run(delete_file_from_s3(UUID(str(file_id))))
+
+
+async def delete_files_from_s3(file_ids: list[UUID]):
+    semaphore = asyncio.Semaphore(Config.celery.task_concurrency)
+
+    async def delete(file_id: UUID):
+        async with semaphore:
+            await delete_file_from_s3(file_id)
+
+    await asyncio.gather(*(delete(file_id) for file_id in file_ids))
+
+
+@shared_task(name="delete_files_from_s3", ignore_result=True)
+def delete_files_from_s3_task(file_ids: list[UUID | str]):
+    WorkerRuntime().run(delete_files_from_s3([UUID(str(_id)) for _id in file_ids]))
+
+
+async def migrate_storage_tiers():
+    tiering = Config.tiering
+    accessed_before = datetime.now(timezone.utc) - timedelta(
+        days=tiering.cold_after_days
+    )
+    async for storage in get_storage():
+        async for db in get_db():
+            while True:
+                demoted, promoted = await FileService().migrate_tiers(
+                    db,
+                    storage,
+                    accessed_before,
+                    promote_after_reads=tiering.promote_after_reads,
+                    limit=tiering.batch_size,
+                )
+                logger.info(f"Storage tiers: {demoted} demoted, {promoted} promoted")
+                if demoted < tiering.batch_size and promoted < tiering.batch_size:
+                    break
+
+
+@shared_task(name="migrate_storage_tiers", ignore_result=True)
+def migrate_storage_tiers_task():
+    WorkerRuntime().run(migrate_storage_tiers())
+
+
+async def expire_files():
+    lifecycle = Config.lifecycle
+    retention = {
+        rule.owner_id: timedelta(days=rule.days) for rule in lifecycle.retention
+    }
+    async for db in get_db():
+        while True:
+            expired = await FileService().expire(
+                db,
+                datetime.now(timezone.utc),
+                retention=retention,
+                limit=lifecycle.batch_size,
+            )
+            if expired:
+                logger.info(f"Lifecycle: {expired} files expired")
+            if expired < lifecycle.batch_size:
+                break
+
+
+@shared_task(name="expire_files", ignore_result=True)
+def expire_files_task():
+    WorkerRuntime().run(expire_files())
+
+
+async def scrub_checksums():
+    async for storage in get_storage():
+        async for db in get_db():
+            verified, corrupted = await FileService().scrub(
+                db, storage, sample_size=Config.integrity.scrub_sample_size
+            )
+            for file_id in corrupted:
+                logger.error(f"Checksum mismatch: file {file_id} is corrupted")
+            logger.info(
+                f"Checksum scrub: {verified} verified, {len(corrupted)} corrupted"
+            )
+
+
+@shared_task(name="scrub_checksums", ignore_result=True)
+def scrub_checksums_task():
+    WorkerRuntime().run(scrub_checksums())
+
+
+def send_task(task: str, kwargs: dict[str, Any]) -> None:
+    current_app.send_task(task, kwargs=kwargs)
+
+
+async def relay_outbox():
+    batch_size = Config.outbox.batch_size
+    async for db in get_db():
+        while True:
+            relayed = await OutboxService().relay(db, send_task, batch_size)
+            if relayed:
+                logger.info(f"Outbox: {relayed} events relayed")
+            if relayed < batch_size:
+                break
+
+
+@shared_task(name="relay_outbox", ignore_result=True)
+def relay_outbox_task():
+    WorkerRuntime().run(relay_outbox())
+
+
+async def reconcile_storage():
+    config = Config.reconciliation
+    async for storage in get_storage():
+        async for db in get_db():
+            report = await ReconciliationService().reconcile(
+                db,
+                storage,
+                min_age=timedelta(seconds=config.min_age),
+                stale_upload_age=timedelta(seconds=config.stale_upload_age),
+                delete=config.delete,
+                batch_size=config.batch_size,
+            )
+            logger.info(
+                f"Reconciliation: {report.objects} objects checked, "
+                f"{report.orphan_objects} orphan objects, "
+                f"{report.missing_objects} missing objects, "
+                f"{report.stale_uploads} stale uploads"
+            )
+
+
+@shared_task(name="reconcile_storage", ignore_result=True)
+def reconcile_storage_task():
+    WorkerRuntime().run(reconcile_storage())
+
+
+async def maintain_partitions():
+    config = Config.partitioning
+    async for db in get_db():
+        report = await PartitionService().maintain(
+            db, months_ahead=config.months_ahead, drop_purged=config.drop_purged
+        )
+        logger.info(
+            f"Partitions: {len(report.created)} created, {len(report.dropped)} dropped"
+        )
+
+
+@shared_task(name="maintain_partitions", ignore_result=True)
+def maintain_partitions_task():
+    WorkerRuntime().run(maintain_partitions())
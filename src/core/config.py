@@ -1,5 +1,6 @@
 import os
-from typing import Literal, Tuple, Type
+from typing import Any, Literal, Tuple, Type, cast
+from uuid import UUID
 
 from pydantic import BaseModel
 from pydantic_settings import (
@@ -24,14 +25,128 @@ class S3Config(BaseModel):
     bucket_name: str = "test_bucket"
     chunk_size: int = 5 * 1024 * 1024
     max_file_size: int = 20 * 1024 * 1024
+    cold_bucket_name: str | None = None
+    cold_storage_class: str = "STANDARD_IA"
+    copy_part_size: int = 256 * 1024 * 1024
+
+
+class StorageConfig(BaseModel):
+    engine: Literal["s3", "local"] = "s3"
+    path: str = "./data"
+    cold_path: str | None = None
+
+
+class TieringConfig(BaseModel):
+    enabled: bool = False
+    cold_after_days: int = 30
+    promote_after_reads: int = 0
+    batch_size: int = 100
+    interval: int = 60 * 60
+    access_flush_interval: float = 5.0
+
+
+class RetentionRule(BaseModel):
+    owner_id: UUID
+    days: float
+
+
+class LifecycleConfig(BaseModel):
+    enabled: bool = False
+    batch_size: int = 500
+    interval: int = 5 * 60
+    retention: list[RetentionRule] = []
+
+
+class ServerConfig(BaseModel):
+    engine: Literal["uvicorn", "hypercorn"] = "uvicorn"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    keep_alive: int = 5
+    backlog: int = 2048
+    limit_concurrency: int | None = None
+    certfile: str | None = None
+    keyfile: str | None = None
+
+
+class DownloadConfig(BaseModel):
+    read_ahead_part_size: int = 8 * 1024 * 1024
+    read_ahead_window: int = 4
+
+
+class ExportConfig(BaseModel):
+    batch_size: int = 1000
 
 
 class DBConfig(BaseModel):
     uri: str
+    replicas: list[str] = []
+    replica_check_interval: float = 5.0
+    read_your_writes: float = 2.0
+    redis_uri: str | None = None
+
+
+class GroupCommitConfig(BaseModel):
+    enabled: bool = False
+    window: float = 0.005
+    max_batch: int = 500
 
 
 class CeleryConfig(BaseModel):
     broker: str
+    task_concurrency: int = 32
+
+
+class LimitsConfig(BaseModel):
+    max_transfers: int = 0
+    max_transfers_per_owner: int = 0
+    bandwidth_per_owner: int = 0
+    bandwidth_burst: int = 0
+    retry_after: int = 1
+    redis_uri: str | None = None
+    slot_ttl: int = 60 * 60
+
+
+class IntegrityConfig(BaseModel):
+    checksum_algorithm: Literal["md5", "crc32c", "sha256"] | None = "sha256"
+    scrub_enabled: bool = False
+    scrub_sample_size: int = 10
+    scrub_interval: int = 60 * 60
+
+
+class InspectionConfig(BaseModel):
+    sniff: bool = True
+    allow: list[str] = []
+    deny: list[str] = []
+    max_size: dict[str, int] = {}
+    scanner: Literal["none", "eicar", "clamd"] = "none"
+    clamd_host: str = "127.0.0.1"
+    clamd_port: int = 3310
+    scan_queue: int = 4
+    scan_timeout: float = 60.0
+
+
+class ReconciliationConfig(BaseModel):
+    enabled: bool = False
+    delete: bool = False
+    min_age: int = 24 * 60 * 60
+    stale_upload_age: int = 24 * 60 * 60
+    batch_size: int = 1000
+    interval: int = 24 * 60 * 60
+
+
+class PartitioningConfig(BaseModel):
+    scheme: Literal["none", "hash", "range"] = "none"
+    months_ahead: int = 3
+    drop_purged: bool = False
+    interval: int = 24 * 60 * 60
+
+
+class OutboxConfig(BaseModel):
+    batch_size: int = 100
+    relay_interval: float = 1.0
 
 
 class _Settings(BaseSettings):
@@ -53,9 +168,33 @@ class _Settings(BaseSettings):
         return (YamlConfigSettingsSource(settings_cls),)
 
     s3: S3Config
+    server: ServerConfig = ServerConfig()
+    storage: StorageConfig = StorageConfig()
     db: DBConfig
+    group_commit: GroupCommitConfig = GroupCommitConfig()
     celery: CeleryConfig
+    limits: LimitsConfig = LimitsConfig()
+    tiering: TieringConfig = TieringConfig()
+    lifecycle: LifecycleConfig = LifecycleConfig()
+    integrity: IntegrityConfig = IntegrityConfig()
+    inspection: InspectionConfig = InspectionConfig()
+    outbox: OutboxConfig = OutboxConfig()
+    export: ExportConfig = ExportConfig()
+    download: DownloadConfig = DownloadConfig()
+    reconciliation: ReconciliationConfig = ReconciliationConfig()
+    partitioning: PartitioningConfig = PartitioningConfig()
     logger: LoggerConfig = LoggerConfig()
 
 
-Config = _Settings()
+class _LazySettings:
+    """Настройки, читаемые из YAML при первом обращении, а не при импорте"""
+
+    _settings: _Settings | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._settings is None:
+            self._settings = _Settings()
+        return getattr(self._settings, name)
+
+
+Config = cast(_Settings, _LazySettings())
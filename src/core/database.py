@@ -1,19 +1,250 @@
-from typing import AsyncGenerator
+import asyncio
+import inspect
+import itertools
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, AsyncGenerator, Callable, Hashable, Sequence, TypeVar
 
+from sqlalchemy import Engine, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+
+from .logger import logger
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Таймаут проверки доступности реплики, секунды
+_CHECK_TIMEOUT = 2.0
+# Ключи Session.info: сессия читает только с primary или с выбранной реплики
+_PRIMARY = "primary"
+_REPLICA = "replica"
 
 engine: AsyncEngine
+replicas: "ReplicaPool | None" = None
+
+# Ключи записей, изменённых этим процессом, и время, до которого их читают с primary
+_written: dict[Hashable, float] = {}
+_read_your_writes: float = 2.0
+# Redis с метками изменённых записей, общими для всех процессов
+_shared_writes: Any = None
+_WRITTEN_PREFIX = "written:"
+# Ключи чтения текущего метода репозитория, None - чтение с primary
+_replica_keys: ContextVar[tuple[Any, ...] | None] = ContextVar(
+    "replica_keys", default=None
+)
+
+
+class ReplicaPool:
+    """
+    Реплики для чтения, выбираемые по кругу. Реплика, не ответившая на
+    проверку, пропускается до следующей успешной проверки.
+    """
+
+    def __init__(self, uris: Sequence[str], check_interval: float = 5.0) -> None:
+        self.engines = [create_async_engine(uri, future=True) for uri in uris]
+        self.healthy = list(self.engines)
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._task: asyncio.Task[None] | None = None
+
+    def pick(self) -> AsyncEngine | None:
+        """Следующая доступная реплика"""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def _ping(self, replica: AsyncEngine) -> bool:
+        async def select_one() -> None:
+            async with replica.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            await asyncio.wait_for(select_one(), _CHECK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Replica {replica.url!r} is unavailable: {e!r}")
+            return False
+        return True
+
+    async def check(self) -> None:
+        """Проверка доступности реплик"""
+        results = await asyncio.gather(*(self._ping(e) for e in self.engines))
+        healthy = [e for e, ok in zip(self.engines, results) if ok]
+        if healthy != self.healthy:
+            logger.info(f"Replicas: {len(healthy)} of {len(self.engines)} available")
+        self.healthy = healthy
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def start(self) -> None:
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for replica in self.engines:
+            await replica.dispose()
+
+
+async def record_writes(*keys: Hashable) -> None:
+    """
+    Запомнить изменённые записи: методы, читающие их по этим ключам,
+    обращаются к primary в течение `read_your_writes` секунд. Метки видны
+    другим процессам, только если они общие (`redis_uri`).
+    """
+    keys = tuple(key for key in keys if key is not None)
+    if _shared_writes is not None and keys:
+        ttl = max(1, int(_read_your_writes * 1000))
+        try:
+            async with _shared_writes.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(f"{_WRITTEN_PREFIX}{key}", 1, px=ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Write markers are not shared: {e!r}")
+    if replicas is None:
+        return
+    now = time.monotonic()
+    if len(_written) > 10000:
+        for key in [k for k, deadline in _written.items() if deadline <= now]:
+            del _written[key]
+    for key in keys:
+        _written[key] = now + _read_your_writes
+
+
+def _recently_written(keys: tuple[Any, ...]) -> bool:
+    now = time.monotonic()
+    return any(_written.get(key, 0.0) > now for key in keys if key is not None)
 
 
-async def init_engine(uri: str) -> None:
-    """Инициализация AsyncEngine"""
-    global engine
+async def _load_shared_writes(keys: tuple[Any, ...]) -> None:
+    """Добавить к меткам процесса общие метки ключей чтения"""
+    if _shared_writes is None or replicas is None or _recently_written(keys):
+        return
+    keys = tuple(key for key in keys if key is not None)
+    if not keys:
+        return
+    try:
+        async with _shared_writes.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.pttl(f"{_WRITTEN_PREFIX}{key}")
+            ttls = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Shared write markers are unavailable: {e!r}")
+        return
+    now = time.monotonic()
+    for key, ttl in zip(keys, ttls):
+        if ttl > 0:
+            _written[key] = now + ttl / 1000
+
+
+def read_replica(*key_params: str) -> Callable[[F], F]:
+    """
+    Направить запросы метода репозитория на реплику. Если запись с одним
+    из аргументов `key_params` недавно изменена, или сессия уже писала в
+    базу, чтение идёт с primary.
+
+    Без общих меток (`redis_uri`) учитываются только записи этого процесса:
+    при нескольких воркерах API запрос, попавший в другой воркер, может
+    прочитать отстающую реплику. Методы без ключей и вызовы, где ключи
+    равны None (списки и поиск без владельца), всегда читают реплику.
+    """
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        def keys(args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, ...]:
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            return tuple(bound.get(name) for name in key_params)
+
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def generator(*args: Any, **kwargs: Any) -> Any:
+                items = func(*args, **kwargs)
+                routing = keys(args, kwargs)
+                await _load_shared_writes(routing)
+                try:
+                    while True:
+                        token = _replica_keys.set(routing)
+                        try:
+                            item = await anext(items)
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            _replica_keys.reset(token)
+                        yield item
+                finally:
+                    await items.aclose()
+
+            return generator  # type:ignore[return-value]
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            routing = keys(args, kwargs)
+            await _load_shared_writes(routing)
+            token = _replica_keys.set(routing)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _replica_keys.reset(token)
+
+        return wrapper  # type:ignore[return-value]
+
+    return decorator
+
+
+class RoutingSession(Session):
+    """Сессия, выбирающая базу для каждого запроса"""
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:  # type:ignore
+        routing = _replica_keys.get()
+        is_write = self._flushing or getattr(clause, "is_dml", False)
+        if is_write:
+            self.info[_PRIMARY] = True
+        elif routing is not None and replicas is not None and _PRIMARY not in self.info:
+            if _recently_written(routing):
+                self.info[_PRIMARY] = True
+            else:
+                # One replica per session, so its reads see one state
+                replica = self.info.get(_REPLICA)
+                if replica is None or replica not in replicas.healthy:
+                    replica = self.info[_REPLICA] = replicas.pick()
+                if replica is not None:
+                    return replica.sync_engine
+        return engine.sync_engine
+
+
+async def init_engine(
+    uri: str,
+    replica_uris: Sequence[str] = (),
+    check_interval: float = 5.0,
+    read_your_writes: float = 2.0,
+    redis_uri: str | None = None,
+) -> None:
+    """Инициализация AsyncEngine, реплик и общих меток записей"""
+    global engine, replicas, _read_your_writes, _shared_writes
     engine = create_async_engine(uri, future=True)
+    _read_your_writes = read_your_writes
+    _written.clear()
+    if redis_uri:
+        from redis.asyncio import Redis
+
+        _shared_writes = Redis.from_url(redis_uri)
+    if replica_uris:
+        replicas = ReplicaPool(replica_uris, check_interval)
+        await replicas.start()
 
 
 # @asynccontextmanager
@@ -26,6 +257,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         autoflush=True,
         expire_on_commit=False,
         class_=AsyncSession,
+        sync_session_class=RoutingSession,
     )
     async with local_session() as session:
         yield session
+
+
+async def close_engine() -> None:
+    """Закрытие пула соединений AsyncEngine, реплик и общих меток"""
+    global engine, replicas, _shared_writes  # noqa: F824
+    if replicas is not None:
+        await replicas.close()
+        replicas = None
+    if _shared_writes is not None:
+        await _shared_writes.aclose()
+        _shared_writes = None
+    await engine.dispose()
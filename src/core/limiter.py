@@ -0,0 +1,230 @@
+import asyncio
+import time
+from typing import Any
+from uuid import UUID
+
+from ..utils import singleton
+from .config import LimitsConfig
+
+_KEY_PREFIX = "file_service:limits"
+
+_ACQUIRE_SCRIPT = """
+local current = redis.call('INCR', KEYS[1])
+if current > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_RELEASE_SCRIPT = """
+local current = redis.call('DECR', KEYS[1])
+if current < 0 then
+    redis.call('SET', KEYS[1], 0)
+end
+return current
+"""
+
+_CONSUME_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - amount
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(math.max(burst - tokens, burst) / rate) + 1)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class AdmissionRejected(Exception):
+    """Raised when a transfer can not be admitted right now."""
+
+    def __init__(self, status_code: int, msg: str, retry_after: int) -> None:
+        super().__init__(msg)
+        self.status_code = status_code
+        self.msg = msg
+        self.retry_after = retry_after
+
+
+class LocalLimiterBackend:
+    """Process-local counters and token buckets."""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, int] = {}
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def try_acquire(self, key: str, limit: int, ttl: int) -> bool:
+        current = self._counters.get(key, 0)
+        if current >= limit:
+            return False
+        self._counters[key] = current + 1
+        return True
+
+    async def release(self, key: str) -> None:
+        current = self._counters.get(key, 0) - 1
+        if current > 0:
+            self._counters[key] = current
+        else:
+            self._counters.pop(key, None)
+
+    async def consume(self, key: str, amount: int, rate: int, burst: int) -> float:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - ts) * rate) - amount
+        self._buckets[key] = (tokens, now)
+        return -tokens / rate if tokens < 0 else 0.0
+
+    async def close(self) -> None:
+        self._counters.clear()
+        self._buckets.clear()
+
+
+class RedisLimiterBackend:
+    """Counters and token buckets shared by all replicas through Redis."""
+
+    def __init__(self, uri: str) -> None:
+        from redis.asyncio import Redis
+
+        self._redis: Any = Redis.from_url(uri)
+        self._acquire = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self._release = self._redis.register_script(_RELEASE_SCRIPT)
+        self._consume = self._redis.register_script(_CONSUME_SCRIPT)
+
+    async def try_acquire(self, key: str, limit: int, ttl: int) -> bool:
+        return bool(await self._acquire(keys=[key], args=[limit, ttl]))
+
+    async def release(self, key: str) -> None:
+        await self._release(keys=[key])
+
+    async def consume(self, key: str, amount: int, rate: int, burst: int) -> float:
+        wait = await self._consume(keys=[key], args=[rate, burst, amount, time.time()])
+        return float(wait)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+LimiterBackend = LocalLimiterBackend | RedisLimiterBackend
+
+
+class TransferSlot:
+    """
+    An admitted transfer. Holds a global and a per-owner concurrency slot
+    until released and shapes the transfer bandwidth through `throttle`.
+    """
+
+    def __init__(
+        self, controller: "AdmissionController", keys: list[str], owner: str | None
+    ) -> None:
+        self._controller = controller
+        self._keys = keys
+        self._owner = owner
+        self._released = False
+
+    async def throttle(self, nbytes: int) -> None:
+        """Wait until the owner's token bucket allows `nbytes` more bytes."""
+        await self._controller.throttle(self._owner, nbytes)
+
+    async def release(self) -> None:
+        """Give the concurrency slots back. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        for key in self._keys:
+            await self._controller.backend.release(key)
+
+    async def __aenter__(self) -> "TransferSlot":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+
+@singleton
+class AdmissionController:
+    """
+    Admission control for uploads and downloads.
+
+    Transfers over the global limit are rejected with 503, transfers over the
+    per-owner limit with 429. Nothing is queued: the caller gets a
+    `Retry-After` hint instead.
+    """
+
+    _config: LimitsConfig = LimitsConfig()
+    _backend: LimiterBackend | None = None
+
+    @property
+    def backend(self) -> LimiterBackend:
+        if self._backend is None:
+            self._backend = LocalLimiterBackend()
+        return self._backend
+
+    def configure(self, config: LimitsConfig) -> None:
+        self._config = config
+        if config.redis_uri:
+            self._backend = RedisLimiterBackend(config.redis_uri)
+        else:
+            self._backend = LocalLimiterBackend()
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+    async def admit(self, owner_id: UUID | None) -> TransferSlot:
+        """
+        Reserve a transfer slot for the given owner.
+
+        Args:
+            owner_id (UUID | None): Owner of the transferred file.
+
+        Returns:
+            TransferSlot: The reserved slot, to be released when the transfer ends.
+
+        Raises:
+            AdmissionRejected: If the global or the per-owner limit is reached.
+        """
+        config = self._config
+        owner = str(owner_id) if owner_id else None
+        slot = TransferSlot(self, [], owner)
+
+        if config.max_transfers > 0:
+            key = f"{_KEY_PREFIX}:transfers"
+            if not await self.backend.try_acquire(
+                key, config.max_transfers, config.slot_ttl
+            ):
+                raise AdmissionRejected(
+                    503, "Too many concurrent transfers", config.retry_after
+                )
+            slot._keys.append(key)
+
+        if owner and config.max_transfers_per_owner > 0:
+            key = f"{_KEY_PREFIX}:transfers:{owner}"
+            if not await self.backend.try_acquire(
+                key, config.max_transfers_per_owner, config.slot_ttl
+            ):
+                await slot.release()
+                raise AdmissionRejected(
+                    429, "Too many concurrent transfers for owner", config.retry_after
+                )
+            slot._keys.append(key)
+
+        return slot
+
+    async def throttle(self, owner: str | None, nbytes: int) -> None:
+        rate = self._config.bandwidth_per_owner
+        if rate <= 0 or nbytes <= 0:
+            return
+        burst = self._config.bandwidth_burst or rate
+        key = f"{_KEY_PREFIX}:bandwidth:{owner or '-'}"
+        wait = await self.backend.consume(key, nbytes, rate, burst)
+        if wait > 0:
+            await asyncio.sleep(wait)
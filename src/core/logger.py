@@ -12,7 +12,15 @@ class InterceptHandler(logging.Handler):
         logger_opt.log(record.levelname, record.getMessage())
 
 
+_configured = False
+
+
 def setup_logger():
+    """Перенаправление logging в loguru, вызывается точками входа процессов"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
     logging.basicConfig(handlers=[InterceptHandler()], level=logging.INFO)
     logging.getLogger().handlers = [InterceptHandler()]
     logging.getLogger("uvicorn").handlers = []
@@ -34,6 +42,4 @@ def setup_logger():
     )
 
 
-setup_logger()
-
 __all__ = ["logger"]
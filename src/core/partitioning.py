@@ -0,0 +1,205 @@
+import re
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from sqlalchemy import Connection, text
+
+# Схемы секционирования file_meta: по хешу владельца или по месяцам создания
+PartitionScheme = Literal["hash", "range"]
+HASH: PartitionScheme = "hash"
+RANGE: PartitionScheme = "range"
+
+PARTITION_KEYS: dict[PartitionScheme, str] = {HASH: "owner_id", RANGE: "created_at"}
+DEFAULT_PARTITION = "file_meta_default"
+# Триггер и его функция, удаляющие теги удалённых строк секционированной file_meta
+_DELETE_TAGS = "file_meta_delete_tags"
+_MONTH_PARTITION = re.compile(r"file_meta_y(\d{4})m(0[1-9]|1[0-2])")
+
+
+def month_start(value: datetime | date) -> date:
+    """Первый день месяца"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первый день месяца, отстоящего на `months` месяцев"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_partition(month: date) -> str:
+    """Имя секции месяца"""
+    return f"file_meta_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_month_partition(name: str) -> date | None:
+    """Месяц секции по её имени, None для других таблиц"""
+    match = _MONTH_PARTITION.fullmatch(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def month_bounds(month: date) -> tuple[str, str]:
+    """Литералы начала месяца и начала следующего в UTC"""
+    return (
+        f"'{month.isoformat()} 00:00:00+00'",
+        f"'{add_months(month, 1).isoformat()} 00:00:00+00'",
+    )
+
+
+def month_bounds_sql(month: date) -> str:
+    """Границы секции месяца в UTC"""
+    start, end = month_bounds(month)
+    return f"FROM ({start}) TO ({end})"
+
+
+def in_month_sql(month: date) -> str:
+    """Условие на `created_at` строк месяца, те же границы, что у секции"""
+    start, end = month_bounds(month)
+    return f"created_at >= {start} AND created_at < {end}"
+
+
+def _index_definitions(conn: Connection) -> list[str]:
+    rows = conn.execute(
+        text(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+            "AND tablename = 'file_meta' AND indexname <> 'file_meta_pkey'"
+        )
+    )
+    # Индексы секционированной таблицы описаны как ON ONLY
+    return [definition.replace(" ON ONLY ", " ON ") for definition in rows.scalars()]
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """Секционирована ли file_meta"""
+    query = text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('file_meta'))"
+    )
+    return bool(conn.execute(query).scalar())
+
+
+def partition_file_meta(
+    conn: Connection,
+    scheme: PartitionScheme,
+    partitions: int = 16,
+    months_ahead: int = 3,
+    since: datetime | None = None,
+) -> None:
+    """
+    Перестроить file_meta в секционированную таблицу с теми же данными и
+    индексами. Ключ секционирования входит в первичный ключ, поэтому
+    внешний ключ file_tag.file_id заменяется триггером, удаляющим теги
+    удалённых файлов.
+    """
+    key = PARTITION_KEYS[scheme]
+    nulls = conn.execute(
+        text(f"SELECT count(*) FROM file_meta WHERE {key} IS NULL")
+    ).scalar()
+    if nulls:
+        raise ValueError(
+            f"{nulls} records of file_meta have no {key}, which is part of the "
+            "primary key of partitions: set it or delete them first"
+        )
+    indexes = _index_definitions(conn)
+    conn.execute(
+        text(
+            "CREATE TABLE file_meta_partitioned (LIKE file_meta INCLUDING DEFAULTS) "
+            f"PARTITION BY {scheme.upper()} ({key})"
+        )
+    )
+    if scheme == HASH:
+        for remainder in range(partitions):
+            conn.execute(
+                text(
+                    f"CREATE TABLE file_meta_p{remainder:02d} "
+                    "PARTITION OF file_meta_partitioned "
+                    f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+                )
+            )
+    else:
+        now = datetime.now(timezone.utc)
+        first, last = conn.execute(
+            text("SELECT min(created_at), max(created_at) FROM file_meta")
+        ).one()
+        month = month_start(min(t for t in (since, first, now) if t is not None))
+        end = add_months(month_start(max(last or now, now)), months_ahead + 1)
+        while month < end:
+            conn.execute(
+                text(
+                    f"CREATE TABLE {month_partition(month)} "
+                    f"PARTITION OF file_meta_partitioned FOR VALUES {month_bounds_sql(month)}"
+                )
+            )
+            month = add_months(month, 1)
+        # Строки вне созданных месяцев, пока обслуживание не создаст их секции
+        conn.execute(
+            text(
+                f"CREATE TABLE {DEFAULT_PARTITION} "
+                "PARTITION OF file_meta_partitioned DEFAULT"
+            )
+        )
+
+    conn.execute(text("INSERT INTO file_meta_partitioned SELECT * FROM file_meta"))
+    conn.execute(
+        text("ALTER TABLE file_tag DROP CONSTRAINT IF EXISTS file_tag_file_id_fkey")
+    )
+    conn.execute(text("DROP TABLE file_meta"))
+    conn.execute(text("ALTER TABLE file_meta_partitioned RENAME TO file_meta"))
+    conn.execute(
+        text(
+            "ALTER TABLE file_meta ADD CONSTRAINT file_meta_pkey "
+            f"PRIMARY KEY (id, {key})"
+        )
+    )
+    for definition in indexes:
+        conn.execute(text(definition))
+    # ON DELETE CASCADE внешнего ключа. Строка, перенесённая в другую секцию
+    # при изменении ключа, тоже удаляется, но к концу запроса она уже есть
+    conn.execute(
+        text(
+            f"CREATE FUNCTION {_DELETE_TAGS}() RETURNS trigger LANGUAGE plpgsql AS $$\n"
+            "BEGIN\n"
+            "    DELETE FROM file_tag WHERE file_id = OLD.id\n"
+            "    AND NOT EXISTS (SELECT 1 FROM file_meta WHERE id = OLD.id);\n"
+            "    RETURN NULL;\n"
+            "END $$"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER {_DELETE_TAGS} AFTER DELETE ON file_meta "
+            f"FOR EACH ROW EXECUTE FUNCTION {_DELETE_TAGS}()"
+        )
+    )
+
+
+def unpartition_file_meta(conn: Connection) -> None:
+    """Вернуть file_meta в одну таблицу с первичным ключом id"""
+    indexes = _index_definitions(conn)
+    conn.execute(
+        text("CREATE TABLE file_meta_plain (LIKE file_meta INCLUDING DEFAULTS)")
+    )
+    conn.execute(text("INSERT INTO file_meta_plain SELECT * FROM file_meta"))
+    conn.execute(text("DROP TABLE file_meta"))
+    conn.execute(text(f"DROP FUNCTION IF EXISTS {_DELETE_TAGS}()"))
+    conn.execute(text("ALTER TABLE file_meta_plain RENAME TO file_meta"))
+    conn.execute(
+        text("ALTER TABLE file_meta ADD CONSTRAINT file_meta_pkey PRIMARY KEY (id)")
+    )
+    for definition in indexes:
+        conn.execute(text(definition))
+    # Теги файлов из удалённых секций
+    conn.execute(
+        text(
+            "DELETE FROM file_tag WHERE NOT EXISTS "
+            "(SELECT 1 FROM file_meta WHERE file_meta.id = file_tag.file_id)"
+        )
+    )
+    conn.execute(
+        text(
+            "ALTER TABLE file_tag ADD CONSTRAINT file_tag_file_id_fkey "
+            "FOREIGN KEY (file_id) REFERENCES file_meta (id) ON DELETE CASCADE"
+        )
+    )
@@ -1,15 +1,20 @@
 from aioboto3 import Session
 
-from .config import Config
+from .config import Config, S3Config
 
 
-async def get_s3_session():
+def create_s3_client(config: S3Config):
+    """Создание S3 клиента (асинхронный контекстный менеджер)"""
     session = Session()
-    async with session.client(
+    return session.client(
         service_name="s3",
-        endpoint_url=Config.s3.path,
-        region_name=Config.s3.region_name,
-        aws_access_key_id=Config.s3.access_key_id,
-        aws_secret_access_key=Config.s3.secret_access_key,
-    ) as source:
+        endpoint_url=config.path,
+        region_name=config.region_name,
+        aws_access_key_id=config.access_key_id,
+        aws_secret_access_key=config.secret_access_key,
+    )
+
+
+async def get_s3_session():
+    async with create_s3_client(Config.s3) as source:
         yield source
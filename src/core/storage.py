@@ -0,0 +1,56 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
+
+from ..storage import StorageBackend
+from .config import S3Config, StorageConfig
+
+storage: StorageBackend
+_exit_stack: AsyncExitStack | None = None
+
+
+@asynccontextmanager
+async def open_storage(
+    config: StorageConfig, s3_config: S3Config
+) -> AsyncIterator[StorageBackend]:
+    """Открытие хранилища, выбранного в конфигурации"""
+    if config.engine == "local":
+        from ..storage.local import LocalStorage
+
+        yield LocalStorage(
+            config.path, chunk_size=s3_config.chunk_size, cold_root=config.cold_path
+        )
+        return
+
+    from ..storage.s3 import S3Storage
+    from .s3 import create_s3_client
+
+    async with create_s3_client(s3_config) as client:
+        yield S3Storage(
+            client,
+            s3_config.bucket_name,
+            chunk_size=s3_config.chunk_size,
+            cold_bucket_name=s3_config.cold_bucket_name,
+            cold_storage_class=s3_config.cold_storage_class,
+            copy_part_size=s3_config.copy_part_size,
+        )
+
+
+async def init_storage(config: StorageConfig, s3_config: S3Config) -> None:
+    """Инициализация долгоживущего хранилища процесса"""
+    global storage, _exit_stack
+    _exit_stack = AsyncExitStack()
+    storage = await _exit_stack.enter_async_context(open_storage(config, s3_config))
+
+
+async def close_storage() -> None:
+    """Закрытие хранилища процесса"""
+    global _exit_stack
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+        _exit_stack = None
+
+
+async def get_storage() -> AsyncGenerator[StorageBackend, None]:
+    """Получение хранилища процесса"""
+    global storage  # noqa: F824
+    yield storage
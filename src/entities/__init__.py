@@ -1,6 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.functions import now
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
+
+
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kwargs) -> str:
+    # SQLite stores timestamps as text: keep the microseconds format of bound
+    # datetimes so that server defaults compare correctly with parameters
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
@@ -1,16 +1,18 @@
 from datetime import datetime
-from uuid import UUID, uuid4
+from uuid import UUID
 
 import sqlalchemy as sa
 import sqlalchemy.orm as so
 
+from ..utils import uuid7
 from . import Base
+from .file_tag import FileTagEntity
 
 
 class FileMetaEntity(Base):
     __tablename__ = "file_meta"
 
-    id: so.Mapped[UUID] = so.mapped_column(sa.UUID(), primary_key=True, default=uuid4)
+    id: so.Mapped[UUID] = so.mapped_column(sa.UUID(), primary_key=True, default=uuid7)
     internal_id: so.Mapped[str] = so.mapped_column(
         sa.String(255), index=True, nullable=True
     )
@@ -25,3 +27,52 @@ class FileMetaEntity(Base):
         sa.DateTime(timezone=True), nullable=True
     )
     is_deleted: so.Mapped[bool] = so.mapped_column(sa.Boolean(), default=False)
+    # Files past this time are hidden and soft deleted by the lifecycle job
+    expires_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime(timezone=True), nullable=True
+    )
+    tier: so.Mapped[str] = so.mapped_column(
+        sa.String(16), default="hot", server_default="hot"
+    )
+    last_accessed_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime(timezone=True), nullable=True
+    )
+    read_count: so.Mapped[int] = so.mapped_column(
+        sa.Integer(), default=0, server_default="0"
+    )
+    checksum_algorithm: so.Mapped[str] = so.mapped_column(sa.String(16), nullable=True)
+    checksum: so.Mapped[str] = so.mapped_column(sa.String(128), nullable=True)
+    # Loaded for all records of a result in one extra query
+    tags: so.Mapped[list[FileTagEntity]] = so.relationship(
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by=FileTagEntity.key,
+    )
+
+    __table_args__ = (
+        sa.Index("ix_file_meta_tier_last_accessed_at", "tier", "last_accessed_at"),
+        # Search: keyset pagination, exact or prefix MIME type and size ranges
+        sa.Index("ix_file_meta_created_at_id", "created_at", "id"),
+        sa.Index(
+            "ix_file_meta_format",
+            "format",
+            postgresql_ops={"format": "varchar_pattern_ops"},
+        ),
+        sa.Index("ix_file_meta_size", "size"),
+        # Lifecycle: only files that can still expire are indexed
+        sa.Index(
+            "ix_file_meta_expires_at",
+            "expires_at",
+            postgresql_where=sa.text("expires_at IS NOT NULL AND is_deleted IS false"),
+            sqlite_where=sa.text("expires_at IS NOT NULL AND is_deleted = 0"),
+        ),
+        # Per-owner retention and owner listings, newest first
+        sa.Index("ix_file_meta_owner_id_created_at", "owner_id", "created_at"),
+        # Case-insensitive title substring search, needs the pg_trgm extension
+        sa.Index(
+            "ix_file_meta_title_trgm",
+            sa.text("lower(title) gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -0,0 +1,19 @@
+from uuid import UUID
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from . import Base
+
+
+class FileTagEntity(Base):
+    __tablename__ = "file_tag"
+
+    file_id: so.Mapped[UUID] = so.mapped_column(
+        sa.UUID(), sa.ForeignKey("file_meta.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    # None for plain tags, a string for key/value attributes
+    value: so.Mapped[str | None] = so.mapped_column(sa.String(255), nullable=True)
+
+    __table_args__ = (sa.Index("ix_file_tag_key_value", "key", "value", "file_id"),)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from . import Base
+
+
+class OutboxEntity(Base):
+    __tablename__ = "outbox"
+
+    id: so.Mapped[int] = so.mapped_column(
+        sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    task: so.Mapped[str] = so.mapped_column(sa.String(255), nullable=False)
+    payload: so.Mapped[dict[str, Any]] = so.mapped_column(sa.JSON(), nullable=False)
+    created_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime(timezone=True), default=sa.func.now()
+    )
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from . import Base
+
+
+class ReconciliationCheckpointEntity(Base):
+    __tablename__ = "reconciliation_checkpoint"
+
+    location: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    last_key: so.Mapped[str] = so.mapped_column(sa.String(255), nullable=False)
+    updated_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime(timezone=True), default=sa.func.now(), onupdate=sa.func.now()
+    )
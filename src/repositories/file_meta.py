@@ -1,10 +1,52 @@
-from typing import Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Mapping, Sequence, Tuple, cast
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    Table,
+    and_,
+    bindparam,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from ..core.database import read_replica, record_writes
 from ..entities.file_meta import FileMetaEntity
+from ..entities.file_tag import FileTagEntity
+from ..utils import uuid7
+from .outbox import OutboxRepository
+
+# Celery task purging the content of a soft-deleted file
+DELETE_FILE_TASK = "delete_file_from_s3"
+
+# Columns of the list and info responses, read as plain rows
+ROW_COLUMNS = (
+    FileMetaEntity.id,
+    FileMetaEntity.owner_id,
+    FileMetaEntity.title,
+    FileMetaEntity.size,
+    FileMetaEntity.format,
+    FileMetaEntity.created_at,
+    FileMetaEntity.expires_at,
+    FileMetaEntity.is_deleted,
+    FileMetaEntity.tier,
+    FileMetaEntity.checksum_algorithm,
+    FileMetaEntity.checksum,
+)
+
+# Bound on created_at around the time in a UUIDv7 identifier, which lets
+# PostgreSQL skip the other partitions of a table partitioned by created_at
+ID_TIME_WINDOW = timedelta(days=1)
 
 
 class FileMetaRepository:
@@ -14,12 +56,64 @@ class FileMetaRepository:
     """
 
     @staticmethod
+    def _not_expired() -> ColumnElement[bool]:
+        return or_(
+            FileMetaEntity.expires_at.is_(None),
+            FileMetaEntity.expires_at > datetime.now(timezone.utc),
+        )
+
+    @staticmethod
+    def _by_id(_id: UUID, created_near: datetime | None) -> list[ColumnElement[bool]]:
+        conditions = [FileMetaEntity.id == _id]
+        if created_near is not None:
+            conditions.append(
+                FileMetaEntity.created_at.between(
+                    created_near - ID_TIME_WINDOW, created_near + ID_TIME_WINDOW
+                )
+            )
+        return conditions
+
+    @staticmethod
+    def _filter_by_tags(
+        query: Select[Any], tags: Mapping[str, str | None]
+    ) -> Select[Any]:
+        for key, value in tags.items():
+            condition = exists().where(
+                FileTagEntity.file_id == FileMetaEntity.id, FileTagEntity.key == key
+            )
+            if value is not None:
+                condition = condition.where(FileTagEntity.value == value)
+            query = query.where(condition)
+        return query
+
+    @staticmethod
+    def _list_query(
+        query: Select[Any],
+        owner_id: UUID | None,
+        show_deleted: bool,
+        tags: Mapping[str, str | None] | None,
+    ) -> Select[Any]:
+        if owner_id:
+            query = query.where(FileMetaEntity.owner_id == owner_id)
+
+        if not show_deleted:
+            query = query.where(
+                FileMetaEntity.is_deleted.is_(False), FileMetaRepository._not_expired()
+            )
+
+        if tags:
+            query = FileMetaRepository._filter_by_tags(query, tags)
+        return query
+
+    @staticmethod
+    @read_replica("owner_id")
     async def get_list(
         db: AsyncSession,
         limit: int = 10,
         offset: int = 0,
         owner_id: UUID | None = None,
         show_deleted: bool = False,
+        tags: Mapping[str, str | None] | None = None,
     ) -> Tuple[Sequence[FileMetaEntity], int]:
         """
         Retrieve a list of FileMetaEntity records from the database with optional filtering,
@@ -29,19 +123,17 @@ class FileMetaRepository:
             limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
             offset (int, optional): The number of records to skip before starting to collect the result set. Defaults to 0.
             owner_id (UUID | None, optional): Filter records by the owner's UUID. Defaults to None.
-            show_deleted (bool, optional): Whether to include deleted records in the result set. Defaults to False.
+            show_deleted (bool, optional): Whether to include deleted and expired records in the result set. Defaults to False.
+            tags (Mapping[str, str | None] | None, optional): Tags the records must have; a None value
+                matches the tag with any value. Defaults to None.
         Returns:
             Tuple[Sequence[FileMetaEntity], int]: A tuple containing:
                 - A sequence of FileMetaEntity records matching the query.
                 - The total count of records matching the query (ignoring pagination).
         """
-        query = select(FileMetaEntity)
-
-        if owner_id:
-            query = query.where(FileMetaEntity.owner_id == owner_id)
-
-        if not show_deleted:
-            query = query.where(FileMetaEntity.is_deleted.is_(False))
+        query = FileMetaRepository._list_query(
+            select(FileMetaEntity), owner_id, show_deleted, tags
+        )
 
         count_query = select(func.count()).select_from(query.subquery())
         total_count = (await db.execute(count_query)).scalar() or 0
@@ -54,6 +146,248 @@ class FileMetaRepository:
 
         return records, total_count
 
+    @staticmethod
+    @read_replica("owner_id")
+    async def get_rows(
+        db: AsyncSession,
+        limit: int = 10,
+        offset: int = 0,
+        owner_id: UUID | None = None,
+        show_deleted: bool = False,
+        tags: Mapping[str, str | None] | None = None,
+    ) -> Tuple[Sequence[Row[Any]], int]:
+        """
+        Same as `get_list`, but selects only `ROW_COLUMNS` as rows, without
+        building ORM entities or loading tags.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
+            offset (int, optional): The number of records to skip before starting to collect the result set. Defaults to 0.
+            owner_id (UUID | None, optional): Filter records by the owner's UUID. Defaults to None.
+            show_deleted (bool, optional): Whether to include deleted and expired records in the result set. Defaults to False.
+            tags (Mapping[str, str | None] | None, optional): Tags the records must have; a None value
+                matches the tag with any value. Defaults to None.
+
+        Returns:
+            Tuple[Sequence[Row[Any]], int]: The rows of the page and the total count of
+            records matching the query.
+        """
+        query = FileMetaRepository._list_query(
+            select(*ROW_COLUMNS), owner_id, show_deleted, tags
+        )
+
+        count_query = select(func.count()).select_from(query.subquery())
+        total_count = (await db.execute(count_query)).scalar() or 0
+
+        query = (
+            query.order_by(FileMetaEntity.created_at.desc()).limit(limit).offset(offset)
+        )
+        return (await db.execute(query)).all(), total_count
+
+    @staticmethod
+    @read_replica("_id")
+    async def get_row_by_id(
+        db: AsyncSession, _id: UUID, created_near: datetime | None = None
+    ) -> Row[Any]:
+        """
+        Retrieve `ROW_COLUMNS` of a record by its unique identifier.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            _id (UUID): The unique identifier of the record.
+            created_near (datetime | None, optional): Approximate creation time of
+                the record, limits the search to `ID_TIME_WINDOW` around it.
+                Defaults to None.
+
+        Returns:
+            Row[Any]: The row of the record.
+
+        Raises:
+            NoResultFound: If there is no record with this ID.
+        """
+        query = select(*ROW_COLUMNS).where(
+            *FileMetaRepository._by_id(_id, created_near)
+        )
+        return (await db.execute(query)).one()
+
+    @staticmethod
+    @read_replica()
+    async def get_tags(
+        db: AsyncSession, ids: Sequence[UUID]
+    ) -> dict[UUID, dict[str, str | None]]:
+        """
+        Retrieve the tags of many records in one query.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            ids (Sequence[UUID]): The unique identifiers of the records.
+
+        Returns:
+            dict[UUID, dict[str, str | None]]: Tags by record ID; records without
+            tags are absent.
+        """
+        if not ids:
+            return {}
+        query = (
+            select(FileTagEntity.file_id, FileTagEntity.key, FileTagEntity.value)
+            .where(FileTagEntity.file_id.in_(ids))
+            .order_by(FileTagEntity.file_id, FileTagEntity.key)
+        )
+        tags: dict[UUID, dict[str, str | None]] = {}
+        for file_id, key, value in (await db.execute(query)).tuples():
+            tags.setdefault(file_id, {})[key] = value
+        return tags
+
+    @staticmethod
+    def _filter_search(
+        query: Select[Any],
+        q: str | None,
+        format: str | None,
+        owner_id: UUID | None,
+        size_min: int | None,
+        size_max: int | None,
+        created_from: datetime | None,
+        created_to: datetime | None,
+        tags: Mapping[str, str | None] | None,
+    ) -> Select[Any]:
+        if q:
+            escaped = q.lower().translate({ord(c): f"\\{c}" for c in "\\%_"})
+            query = query.where(
+                func.lower(FileMetaEntity.title).like(f"%{escaped}%", escape="\\")
+            )
+        if format:
+            if format.endswith("/*"):
+                query = query.where(
+                    FileMetaEntity.format.startswith(format[:-1], autoescape=True)
+                )
+            else:
+                query = query.where(FileMetaEntity.format == format)
+        if owner_id:
+            query = query.where(FileMetaEntity.owner_id == owner_id)
+        if size_min is not None:
+            query = query.where(FileMetaEntity.size >= size_min)
+        if size_max is not None:
+            query = query.where(FileMetaEntity.size <= size_max)
+        if created_from is not None:
+            query = query.where(FileMetaEntity.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(FileMetaEntity.created_at < created_to)
+        if tags:
+            query = FileMetaRepository._filter_by_tags(query, tags)
+        return query
+
+    @staticmethod
+    @read_replica("owner_id")
+    async def search(
+        db: AsyncSession,
+        q: str | None = None,
+        format: str | None = None,
+        owner_id: UUID | None = None,
+        size_min: int | None = None,
+        size_max: int | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        tags: Mapping[str, str | None] | None = None,
+        after: Tuple[datetime, UUID] | None = None,
+        limit: int = 10,
+    ) -> Sequence[FileMetaEntity]:
+        """
+        Search not deleted and not expired records, newest first, with keyset pagination.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            q (str | None, optional): Case-insensitive substring of the title. Defaults to None.
+            format (str | None, optional): MIME type, or a `type/*` prefix. Defaults to None.
+            owner_id (UUID | None, optional): Filter records by the owner's UUID. Defaults to None.
+            size_min (int | None, optional): The minimum size in bytes, inclusive. Defaults to None.
+            size_max (int | None, optional): The maximum size in bytes, inclusive. Defaults to None.
+            created_from (datetime | None, optional): The earliest creation time, inclusive. Defaults to None.
+            created_to (datetime | None, optional): The latest creation time, exclusive. Defaults to None.
+            tags (Mapping[str, str | None] | None, optional): Tags the records must have; a None value
+                matches the tag with any value. Defaults to None.
+            after (Tuple[datetime, UUID] | None, optional): The creation time and ID of the last
+                record of the previous page. Defaults to None.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
+
+        Returns:
+            Sequence[FileMetaEntity]: The matching records.
+        """
+        query = FileMetaRepository._filter_search(
+            select(FileMetaEntity).where(
+                FileMetaEntity.is_deleted.is_(False), FileMetaRepository._not_expired()
+            ),
+            q,
+            format,
+            owner_id,
+            size_min,
+            size_max,
+            created_from,
+            created_to,
+            tags,
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(FileMetaEntity.created_at, FileMetaEntity.id) < after
+            )
+
+        query = query.order_by(
+            FileMetaEntity.created_at.desc(), FileMetaEntity.id.desc()
+        ).limit(limit)
+        return (await db.execute(query)).scalars().all()
+
+    @staticmethod
+    @read_replica("owner_id")
+    async def stream_rows(
+        db: AsyncSession,
+        show_deleted: bool = False,
+        batch_size: int = 1000,
+        q: str | None = None,
+        format: str | None = None,
+        owner_id: UUID | None = None,
+        size_min: int | None = None,
+        size_max: int | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        tags: Mapping[str, str | None] | None = None,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Read `ROW_COLUMNS` of all matching records, oldest first, through a
+        server-side cursor, so that only one batch is held in memory at a time.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            show_deleted (bool, optional): Whether to include deleted and expired records.
+                Defaults to False.
+            batch_size (int, optional): The number of rows fetched and yielded at once.
+                Defaults to 1000.
+            q, format, owner_id, size_min, size_max, created_from, created_to, tags:
+                Filters, as in `search`.
+
+        Yields:
+            Sequence[Row[Any]]: The next batch of rows.
+        """
+        query = FileMetaRepository._filter_search(
+            select(*ROW_COLUMNS),
+            q,
+            format,
+            owner_id,
+            size_min,
+            size_max,
+            created_from,
+            created_to,
+            tags,
+        )
+        if not show_deleted:
+            query = query.where(
+                FileMetaEntity.is_deleted.is_(False), FileMetaRepository._not_expired()
+            )
+        query = query.order_by(FileMetaEntity.created_at, FileMetaEntity.id)
+
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
     @staticmethod
     async def create(
         db: AsyncSession,
@@ -62,6 +396,10 @@ class FileMetaRepository:
         title: str,
         size: int = 0,
         format: str | None = None,
+        checksum_algorithm: str | None = None,
+        checksum: str | None = None,
+        tags: Mapping[str, str | None] | None = None,
+        expires_at: datetime | None = None,
     ) -> FileMetaEntity:
         """
         Creates a new FileMetaEntity record in the database.
@@ -72,6 +410,12 @@ class FileMetaRepository:
             title (str): The title of the file.
             size (int, optional): The size of the file in bytes. Defaults to 0.
             format (str, optional): The format or extension of the file. Defaults to None.
+            checksum_algorithm (str, optional): The algorithm of `checksum`. Defaults to None.
+            checksum (str, optional): The hex digest of the file content. Defaults to None.
+            tags (Mapping[str, str | None], optional): Tags and key/value attributes of the file.
+                Defaults to None.
+            expires_at (datetime, optional): The time the file expires at. Defaults to None,
+                which keeps it until it is deleted.
 
         Returns:
             FileMetaEntity: The newly created FileMetaEntity object.
@@ -82,43 +426,559 @@ class FileMetaRepository:
             title=title,
             size=size,
             format=format,
+            checksum_algorithm=checksum_algorithm,
+            checksum=checksum,
+            expires_at=expires_at,
+            tags=[
+                FileTagEntity(key=key, value=value)
+                for key, value in sorted((tags or {}).items())
+            ],
         )
         db.add(obj)
         await db.commit()
+        await record_writes(obj.id, owner_id)
         return obj
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, _id: UUID) -> FileMetaEntity:
+    async def create_many(
+        db: AsyncSession, records: Sequence[Mapping[str, Any]]
+    ) -> list[FileMetaEntity]:
+        """
+        Creates many FileMetaEntity records with one multi-row INSERT ... RETURNING
+        and one commit.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            records (Sequence[Mapping[str, Any]]): Keyword arguments of `create` for
+                each record.
+
+        Returns:
+            list[FileMetaEntity]: The created records, in the order of `records`.
+        """
+        rows: list[dict[str, Any]] = []
+        tag_rows: list[dict[str, Any]] = []
+        for record in records:
+            # The same columns in every row, so that they share one statement
+            row = {
+                "id": uuid7(),
+                "internal_id": record["internal_id"],
+                "owner_id": record["owner_id"],
+                "title": record["title"],
+                "size": record.get("size", 0),
+                "format": record.get("format"),
+                "checksum_algorithm": record.get("checksum_algorithm"),
+                "checksum": record.get("checksum"),
+                "expires_at": record.get("expires_at"),
+            }
+            rows.append(row)
+            tag_rows.extend(
+                {"file_id": row["id"], "key": key, "value": value}
+                for key, value in sorted((record.get("tags") or {}).items())
+            )
+
+        result = await db.scalars(
+            insert(FileMetaEntity).returning(FileMetaEntity), rows
+        )
+        objs = {obj.id: obj for obj in result}
+        tags: dict[UUID, list[FileTagEntity]] = {_id: [] for _id in objs}
+        if tag_rows:
+            result_tags = await db.scalars(
+                insert(FileTagEntity).returning(FileTagEntity), tag_rows
+            )
+            for tag in result_tags:
+                tags[tag.file_id].append(tag)
+        await db.commit()
+
+        created = [objs[row["id"]] for row in rows]
+        for obj in created:
+            set_committed_value(
+                obj, "tags", sorted(tags[obj.id], key=lambda tag: tag.key)
+            )
+        await record_writes(*objs, *(obj.owner_id for obj in created))
+        return created
+
+    @staticmethod
+    @read_replica("_id")
+    async def get_by_id(
+        db: AsyncSession, _id: UUID, created_near: datetime | None = None
+    ) -> FileMetaEntity:
         """
         Retrieve a FileMetaEntity by its unique identifier.
 
         Args:
             db (AsyncSession): The database session to use for the query.
             _id (UUID): The unique identifier of the FileMetaEntity to retrieve.
+            created_near (datetime | None, optional): Approximate creation time of
+                the record, limits the search to `ID_TIME_WINDOW` around it.
+                Defaults to None.
 
         Returns:
             FileMetaEntity | None: The FileMetaEntity instance if found, otherwise None.
         """
-        return await db.get_one(FileMetaEntity, _id)
+        if created_near is None:
+            return await db.get_one(FileMetaEntity, _id)
+        query = select(FileMetaEntity).where(
+            *FileMetaRepository._by_id(_id, created_near)
+        )
+        return (await db.execute(query)).scalar_one()
+
+    @staticmethod
+    async def update_tags(
+        db: AsyncSession,
+        _id: UUID,
+        set_tags: Mapping[str, str | None],
+        remove_tags: Sequence[str] = (),
+    ) -> FileMetaEntity:
+        """
+        Add, change and remove tags of a file record.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            _id (UUID): The unique identifier of the file metadata record.
+            set_tags (Mapping[str, str | None]): Tags to add or to change the value of.
+            remove_tags (Sequence[str], optional): Keys of the tags to remove. Defaults to ().
+
+        Returns:
+            FileMetaEntity: The updated FileMetaEntity object.
+        """
+        # May be loaded from a replica earlier in the session
+        obj = await db.get_one(FileMetaEntity, _id, populate_existing=True)
+        tags = {tag.key: tag for tag in obj.tags}
+        for key in remove_tags:
+            if key in tags and key not in set_tags:
+                obj.tags.remove(tags.pop(key))
+        for key, value in set_tags.items():
+            if key in tags:
+                tags[key].value = value
+            else:
+                tags[key] = FileTagEntity(key=key, value=value)
+                obj.tags.append(tags[key])
+        obj.tags.sort(key=lambda tag: tag.key)
+        await db.commit()
+        await record_writes(_id, obj.owner_id)
+        return obj
+
+    @staticmethod
+    async def set_owner(db: AsyncSession, _id: UUID, owner_id: UUID) -> FileMetaEntity:
+        """
+        Assign a file record to another owner.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            _id (UUID): The unique identifier of the file metadata record.
+            owner_id (UUID): The unique identifier of the new owner.
+
+        Returns:
+            FileMetaEntity: The updated FileMetaEntity object.
+        """
+        obj = await db.get_one(FileMetaEntity, _id, populate_existing=True)
+        previous_owner_id, obj.owner_id = obj.owner_id, owner_id
+        await db.commit()
+        await record_writes(_id, previous_owner_id, owner_id)
+        return obj
 
     @staticmethod
-    async def delete_by_id(db: AsyncSession, _id: UUID, mark: bool = True) -> None:
+    async def delete_by_id(
+        db: AsyncSession,
+        _id: UUID,
+        mark: bool = True,
+        created_near: datetime | None = None,
+    ) -> None:
         """
         Deletes a file metadata record from the database by its ID.
+        Marking a record as deleted also stores the purge event in the outbox
+        within the same transaction.
 
         Args:
             db (AsyncSession): The asynchronous database session to use for executing the query.
             _id (UUID): The unique identifier of the file metadata record to delete.
+            mark (bool, optional): Whether to only mark the record as deleted. Defaults to True.
+            created_near (datetime | None, optional): Approximate creation time of
+                the record, limits the search to `ID_TIME_WINDOW` around it.
+                Defaults to None.
 
         Returns:
             None
         """
-        stmt = update(FileMetaEntity).where(FileMetaEntity.id == _id)
+        stmt = update(FileMetaEntity).where(
+            *FileMetaRepository._by_id(_id, created_near)
+        )
 
         if mark:
             stmt = stmt.values(is_deleted=True)
         else:
             stmt = stmt.values(deleted_at=func.now())
 
+        owner_ids = (
+            (await db.execute(stmt.returning(FileMetaEntity.owner_id))).scalars().all()
+        )
+        if mark and owner_ids:
+            OutboxRepository.add(db, DELETE_FILE_TASK, {"file_id": str(_id)})
+        await db.commit()
+        await record_writes(_id, *owner_ids)
+
+    @staticmethod
+    async def _mark_expired(
+        db: AsyncSession,
+        conditions: Sequence[ColumnElement[bool]],
+        order_by: Any,
+        limit: int,
+    ) -> Sequence[UUID]:
+        query = (
+            select(FileMetaEntity.id)
+            .where(FileMetaEntity.is_deleted.is_(False), *conditions)
+            .order_by(order_by)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        ids = (await db.execute(query)).scalars().all()
+        if ids:
+            stmt = (
+                update(FileMetaEntity)
+                .where(FileMetaEntity.id.in_(ids))
+                .values(is_deleted=True)
+            )
+            await db.execute(stmt)
+            for _id in ids:
+                OutboxRepository.add(db, DELETE_FILE_TASK, {"file_id": str(_id)})
+        await db.commit()
+        return ids
+
+    @staticmethod
+    async def expire_due(
+        db: AsyncSession, now: datetime, limit: int = 100
+    ) -> Sequence[UUID]:
+        """
+        Mark records whose `expires_at` has passed as deleted, like `delete_by_id`,
+        storing their purge events in the outbox within the same transaction.
+        Records locked by another run are skipped.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            now (datetime): The current time.
+            limit (int, optional): The maximum number of records to mark. Defaults to 100.
+
+        Returns:
+            Sequence[UUID]: The IDs of the marked records.
+        """
+        return await FileMetaRepository._mark_expired(
+            db,
+            [FileMetaEntity.expires_at <= now],
+            FileMetaEntity.expires_at,
+            limit,
+        )
+
+    @staticmethod
+    async def expire_retained(
+        db: AsyncSession, owner_id: UUID, created_before: datetime, limit: int = 100
+    ) -> Sequence[UUID]:
+        """
+        Mark records of an owner created before the retention threshold as
+        deleted, the same way as `expire_due`.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            owner_id (UUID): The unique identifier of the owner.
+            created_before (datetime): Records created before this time are marked.
+            limit (int, optional): The maximum number of records to mark. Defaults to 100.
+
+        Returns:
+            Sequence[UUID]: The IDs of the marked records.
+        """
+        return await FileMetaRepository._mark_expired(
+            db,
+            [
+                FileMetaEntity.owner_id == owner_id,
+                FileMetaEntity.created_at < created_before,
+            ],
+            FileMetaEntity.created_at,
+            limit,
+        )
+
+    @staticmethod
+    async def record_access(
+        db: AsyncSession, accesses: Mapping[UUID, Tuple[int, datetime]]
+    ) -> None:
+        """
+        Apply accumulated read statistics to many records in one statement.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            accesses (Mapping[UUID, Tuple[int, datetime]]): Number of reads and the
+                last access time per record ID.
+
+        Returns:
+            None
+        """
+        if not accesses:
+            return
+        table = cast(Table, FileMetaEntity.__table__)
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(
+                read_count=table.c.read_count + bindparam("_reads"),
+                last_accessed_at=bindparam("_accessed_at"),
+            )
+        )
+        await db.execute(
+            stmt,
+            [
+                {"_id": _id, "_reads": reads, "_accessed_at": accessed_at}
+                for _id, (reads, accessed_at) in accesses.items()
+            ],
+        )
+        await db.commit()
+
+    @staticmethod
+    async def get_cold_candidates(
+        db: AsyncSession, accessed_before: datetime, limit: int = 100
+    ) -> Sequence[FileMetaEntity]:
+        """
+        Retrieve hot records that were not read since the given time.
+        Records that were never read are judged by their creation time.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            accessed_before (datetime): The access time threshold.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 100.
+
+        Returns:
+            Sequence[FileMetaEntity]: The records to move to the cold tier.
+        """
+        query = (
+            select(FileMetaEntity)
+            .where(
+                FileMetaEntity.tier == "hot",
+                FileMetaEntity.is_deleted.is_(False),
+                FileMetaEntity.internal_id.is_not(None),
+                or_(
+                    FileMetaEntity.last_accessed_at < accessed_before,
+                    and_(
+                        FileMetaEntity.last_accessed_at.is_(None),
+                        FileMetaEntity.created_at < accessed_before,
+                    ),
+                ),
+            )
+            .limit(limit)
+        )
+        return (await db.execute(query)).scalars().all()
+
+    @staticmethod
+    async def get_hot_candidates(
+        db: AsyncSession, min_reads: int, limit: int = 100
+    ) -> Sequence[FileMetaEntity]:
+        """
+        Retrieve cold records that were read at least `min_reads` times since
+        they were moved to the cold tier.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            min_reads (int): The read count threshold.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 100.
+
+        Returns:
+            Sequence[FileMetaEntity]: The records to move back to the hot tier.
+        """
+        query = (
+            select(FileMetaEntity)
+            .where(
+                FileMetaEntity.tier == "cold",
+                FileMetaEntity.is_deleted.is_(False),
+                FileMetaEntity.read_count >= min_reads,
+            )
+            .limit(limit)
+        )
+        return (await db.execute(query)).scalars().all()
+
+    @staticmethod
+    async def set_tier(db: AsyncSession, _id: UUID, tier: str) -> None:
+        """
+        Record the storage tier of a file and restart its read counter.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            _id (UUID): The unique identifier of the file metadata record.
+            tier (str): The storage tier the object was moved to.
+
+        Returns:
+            None
+        """
+        stmt = (
+            update(FileMetaEntity)
+            .where(FileMetaEntity.id == _id)
+            .values(tier=tier, read_count=0)
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    @staticmethod
+    async def postpone_tiering(db: AsyncSession, ids: Sequence[UUID]) -> None:
+        """
+        Take files out of the tier migration candidates for a while: a hot file
+        until it is not read for the cold threshold again, a cold file until it
+        is read enough times again.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            ids (Sequence[UUID]): The unique identifiers of the records.
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+        stmt = (
+            update(FileMetaEntity)
+            .where(FileMetaEntity.id.in_(ids))
+            .values(last_accessed_at=datetime.now(timezone.utc), read_count=0)
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    @staticmethod
+    async def get_id_range(db: AsyncSession) -> Tuple[datetime | None, UUID | None]:
+        """
+        Retrieve the creation time of the oldest file and the greatest file ID,
+        both read from the ends of their indexes.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+
+        Returns:
+            Tuple[datetime | None, UUID | None]: The oldest creation time and the
+            greatest ID, None for an empty table.
+        """
+        result = await db.execute(
+            select(func.min(FileMetaEntity.created_at), func.max(FileMetaEntity.id))
+        )
+        oldest, greatest = result.one()
+        return oldest, greatest
+
+    @staticmethod
+    async def get_checksum_sample(
+        db: AsyncSession, start_id: UUID, limit: int = 10
+    ) -> Sequence[FileMetaEntity]:
+        """
+        Retrieve up to `limit` stored files with a checksum, walking the primary
+        key index from `start_id` and wrapping around to the beginning.
+        A random `start_id` gives a random sample without scanning the table.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            start_id (UUID): The ID to start the sample from.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
+
+        Returns:
+            Sequence[FileMetaEntity]: The sampled records.
+        """
+        query = (
+            select(FileMetaEntity)
+            .where(
+                FileMetaEntity.checksum.is_not(None),
+                FileMetaEntity.is_deleted.is_(False),
+            )
+            .order_by(FileMetaEntity.id)
+        )
+        result = await db.execute(
+            query.where(FileMetaEntity.id >= start_id).limit(limit)
+        )
+        records = list(result.scalars().all())
+        if len(records) < limit:
+            result = await db.execute(
+                query.where(FileMetaEntity.id < start_id).limit(limit - len(records))
+            )
+            records += result.scalars().all()
+        return records
+
+    @staticmethod
+    async def get_internal_ids(
+        db: AsyncSession,
+        tiers: Sequence[str],
+        after_key: str | None = None,
+        after_id: UUID | None = None,
+        limit: int = 1000,
+    ) -> Sequence[Row[Tuple[str, UUID, datetime]]]:
+        """
+        Retrieve the storage keys of records whose objects should exist, ordered
+        by key along the `internal_id` index. Pages continue after the
+        (`after_key`, `after_id`) pair of the previous page's last row.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            tiers (Sequence[str]): The storage tiers to include.
+            after_key (str | None, optional): The key to continue after. Defaults to None.
+            after_id (UUID | None, optional): The ID to continue after within `after_key`.
+                Defaults to None, which skips all records with `after_key`.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 1000.
+
+        Returns:
+            Sequence[Row[Tuple[str, UUID, datetime]]]: The key, ID and creation time of each record.
+        """
+        query = select(
+            FileMetaEntity.internal_id, FileMetaEntity.id, FileMetaEntity.created_at
+        ).where(
+            FileMetaEntity.internal_id.is_not(None),
+            FileMetaEntity.deleted_at.is_(None),
+            FileMetaEntity.tier.in_(tiers),
+        )
+        if after_key is not None and after_id is not None:
+            query = query.where(
+                or_(
+                    FileMetaEntity.internal_id > after_key,
+                    and_(
+                        FileMetaEntity.internal_id == after_key,
+                        FileMetaEntity.id > after_id,
+                    ),
+                )
+            )
+        elif after_key is not None:
+            query = query.where(FileMetaEntity.internal_id > after_key)
+        query = query.order_by(FileMetaEntity.internal_id, FileMetaEntity.id).limit(
+            limit
+        )
+        return (await db.execute(query)).all()
+
+    @staticmethod
+    async def get_existing_internal_ids(
+        db: AsyncSession, internal_ids: Sequence[str]
+    ) -> set[str]:
+        """
+        Select the keys that belong to records whose objects should exist.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            internal_ids (Sequence[str]): The storage keys to look up.
+
+        Returns:
+            set[str]: The keys referenced by such records.
+        """
+        if not internal_ids:
+            return set()
+        query = select(FileMetaEntity.internal_id).where(
+            FileMetaEntity.internal_id.in_(internal_ids),
+            FileMetaEntity.deleted_at.is_(None),
+        )
+        return set((await db.execute(query)).scalars().all())
+
+    @staticmethod
+    async def mark_purged(db: AsyncSession, ids: Sequence[UUID]) -> None:
+        """
+        Mark records as deleted together with their content.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            ids (Sequence[UUID]): The unique identifiers of the records.
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+        stmt = (
+            update(FileMetaEntity)
+            .where(FileMetaEntity.id.in_(ids))
+            .values(is_deleted=True, deleted_at=func.now())
+        )
         await db.execute(stmt)
         await db.commit()
@@ -0,0 +1,69 @@
+from typing import Any, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..entities.outbox import OutboxEntity
+
+
+class OutboxRepository:
+    """
+    This repository provides methods for interacting with the `OutboxEntity` table in the database.
+    Events are added within the caller's transaction and removed once they are relayed.
+    """
+
+    @staticmethod
+    def add(db: AsyncSession, task: str, payload: dict[str, Any]) -> OutboxEntity:
+        """
+        Add an event to the session without committing, so that it is stored
+        in the same transaction as the change it describes.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            task (str): The name of the Celery task to send.
+            payload (dict[str, Any]): The keyword arguments of the task.
+
+        Returns:
+            OutboxEntity: The pending OutboxEntity object.
+        """
+        obj = OutboxEntity(task=task, payload=payload)
+        db.add(obj)
+        return obj
+
+    @staticmethod
+    async def get_batch(db: AsyncSession, limit: int = 100) -> Sequence[OutboxEntity]:
+        """
+        Retrieve the oldest events and lock them until the end of the transaction.
+        Events locked by another relay are skipped.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            limit (int, optional): The maximum number of events to retrieve. Defaults to 100.
+
+        Returns:
+            Sequence[OutboxEntity]: The events in insertion order.
+        """
+        query = (
+            select(OutboxEntity)
+            .order_by(OutboxEntity.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (await db.execute(query)).scalars().all()
+
+    @staticmethod
+    async def delete_by_ids(db: AsyncSession, ids: Sequence[int]) -> None:
+        """
+        Delete relayed events.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            ids (Sequence[int]): The identifiers of the events to delete.
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+        await db.execute(delete(OutboxEntity).where(OutboxEntity.id.in_(ids)))
+        await db.commit()
@@ -0,0 +1,147 @@
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.partitioning import (
+    DEFAULT_PARTITION,
+    HASH,
+    RANGE,
+    PartitionScheme,
+    in_month_sql,
+    month_bounds_sql,
+    month_partition,
+    parse_month_partition,
+)
+
+
+class PartitionRepository:
+    """
+    This repository provides methods for maintaining the partitions of the `file_meta` table.
+    Partitions exist on PostgreSQL only, after the partitioning migration; a month partition
+    of the range scheme holds the records created in that month.
+    """
+
+    @staticmethod
+    async def get_scheme(db: AsyncSession) -> PartitionScheme | None:
+        """
+        Retrieve the partitioning scheme of the `file_meta` table.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+
+        Returns:
+            PartitionScheme | None: The scheme, or None when the table is not partitioned.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return None
+        strategy = await db.scalar(
+            text(
+                "SELECT partstrat::text FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('file_meta')"
+            )
+        )
+        return {"h": HASH, "r": RANGE}.get(strategy or "")
+
+    @staticmethod
+    async def get_months(db: AsyncSession) -> list[date]:
+        """
+        Retrieve the months that have a partition.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+
+        Returns:
+            list[date]: The first days of the months, in order.
+        """
+        names = await db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass('file_meta')"
+            )
+        )
+        months = (parse_month_partition(name) for name in names)
+        return sorted(month for month in months if month is not None)
+
+    @staticmethod
+    async def create_month(db: AsyncSession, month: date) -> None:
+        """
+        Create the partition of a month. Records of the month already stored in
+        the default partition are moved to it.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            month (date): The first day of the month.
+
+        Returns:
+            None
+        """
+        name, bounds = month_partition(month), month_bounds_sql(month)
+        in_month = in_month_sql(month)
+        misplaced = await db.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})")
+        )
+        if not misplaced:
+            await db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF file_meta FOR VALUES {bounds}")
+            )
+        else:
+            await db.execute(
+                text(f"ALTER TABLE file_meta DETACH PARTITION {DEFAULT_PARTITION}")
+            )
+            await db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF file_meta FOR VALUES {bounds}")
+            )
+            await db.execute(
+                text(
+                    f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} "
+                    f"WHERE {in_month}"
+                )
+            )
+            await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"))
+            await db.execute(
+                text(
+                    f"ALTER TABLE file_meta ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+                )
+            )
+        await db.commit()
+
+    @staticmethod
+    async def is_purged(db: AsyncSession, month: date) -> bool:
+        """
+        Check that the content of every file of a month is purged.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            month (date): The first day of the month.
+
+        Returns:
+            bool: True if no record of the month is left without `deleted_at`.
+        """
+        return not await db.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {month_partition(month)} "
+                "WHERE deleted_at IS NULL)"
+            )
+        )
+
+    @staticmethod
+    async def drop_month(db: AsyncSession, month: date) -> None:
+        """
+        Detach and drop the partition of a month together with the tags of its files.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            month (date): The first day of the month.
+
+        Returns:
+            None
+        """
+        name = month_partition(month)
+        await db.execute(text(f"ALTER TABLE file_meta DETACH PARTITION {name}"))
+        await db.execute(
+            text(f"DELETE FROM file_tag WHERE file_id IN (SELECT id FROM {name})")
+        )
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
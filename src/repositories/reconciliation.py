@@ -0,0 +1,63 @@
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..entities.reconciliation import ReconciliationCheckpointEntity
+
+
+class ReconciliationRepository:
+    """
+    This repository provides methods for interacting with the `ReconciliationCheckpointEntity` table in the database.
+    A checkpoint holds the last key reconciled in a storage location, so that an interrupted pass can resume.
+    """
+
+    @staticmethod
+    async def get_checkpoint(db: AsyncSession, location: str) -> str | None:
+        """
+        Retrieve the last reconciled key of a storage location.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            location (str): The name of the storage location.
+
+        Returns:
+            str | None: The last reconciled key, or None when no pass is in progress.
+        """
+        obj = await db.get(ReconciliationCheckpointEntity, location)
+        return obj.last_key if obj else None
+
+    @staticmethod
+    async def save_checkpoint(db: AsyncSession, location: str, last_key: str) -> None:
+        """
+        Store the last reconciled key of a storage location.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            location (str): The name of the storage location.
+            last_key (str): The key all keys up to which are reconciled.
+
+        Returns:
+            None
+        """
+        await db.merge(
+            ReconciliationCheckpointEntity(location=location, last_key=last_key)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def delete_checkpoint(db: AsyncSession, location: str) -> None:
+        """
+        Forget the checkpoint of a storage location once its pass is complete.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            location (str): The name of the storage location.
+
+        Returns:
+            None
+        """
+        await db.execute(
+            delete(ReconciliationCheckpointEntity).where(
+                ReconciliationCheckpointEntity.location == location
+            )
+        )
+        await db.commit()
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Tuple
+from uuid import UUID
+
+from ..core.database import get_db
+from ..core.logger import logger
+from ..repositories.file_meta import FileMetaRepository
+from ..utils import singleton
+
+
+@singleton
+class AccessTracker:
+    """
+    Collects file reads in memory and writes them to the database in
+    batches, so that a download does not cost an extra UPDATE.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[UUID, Tuple[int, datetime]] = {}
+        self._task: asyncio.Task | None = None
+
+    def record(self, _id: UUID) -> None:
+        """Count one read of the file."""
+        reads, _ = self._pending.get(_id, (0, None))
+        self._pending[_id] = (reads + 1, datetime.now(timezone.utc))
+
+    def pending_reads(self, _id: UUID) -> int:
+        """Reads of the file that are not flushed yet."""
+        return self._pending.get(_id, (0, None))[0]
+
+    async def flush(self) -> None:
+        """Write the collected reads to the database."""
+        if not self._pending:
+            return
+        accesses, self._pending = self._pending, {}
+        try:
+            async for db in get_db():
+                await FileMetaRepository.record_access(db, accesses)
+        except BaseException:
+            # Kept for the next flush, with the reads recorded meanwhile
+            for _id, (reads, accessed_at) in accesses.items():
+                more, last = self._pending.get(_id, (0, accessed_at))
+                self._pending[_id] = (reads + more, max(accessed_at, last))
+            raise
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Access statistics flush failed: {e}")
+
+    def start(self, interval: float) -> None:
+        """Start flushing in the background every `interval` seconds."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """Stop the background flush and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -1,22 +1,68 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
 from mimetypes import guess_extension, guess_type
-from typing import Any, Callable, Sequence, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Mapping,
+    Sequence,
+    Tuple,
+)
 from urllib.parse import quote
 from uuid import UUID, uuid4
 
-from aioboto3 import Session
-from fastapi import UploadFile
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.logger import logger
 from ..entities.file_meta import FileMetaEntity
 from ..repositories.file_meta import FileMetaRepository
-from ..utils import singleton
+from ..storage import (
+    COLD,
+    HOT,
+    ObjectNotFound,
+    StorageBackend,
+    StorageTier,
+    UploadedPart,
+)
+from ..storage.checksum import (
+    DIGEST_NAMES,
+    ChecksumAlgorithm,
+    Hasher,
+    new_hasher,
+    to_base64,
+)
+from ..utils import singleton, uuid7, uuid7_time
+from .access import AccessTracker
+from .group_commit import GroupCommitter
+from .inspection import ContentInspector, ContentRejected
+
+if TYPE_CHECKING:
+    from fastapi import UploadFile
+
+
+def _is_expired(obj: FileMetaEntity) -> bool:
+    if obj.expires_at is None:
+        return False
+    expires_at = obj.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
 
 
 @singleton
 class FileService:
     _max_file_size: int = 0
     _chunk_size: int = 5 * 1024 * 1024  # 5MB
-    _bucket_name: str = "test_bucket"
+    _checksum_algorithm: ChecksumAlgorithm | None = "sha256"
+    _export_batch_size: int = 1000
+    _read_ahead_part_size: int = 8 * 1024 * 1024  # 8MB
+    _read_ahead_window: int = 4
+    _prune_by_id_time: bool = False
 
     @property
     def max_file_size(self) -> int:
@@ -35,12 +81,58 @@ class FileService:
         self._chunk_size = value
 
     @property
-    def bucket_name(self) -> str:
-        return self._bucket_name
+    def checksum_algorithm(self) -> ChecksumAlgorithm | None:
+        return self._checksum_algorithm
 
-    @bucket_name.setter
-    def bucket_name(self, value: str) -> None:
-        self._bucket_name = value
+    @checksum_algorithm.setter
+    def checksum_algorithm(self, value: ChecksumAlgorithm | None) -> None:
+        self._checksum_algorithm = value
+
+    @property
+    def export_batch_size(self) -> int:
+        return self._export_batch_size
+
+    @export_batch_size.setter
+    def export_batch_size(self, value: int) -> None:
+        self._export_batch_size = value
+
+    @property
+    def read_ahead_part_size(self) -> int:
+        return self._read_ahead_part_size
+
+    @read_ahead_part_size.setter
+    def read_ahead_part_size(self, value: int) -> None:
+        self._read_ahead_part_size = value
+
+    @property
+    def read_ahead_window(self) -> int:
+        return self._read_ahead_window
+
+    @read_ahead_window.setter
+    def read_ahead_window(self, value: int) -> None:
+        self._read_ahead_window = value
+
+    @property
+    def prune_by_id_time(self) -> bool:
+        return self._prune_by_id_time
+
+    @prune_by_id_time.setter
+    def prune_by_id_time(self, value: bool) -> None:
+        self._prune_by_id_time = value
+
+    def _created_near(self, _id: UUID) -> datetime | None:
+        # UUIDv7 carries its creation time, which narrows the lookup to the
+        # partitions of that time when file_meta is partitioned by created_at
+        if self._prune_by_id_time and _id.version == 7:
+            return uuid7_time(_id)
+        return None
+
+    @staticmethod
+    def _hash_part(hasher: Hasher, algorithm: ChecksumAlgorithm, chunk: bytes) -> str:
+        part_hasher = new_hasher(algorithm)
+        part_hasher.update(chunk)
+        hasher.update(chunk)
+        return to_base64(part_hasher.digest())
 
     @staticmethod
     def _get_uuid_file_name(file_id: UUID, mime_type: str | None = None) -> str:
@@ -56,72 +148,118 @@ class FileService:
     async def upload(
         self,
         db: AsyncSession,
-        s3: Session,
+        storage: StorageBackend,
         owner_id: UUID,
         filename: str,
-        file: UploadFile,
+        file: "UploadFile",
+        on_chunk: Callable[[int], Awaitable[None]] | None = None,
+        tags: Mapping[str, str | None] | None = None,
+        expires_at: datetime | None = None,
     ) -> FileMetaEntity:
-        content_type = file.content_type
-        if content_type is None:
-            content_type, _ = guess_type(filename)
+        claimed_type = file.content_type
+        if claimed_type is None:
+            claimed_type, _ = guess_type(filename)
+        # The first chunk is inspected before the upload starts, no extra read
+        chunk = await file.read(self._chunk_size)
+        inspection = ContentInspector().begin(claimed_type, chunk)
+        content_type = inspection.content_type
         file_id = self._get_uuid_file_name(uuid4(), content_type)
-        mpu = await s3.create_multipart_upload(
-            Bucket=self._bucket_name, Key=file_id, ContentType=content_type
+        algorithm = self._checksum_algorithm
+        hasher = new_hasher(algorithm) if algorithm else None
+        upload_id = await storage.create_multipart_upload(
+            file_id, content_type, algorithm
         )
 
-        upload_id = mpu["UploadId"]
-        parts = []
+        parts: list[UploadedPart] = []
         part_number = 1
         file_size = 0
         try:
             while True:
-                chunk = await file.read(self._chunk_size)
-                if not chunk:
+                if not chunk and parts:
                     break
-                file_size += self._chunk_size
+                file_size += len(chunk)
                 if self._max_file_size != 0 and file_size > self._max_file_size:
-                    raise Exception("File too large")
-
-                part = await s3.upload_part(
-                    Bucket=self._bucket_name,
-                    Key=file_id,
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                    Body=chunk,
+                    raise ContentRejected(413, "File too large")
+                inspection.check_size(file_size)
+                if on_chunk is not None:
+                    await on_chunk(len(chunk))
+                await inspection.feed(chunk)
+
+                checksum = None
+                if hasher is not None and algorithm is not None:
+                    # hashlib releases the GIL, hash off the event loop
+                    checksum = await asyncio.to_thread(
+                        self._hash_part, hasher, algorithm, chunk
+                    )
+                parts.append(
+                    await storage.upload_part(
+                        file_id, upload_id, part_number, chunk, algorithm, checksum
+                    )
                 )
-                parts.append({"PartNumber": part_number, "ETag": part["ETag"]})
                 part_number += 1
+                if not chunk:
+                    break
+                chunk = await file.read(self._chunk_size)
 
-            await s3.complete_multipart_upload(
-                Bucket=self._bucket_name,
-                Key=file_id,
-                UploadId=upload_id,
-                MultipartUpload={"Parts": parts},
-            )
+            await inspection.finish()
+            await storage.complete_multipart_upload(file_id, upload_id, parts)
         except Exception as e:
-            await s3.abort_multipart_upload(
-                Bucket=self._bucket_name, Key=file_id, UploadId=upload_id
-            )
+            await inspection.cancel()
+            await storage.abort_multipart_upload(file_id, upload_id)
             raise e
 
-        return await FileMetaRepository.create(
-            db, file_id, owner_id, filename, size=file_size, format=content_type
+        fields: dict[str, Any] = dict(
+            internal_id=file_id,
+            owner_id=owner_id,
+            title=filename,
+            size=file_size,
+            format=content_type,
+            checksum_algorithm=algorithm,
+            checksum=hasher.digest().hex() if hasher is not None else None,
+            tags=tags,
+            expires_at=expires_at,
         )
+        if GroupCommitter().running:
+            return await GroupCommitter().create(**fields)
+        return await FileMetaRepository.create(db, **fields)
 
     async def get(
-        self, db: AsyncSession, s3: Session, _id: UUID
+        self, db: AsyncSession, storage: StorageBackend, _id: UUID
+    ) -> Tuple[Callable[[], Any], dict[str, Any]]:
+        obj = await FileMetaRepository.get_by_id(db, _id, self._created_near(_id))
+        return await self.open(storage, obj)
+
+    async def open(
+        self, storage: StorageBackend, obj: FileMetaEntity
     ) -> Tuple[Callable[[], Any], dict[str, Any]]:
-        obj = await FileMetaRepository.get_by_id(db, _id)
-        if obj.internal_id is None or obj.is_deleted:
+        """
+        Prepare the download of a file whose record is already loaded.
+
+        Args:
+            storage (StorageBackend): The storage holding the object.
+            obj (FileMetaEntity): The record of the file.
+
+        Returns:
+            Tuple[Callable[[], Any], dict[str, Any]]: The generator of the content
+            chunks and the response headers.
+        """
+        if obj.internal_id is None or obj.is_deleted or _is_expired(obj):
             raise Exception("File not found")
 
+        # The object may be in the middle of a tier migration
+        tier: StorageTier = COLD if obj.tier == COLD else HOT
         try:
-            head = await s3.head_object(Bucket=self._bucket_name, Key=obj.internal_id)
-        except s3.exceptions.NoSuchKey:
-            raise Exception("File not found")
+            head = await storage.head(obj.internal_id, tier=tier)
+        except ObjectNotFound:
+            tier = HOT if tier == COLD else COLD
+            try:
+                head = await storage.head(obj.internal_id, tier=tier)
+            except ObjectNotFound:
+                raise Exception("File not found")
+        AccessTracker().record(obj.id)
 
-        file_size = head["ContentLength"]
-        content_type = head.get("ContentType", "application/octet-stream")
+        file_size = head.size
+        content_type = head.content_type or obj.format or "application/octet-stream"
         filename = obj.title
 
         headers = {
@@ -129,20 +267,309 @@ class FileService:
             "Content-Length": str(file_size),
             "Content-Type": content_type,
         }
+        if obj.checksum and obj.checksum_algorithm in DIGEST_NAMES:
+            digest = to_base64(bytes.fromhex(obj.checksum))
+            headers["Digest"] = f"{DIGEST_NAMES[obj.checksum_algorithm]}={digest}"
+            headers["ETag"] = f'"{obj.checksum}"'
+
+        part_size, window = self._read_ahead_part_size, self._read_ahead_window
 
         async def chunk_generator():
-            try:
-                response = await s3.get_object(
-                    Bucket=self._bucket_name, Key=obj.internal_id
+            # Large objects are fetched as parallel ranged reads
+            if window > 1 and file_size > part_size:
+                chunks = storage.read_ahead(
+                    obj.internal_id, file_size, part_size, window, tier=tier
                 )
-                async with response["Body"] as stream:
-                    body = await stream.read()
-                    yield body
+            else:
+                chunks = storage.read(obj.internal_id, tier=tier)
+            try:
+                async for chunk in chunks:
+                    yield chunk
             except Exception as e:
                 raise Exception(f"Download error: {str(e)}")
 
         return chunk_generator, headers
 
+    async def copy(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        _id: UUID,
+        owner_id: UUID | None = None,
+        title: str | None = None,
+    ) -> FileMetaEntity:
+        """
+        Duplicate a file inside the storage, without transferring its content
+        through the service.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            storage (StorageBackend): The storage holding the object.
+            _id (UUID): The unique identifier of the file to copy.
+            owner_id (UUID | None, optional): The owner of the copy. Defaults to the
+                owner of the file.
+            title (str | None, optional): The title of the copy. Defaults to the
+                title of the file.
+
+        Returns:
+            FileMetaEntity: The metadata entity of the copy, with the same
+            content type, checksum, tags and expiry time as the file.
+
+        Raises:
+            NoResultFound: If the file does not exist, is deleted, expired or has no object.
+        """
+        obj = await FileMetaRepository.get_by_id(db, _id, self._created_near(_id))
+        if obj.internal_id is None or obj.is_deleted or _is_expired(obj):
+            raise NoResultFound("File not found")
+
+        file_id = self._get_uuid_file_name(uuid4(), obj.format)
+        # The object may be in the middle of a tier migration
+        tier: StorageTier = COLD if obj.tier == COLD else HOT
+        try:
+            await storage.copy(obj.internal_id, file_id, tier=tier)
+        except ObjectNotFound:
+            try:
+                await storage.copy(
+                    obj.internal_id, file_id, tier=HOT if tier == COLD else COLD
+                )
+            except ObjectNotFound as e:
+                raise NoResultFound("File not found") from e
+
+        return await FileMetaRepository.create(
+            db,
+            file_id,
+            owner_id or obj.owner_id,
+            title or obj.title,
+            size=obj.size,
+            format=obj.format,
+            checksum_algorithm=obj.checksum_algorithm,
+            checksum=obj.checksum,
+            tags={tag.key: tag.value for tag in obj.tags},
+            expires_at=obj.expires_at,
+        )
+
+    async def reassign(
+        self, db: AsyncSession, _id: UUID, owner_id: UUID
+    ) -> FileMetaEntity:
+        """
+        Move a file to another owner. Only the metadata changes.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            _id (UUID): The unique identifier of the file.
+            owner_id (UUID): The unique identifier of the new owner.
+
+        Returns:
+            FileMetaEntity: The updated metadata entity of the file.
+
+        Raises:
+            NoResultFound: If the file does not exist or is deleted.
+        """
+        obj = await FileMetaRepository.get_by_id(db, _id, self._created_near(_id))
+        if obj.is_deleted:
+            raise NoResultFound("File not found")
+        return await FileMetaRepository.set_owner(db, _id, owner_id)
+
+    async def expire(
+        self,
+        db: AsyncSession,
+        now: datetime,
+        retention: Mapping[UUID, timedelta] | None = None,
+        limit: int = 100,
+    ) -> int:
+        """
+        Delete files past their expiry time and, for each owner with a
+        retention period, files older than that period. Files are only marked
+        as deleted here; their content is purged by the outbox relay as for
+        any other deletion.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            now (datetime): The current time.
+            retention (Mapping[UUID, timedelta] | None, optional): The retention
+                period by owner ID. Defaults to None.
+            limit (int, optional): The maximum number of files to delete by expiry
+                time and by each retention period. Defaults to 100.
+
+        Returns:
+            int: The number of deleted files.
+        """
+        expired = len(await FileMetaRepository.expire_due(db, now, limit=limit))
+        for owner_id, period in (retention or {}).items():
+            expired += len(
+                await FileMetaRepository.expire_retained(
+                    db, owner_id, now - period, limit=limit
+                )
+            )
+        return expired
+
+    async def change_tier(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        obj: FileMetaEntity,
+        tier: StorageTier,
+    ) -> None:
+        """
+        Move the file's object to another storage tier and record the new tier.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            storage (StorageBackend): The storage holding the object.
+            obj (FileMetaEntity): The metadata entity of the file.
+            tier (StorageTier): The tier to move the object to.
+
+        Raises:
+            ObjectNotFound: If the object is missing from its current tier.
+        """
+        if obj.internal_id is None or obj.tier == tier:
+            return
+        source: StorageTier = COLD if obj.tier == COLD else HOT
+        await storage.move(obj.internal_id, source, tier)
+        await FileMetaRepository.set_tier(db, obj.id, tier)
+
+    async def migrate_tiers(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        accessed_before: datetime,
+        promote_after_reads: int = 0,
+        limit: int = 100,
+    ) -> Tuple[int, int]:
+        """
+        Move files not read since `accessed_before` to the cold tier and,
+        when `promote_after_reads` is set, move cold files read that many
+        times back to the hot tier.
+
+        A file that fails to move is logged and skipped, and is not selected
+        again until it qualifies anew: see `FileMetaRepository.postpone_tiering`.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            storage (StorageBackend): The storage holding the objects.
+            accessed_before (datetime): Files not read since then are cold.
+            promote_after_reads (int, optional): Reads of a cold file that bring it
+                back to the hot tier, 0 disables promotion. Defaults to 0.
+            limit (int, optional): The maximum number of files to move in each
+                direction. Defaults to 100.
+
+        Returns:
+            Tuple[int, int]: The number of demoted and promoted files.
+        """
+        demoted = promoted = 0
+        failed: list[UUID] = []
+        for obj in await FileMetaRepository.get_cold_candidates(
+            db, accessed_before, limit=limit
+        ):
+            if await self._migrate(db, storage, obj, COLD, failed):
+                demoted += 1
+
+        if promote_after_reads > 0:
+            for obj in await FileMetaRepository.get_hot_candidates(
+                db, promote_after_reads, limit=limit
+            ):
+                if await self._migrate(db, storage, obj, HOT, failed):
+                    promoted += 1
+
+        # Not selected again on every run, so that they do not fill the batches
+        await FileMetaRepository.postpone_tiering(db, failed)
+        return demoted, promoted
+
+    async def _migrate(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        obj: FileMetaEntity,
+        tier: StorageTier,
+        failed: list[UUID],
+    ) -> bool:
+        try:
+            try:
+                await self.change_tier(db, storage, obj, tier)
+            except ObjectNotFound:
+                # Moved before, without the new tier being recorded
+                await storage.head(obj.internal_id, tier=tier)  # type:ignore[arg-type]
+                await FileMetaRepository.set_tier(db, obj.id, tier)
+            return True
+        except SQLAlchemyError:
+            raise
+        except ObjectNotFound:
+            logger.warning(f"Object of file {obj.id} is missing, not moved")
+        except Exception as e:
+            logger.warning(f"File {obj.id} not moved to the {tier} tier: {e!r}")
+        failed.append(obj.id)
+        return False
+
+    async def verify_checksum(
+        self, storage: StorageBackend, obj: FileMetaEntity
+    ) -> bool:
+        """
+        Re-read the file's object and compare it with the stored checksum.
+
+        Args:
+            storage (StorageBackend): The storage holding the object.
+            obj (FileMetaEntity): The metadata entity of the file.
+
+        Returns:
+            bool: True if the object matches its checksum.
+
+        Raises:
+            ObjectNotFound: If the object does not exist.
+        """
+        hasher = new_hasher(obj.checksum_algorithm)  # type:ignore[arg-type]
+        tier: StorageTier = COLD if obj.tier == COLD else HOT
+        async for chunk in storage.read(obj.internal_id, tier=tier):
+            await asyncio.to_thread(hasher.update, chunk)
+        return hasher.digest().hex() == obj.checksum
+
+    @staticmethod
+    async def _sample_start(db: AsyncSession) -> UUID:
+        """
+        A random ID to start a sample of files from.
+
+        UUIDv7 IDs of new files lie in a narrow band ordered by creation time,
+        so the start is the ID of a random time since the oldest file. Random
+        IDs of files created before are spread over the whole range, so while
+        there are such files, half of the samples start at a random ID.
+        """
+        oldest, greatest = await FileMetaRepository.get_id_range(db)
+        if oldest is None or greatest is None:
+            return UUID(int=random.getrandbits(128))
+        if greatest.version != 7 and random.random() < 0.5:
+            return UUID(int=random.getrandbits(128))
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc)
+        return uuid7(oldest + max(now - oldest, timedelta(0)) * random.random())
+
+    async def scrub(
+        self, db: AsyncSession, storage: StorageBackend, sample_size: int = 10
+    ) -> Tuple[int, list[UUID]]:
+        """
+        Verify the checksums of a random sample of stored files.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            storage (StorageBackend): The storage holding the objects.
+            sample_size (int, optional): The number of files to verify. Defaults to 10.
+
+        Returns:
+            Tuple[int, list[UUID]]: The number of verified files and the IDs of
+            the files whose objects do not match their checksums.
+        """
+        verified, corrupted = 0, []
+        sample = await FileMetaRepository.get_checksum_sample(
+            db, await self._sample_start(db), limit=sample_size
+        )
+        for obj in sample:
+            try:
+                if not await self.verify_checksum(storage, obj):
+                    corrupted.append(obj.id)
+                verified += 1
+            except ObjectNotFound:
+                logger.warning(f"Object of file {obj.id} is missing, not verified")
+        return verified, corrupted
+
     async def get_info(self, db: AsyncSession, _id: UUID) -> FileMetaEntity:
         """
         Retrieve file metadata information by its unique identifier.
@@ -157,7 +584,7 @@ class FileService:
         Raises:
             Exception: If the file with the given ID is not found or any database error occurs.
         """
-        return await FileMetaRepository.get_by_id(db, _id)
+        return await FileMetaRepository.get_by_id(db, _id, self._created_near(_id))
 
     async def get_list(
         self,
@@ -166,6 +593,7 @@ class FileService:
         offset: int = 0,
         owner_id: UUID | None = None,
         show_deleted: bool = False,
+        tags: Mapping[str, str | None] | None = None,
     ) -> Tuple[Sequence[FileMetaEntity], int]:
         """
         Retrieve a list of file metadata entities with pagination and filtering options.
@@ -175,15 +603,158 @@ class FileService:
             limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
             offset (int, optional): The number of records to skip before starting to retrieve. Defaults to 0.
             owner_id (UUID | None, optional): Filter files by the owner's ID. Defaults to None.
-            show_deleted (bool, optional): Whether to include deleted files in the results. Defaults to False.
+            show_deleted (bool, optional): Whether to include deleted and expired files in the results. Defaults to False.
+            tags (Mapping[str, str | None] | None, optional): Tags the files must have; a None value
+                matches the tag with any value. Defaults to None.
 
         Returns:
             Tuple[Sequence[FileMetaEntity], int]: A tuple containing a sequence of file metadata entities
             and the total count of records matching the query.
         """
         return await FileMetaRepository.get_list(
-            db, limit=limit, offset=offset, owner_id=owner_id, show_deleted=show_deleted
+            db,
+            limit=limit,
+            offset=offset,
+            owner_id=owner_id,
+            show_deleted=show_deleted,
+            tags=tags,
         )
 
+    async def get_info_row(self, db: AsyncSession, _id: UUID) -> dict[str, Any]:
+        """
+        Retrieve the metadata of a file as a plain dict, for the fast response path.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use for the query.
+            _id (UUID): The unique identifier of the file.
+
+        Returns:
+            dict[str, Any]: The fields of `FileResponse`.
+
+        Raises:
+            NoResultFound: If the file with the given ID is not found.
+        """
+        row = await FileMetaRepository.get_row_by_id(db, _id, self._created_near(_id))
+        tags = await FileMetaRepository.get_tags(db, [_id])
+        return {**row._mapping, "tags": tags.get(_id, {})}
+
+    async def get_list_rows(
+        self,
+        db: AsyncSession,
+        limit: int = 10,
+        offset: int = 0,
+        owner_id: UUID | None = None,
+        show_deleted: bool = False,
+        tags: Mapping[str, str | None] | None = None,
+    ) -> Tuple[list[dict[str, Any]], int]:
+        """
+        Same as `get_list`, but returns plain dicts built from selected columns,
+        with the tags of the page read in one query.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            limit (int, optional): The maximum number of records to retrieve. Defaults to 10.
+            offset (int, optional): The number of records to skip before starting to retrieve. Defaults to 0.
+            owner_id (UUID | None, optional): Filter files by the owner's ID. Defaults to None.
+            show_deleted (bool, optional): Whether to include deleted and expired files in the results. Defaults to False.
+            tags (Mapping[str, str | None] | None, optional): Tags the files must have; a None value
+                matches the tag with any value. Defaults to None.
+
+        Returns:
+            Tuple[list[dict[str, Any]], int]: The fields of `FileResponse` for each file
+            and the total count of records matching the query.
+        """
+        rows, count = await FileMetaRepository.get_rows(
+            db,
+            limit=limit,
+            offset=offset,
+            owner_id=owner_id,
+            show_deleted=show_deleted,
+            tags=tags,
+        )
+        file_tags = await FileMetaRepository.get_tags(db, [row.id for row in rows])
+        return [
+            {**row._mapping, "tags": file_tags.get(row.id, {})} for row in rows
+        ], count
+
+    async def update_tags(
+        self,
+        db: AsyncSession,
+        _id: UUID,
+        set_tags: Mapping[str, str | None],
+        remove_tags: Sequence[str] = (),
+    ) -> FileMetaEntity:
+        """
+        Add, change and remove tags of a file.
+
+        Args:
+            db (AsyncSession): The database session to use for the operation.
+            _id (UUID): The unique identifier of the file.
+            set_tags (Mapping[str, str | None]): Tags to add or to change the value of.
+            remove_tags (Sequence[str], optional): Keys of the tags to remove. Defaults to ().
+
+        Returns:
+            FileMetaEntity: The file with its updated tags.
+        """
+        obj = await FileMetaRepository.get_by_id(db, _id, self._created_near(_id))
+        if obj.is_deleted:
+            raise NoResultFound("File not found")
+        return await FileMetaRepository.update_tags(db, _id, set_tags, remove_tags)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        limit: int = 10,
+        after: Tuple[datetime, UUID] | None = None,
+        **filters: Any,
+    ) -> Tuple[Sequence[FileMetaEntity], Tuple[datetime, UUID] | None]:
+        """
+        Search file metadata, newest first, one keyset page at a time.
+
+        Args:
+            db (AsyncSession): The database session to use for the query.
+            limit (int, optional): The maximum number of files to return. Defaults to 10.
+            after (Tuple[datetime, UUID] | None, optional): The position returned with
+                the previous page. Defaults to None.
+            **filters: Filters of `FileMetaRepository.search`.
+
+        Returns:
+            Tuple[Sequence[FileMetaEntity], Tuple[datetime, UUID] | None]: The files and
+            the position of the next page, None if this page is the last one.
+        """
+        records = await FileMetaRepository.search(
+            db, after=after, limit=limit + 1, **filters
+        )
+        if len(records) <= limit:
+            return records, None
+        records = records[:limit]
+        return records, (records[-1].created_at, records[-1].id)
+
+    async def export(
+        self,
+        db: AsyncSession,
+        show_deleted: bool = False,
+        **filters: Any,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Stream the metadata of all matching files, oldest first, batch by batch.
+
+        Args:
+            db (AsyncSession): The database session to use for the query; it is
+                busy until the iteration ends.
+            show_deleted (bool, optional): Whether to include deleted and expired files. Defaults to False.
+            **filters: Filters of `FileMetaRepository.search`.
+
+        Yields:
+            list[dict[str, Any]]: The fields of `FileResponse` for the next batch of files.
+        """
+        async for rows in FileMetaRepository.stream_rows(
+            db, show_deleted=show_deleted, batch_size=self._export_batch_size, **filters
+        ):
+            file_tags = await FileMetaRepository.get_tags(db, [row.id for row in rows])
+            yield [{**row._mapping, "tags": file_tags.get(row.id, {})} for row in rows]
+
     async def delete(self, db: AsyncSession, _id: UUID, mark: bool = True) -> None:
-        await FileMetaRepository.delete_by_id(db, _id, mark=mark)
+        await FileMetaRepository.delete_by_id(
+            db, _id, mark=mark, created_near=self._created_near(_id)
+        )
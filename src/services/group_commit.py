@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any
+
+from ..core.database import get_db
+from ..core.logger import logger
+from ..entities.file_meta import FileMetaEntity
+from ..repositories.file_meta import FileMetaRepository
+from ..utils import singleton
+
+Pending = tuple[dict[str, Any], "asyncio.Future[FileMetaEntity]"]
+
+
+@singleton
+class GroupCommitter:
+    """
+    Coalesces the file record inserts of concurrent uploads.
+
+    A record submitted while no batch is being written is inserted at once.
+    Otherwise the records submitted within `window` seconds are inserted
+    together, with one multi-row INSERT ... RETURNING and one commit, so a
+    burst of uploads waits for one transaction instead of one per file.
+    Each caller gets its own record. If a batch fails, its records are
+    inserted one by one, so a bad record fails alone.
+    """
+
+    def __init__(self) -> None:
+        self._window = 0.005
+        self._max_batch = 500
+        self._pending: list[Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._writes: set[asyncio.Task[None]] = set()
+        self._writing = 0
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, window: float, max_batch: int) -> None:
+        """Start coalescing the records submitted within `window` seconds."""
+        self._window = window
+        self._max_batch = max_batch
+        self._running = True
+
+    async def stop(self) -> None:
+        """Stop coalescing and write what is pending."""
+        self._running = False
+        self._flush()
+        await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def create(self, **fields: Any) -> FileMetaEntity:
+        """
+        Create a file record in the next batch.
+
+        Args:
+            **fields: Keyword arguments of `FileMetaRepository.create`.
+
+        Returns:
+            FileMetaEntity: The created record.
+        """
+        future: asyncio.Future[FileMetaEntity] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append((fields, future))
+        # Without a batch in flight nobody else is likely to come, so do not wait
+        if len(self._pending) >= self._max_batch or not self._writing:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._window, self._flush
+            )
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._writing += 1
+        task = asyncio.create_task(self._write_batch(batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    @staticmethod
+    async def _insert(batch: list[Pending]) -> None:
+        objs: list[FileMetaEntity] = []
+        async for db in get_db():
+            objs = await FileMetaRepository.create_many(db, [f for f, _ in batch])
+        for (_, future), obj in zip(batch, objs):
+            if not future.done():
+                future.set_result(obj)
+
+    async def _write_batch(self, batch: list[Pending]) -> None:
+        try:
+            await self._write(batch)
+        finally:
+            # Before the callers resume, so that their next records do not wait
+            self._writing -= 1
+
+    async def _write(self, batch: list[Pending]) -> None:
+        try:
+            await self._insert(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            logger.warning(f"Group commit of {len(batch)} records failed: {e!r}")
+        for pending in batch:
+            await self._write([pending])
@@ -0,0 +1,403 @@
+import asyncio
+import codecs
+from typing import AsyncIterator, Callable, Protocol
+
+from ..core.config import InspectionConfig
+from ..core.logger import logger
+from ..utils import singleton
+
+OCTET_STREAM = "application/octet-stream"
+
+# Signatures at the start of the content: magic bytes and the MIME type
+_MAGIC: list[tuple[bytes, str]] = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"\x00\x00\x01\x00", "image/vnd.microsoft.icon"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"PK\x05\x06", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"BZh", "application/x-bzip2"),
+    (b"\xfd7zXZ\x00", "application/x-xz"),
+    (b"(\xb5/\xfd", "application/zstd"),
+    (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (b"Rar!\x1a\x07", "application/vnd.rar"),
+    (b"SQLite format 3\x00", "application/vnd.sqlite3"),
+    (b"\x7fELF", "application/x-executable"),
+    (b"\x00asm", "application/wasm"),
+    (b"\x1a\x45\xdf\xa3", "video/webm"),
+    (b"OggS", "audio/ogg"),
+    (b"fLaC", "audio/flac"),
+    (b"ID3", "audio/mpeg"),
+    (b"wOFF", "font/woff"),
+    (b"wOF2", "font/woff2"),
+]
+# RIFF containers, by the form type at offset 8
+_RIFF = {b"WEBP": "image/webp", b"WAVE": "audio/wav", b"AVI ": "video/x-msvideo"}
+# ISO base media files, by the major brand at offset 8
+_FTYP = {
+    b"qt  ": "video/quicktime",
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"mif1": "image/heif",
+    b"avif": "image/avif",
+    b"M4A ": "audio/mp4",
+}
+# Markup recognised at the start of text content
+_MARKUP = [
+    (b"<!doctype html", "text/html"),
+    (b"<html", "text/html"),
+    (b"<svg", "image/svg+xml"),
+    (b"<?xml", "application/xml"),
+]
+# Detected generic types and the more specific claimed types they may hold,
+# as `prefix` or `+suffix` patterns
+_REFINABLE: dict[str, tuple[str, ...]] = {
+    "application/zip": (
+        "application/vnd.openxmlformats-",
+        "application/vnd.oasis.opendocument.",
+        "application/vnd.android.package-archive",
+        "application/java-archive",
+        "+zip",
+    ),
+    "application/xml": ("text/xml", "image/svg+xml", "+xml"),
+    "text/plain": (
+        "text/",
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "application/yaml",
+        "application/x-yaml",
+        "application/sql",
+        "+json",
+        "+xml",
+    ),
+}
+# Bytes of the first chunk looked at to tell text from binary content
+_TEXT_SAMPLE = 8192
+
+EICAR = rb"X5O!P%@AP[4\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+
+class ContentRejected(Exception):
+    """Raised when uploaded content fails the inspection."""
+
+    def __init__(self, status_code: int, msg: str) -> None:
+        super().__init__(msg)
+        self.status_code = status_code
+        self.msg = msg
+
+
+def _text_type(head: bytes) -> str | None:
+    sample = head[:_TEXT_SAMPLE]
+    if b"\x00" in sample:
+        return None
+    try:
+        # The sample may end inside a multibyte character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return None
+    start = sample.removeprefix(codecs.BOM_UTF8).lstrip()[:64].lower()
+    for prefix, mime_type in _MARKUP:
+        if start.startswith(prefix):
+            return mime_type
+    return "text/plain"
+
+
+def sniff_mime(head: bytes) -> str | None:
+    """
+    Detect the type of content from its first bytes.
+
+    Args:
+        head (bytes): The start of the content.
+
+    Returns:
+        str | None: The detected MIME type, or None for empty or unknown binary content.
+    """
+    if not head:
+        return None
+    for magic, mime_type in _MAGIC:
+        if head.startswith(magic):
+            return mime_type
+    if head.startswith(b"RIFF") and head[8:12] in _RIFF:
+        return _RIFF[head[8:12]]
+    if head[4:8] == b"ftyp":
+        return _FTYP.get(head[8:12], "video/mp4")
+    # DOS stub of Windows executables, its header is never text
+    if head.startswith(b"MZ") and b"\x00" in head[2:64]:
+        return "application/vnd.microsoft.portable-executable"
+    return _text_type(head)
+
+
+def _essence(mime_type: str) -> str:
+    return mime_type.split(";", 1)[0].strip().lower()
+
+
+def resolve_mime(claimed: str | None, detected: str | None) -> str | None:
+    """
+    Choose the type of stored content from the claimed and the detected one.
+
+    The detected type wins, unless it is a generic one the claimed type
+    specialises, such as a ZIP archive claimed to be a DOCX document.
+
+    Args:
+        claimed (str | None): The type sent by the client or guessed from the name.
+        detected (str | None): The type detected by `sniff_mime`.
+
+    Returns:
+        str | None: The type to store.
+    """
+    if detected is None:
+        return claimed
+    if claimed is None:
+        return detected
+    essence = _essence(claimed)
+    for pattern in _REFINABLE.get(detected, ()):
+        if pattern.startswith("+"):
+            if essence.endswith(pattern):
+                return claimed
+        elif essence.startswith(pattern):
+            return claimed
+    return detected
+
+
+def match_mime(pattern: str, mime_type: str) -> bool:
+    """Whether a type matches `type/subtype`, `type/*` or `*/*`."""
+    pattern = pattern.lower()
+    if pattern in ("*", "*/*"):
+        return True
+    if pattern.endswith("/*"):
+        return _essence(mime_type).startswith(pattern[:-1])
+    return _essence(mime_type) == pattern
+
+
+class Scanner(Protocol):
+    async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+        """Read the whole content, return the name of the threat found in it."""
+        ...
+
+
+class EicarScanner:
+    """Local stand-in for an antivirus, finds the EICAR test string."""
+
+    async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+        found = None
+        tail = b""
+        overlap = len(EICAR) - 1
+        async for chunk in chunks:
+            data = tail + chunk
+            if found is None and EICAR in data:
+                found = "Eicar-Test-Signature"
+            # The string may be split between chunks
+            tail = data[-overlap:]
+        return found
+
+
+class ClamdScanner:
+    """Streams the content to a ClamAV daemon with the INSTREAM command."""
+
+    _PIECE_SIZE = 64 * 1024
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+
+    async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(b"zINSTREAM\x00")
+            async for chunk in chunks:
+                for start in range(0, len(chunk), self._PIECE_SIZE):
+                    end = start + self._PIECE_SIZE
+                    piece = chunk[start:end]
+                    writer.write(len(piece).to_bytes(4, "big") + piece)
+                    await writer.drain()
+            writer.write(b"\x00\x00\x00\x00")
+            await writer.drain()
+            reply = (await reader.readuntil(b"\x00")).rstrip(b"\x00").decode()
+        finally:
+            writer.close()
+        # `stream: OK`, `stream: <name> FOUND` or `<reason> ERROR`
+        result = reply.removeprefix("stream: ")
+        if result == "OK":
+            return None
+        if result.endswith(" FOUND"):
+            return result.removesuffix(" FOUND")
+        raise RuntimeError(f"clamd: {reply}")
+
+
+class ContentInspection:
+    """
+    Inspection of one upload: its resolved type, the size limit for the
+    type and the scan of its content.
+
+    The scanner runs in its own task and reads the chunks from a queue of
+    `queue_size` chunks, so parts keep uploading while it works; an upload
+    waits for it only when it falls that far behind, and at the end.
+    """
+
+    def __init__(
+        self,
+        content_type: str | None,
+        size_limit: int = 0,
+        scanner: Scanner | None = None,
+        queue_size: int = 4,
+        timeout: float = 60.0,
+    ) -> None:
+        self.content_type = content_type
+        self.size_limit = size_limit
+        self._scanner = scanner
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(queue_size)
+        self._timeout = timeout
+        self._task: asyncio.Task[str | None] | None = None
+
+    def check_size(self, size: int) -> None:
+        """
+        Raises:
+            ContentRejected: If the content is over the limit for its type.
+        """
+        if self.size_limit and size > self.size_limit:
+            raise ContentRejected(
+                413,
+                f"Files of type {self.content_type or OCTET_STREAM} "
+                f"are limited to {self.size_limit} bytes",
+            )
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        while (chunk := await self._queue.get()) is not None:
+            yield chunk
+
+    async def _put(self, item: bytes | None) -> None:
+        """Queue an item for the scanner, unless it stopped."""
+        assert self._task is not None
+        if not self._task.done() and self._queue.full():
+            # A scanner that stops while the queue is full never takes the item
+            put = asyncio.ensure_future(self._queue.put(item))
+            await asyncio.wait(
+                {put, self._task},
+                timeout=self._timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if put.done():
+                return
+            put.cancel()
+            await asyncio.gather(put, return_exceptions=True)
+            if not self._task.done():
+                logger.warning("Content scan timed out")
+                raise ContentRejected(503, "Content scan is unavailable")
+        # A scanner that stopped early reads nothing more
+        if not self._task.done():
+            self._queue.put_nowait(item)
+        elif not self._task.cancelled() and (e := self._task.exception()):
+            logger.warning(f"Content scan failed: {e!r}")
+            raise ContentRejected(503, "Content scan is unavailable") from e
+
+    async def feed(self, chunk: bytes) -> None:
+        """
+        Pass the next chunk of the content to the scanner.
+
+        Raises:
+            ContentRejected: If the scanner failed, or did not take the chunk
+                within the timeout.
+        """
+        if self._scanner is None:
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._scanner.scan(self._chunks()))
+        await self._put(chunk)
+
+    async def finish(self) -> None:
+        """
+        Wait for the verdict of the scanner.
+
+        Raises:
+            ContentRejected: If a threat is found, or the scan failed.
+        """
+        if self._task is None:
+            return
+        await self._put(None)
+        try:
+            threat = await asyncio.wait_for(self._task, self._timeout)
+        except Exception as e:
+            logger.warning(f"Content scan failed: {e!r}")
+            raise ContentRejected(503, "Content scan is unavailable") from e
+        if threat is not None:
+            logger.warning(f"Content scan: {threat} found, upload rejected")
+            raise ContentRejected(422, f"Content rejected: {threat} found")
+
+    async def cancel(self) -> None:
+        """Stop the scan of an upload that failed."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+_SCANNERS: dict[str, Callable[[InspectionConfig], Scanner]] = {
+    "eicar": lambda config: EicarScanner(),
+    "clamd": lambda config: ClamdScanner(config.clamd_host, config.clamd_port),
+}
+
+
+@singleton
+class ContentInspector:
+    """
+    Checks uploads against the content policy.
+
+    The type is detected from the first chunk, which the upload reads
+    anyway, and replaces the claimed one. Types outside the allow list or
+    in the deny list are rejected with 415, content over the size limit of
+    its type with 413. An optional scanner reads the content as it is
+    uploaded and rejects it with 422 before the upload completes.
+    """
+
+    _config: InspectionConfig = InspectionConfig()
+    _scanner: Scanner | None = None
+
+    def configure(self, config: InspectionConfig) -> None:
+        self._config = config
+        factory = _SCANNERS.get(config.scanner)
+        self._scanner = factory(config) if factory is not None else None
+
+    def _size_limit(self, mime_type: str) -> int:
+        # The most specific pattern wins: `type/subtype`, then `type/*`, then `*/*`
+        matches = [
+            (pattern.count("*"), limit)
+            for pattern, limit in self._config.max_size.items()
+            if match_mime(pattern, mime_type)
+        ]
+        return min(matches)[1] if matches else 0
+
+    def begin(self, claimed: str | None, head: bytes) -> ContentInspection:
+        """
+        Start the inspection of an upload.
+
+        Args:
+            claimed (str | None): The type sent by the client or guessed from the name.
+            head (bytes): The first chunk of the content.
+
+        Returns:
+            ContentInspection: The inspection to feed the content to.
+
+        Raises:
+            ContentRejected: If the type of the content is not allowed.
+        """
+        config = self._config
+        content_type = (
+            resolve_mime(claimed, sniff_mime(head)) if config.sniff else claimed
+        )
+        mime_type = content_type or OCTET_STREAM
+        if any(match_mime(p, mime_type) for p in config.deny) or (
+            config.allow and not any(match_mime(p, mime_type) for p in config.allow)
+        ):
+            raise ContentRejected(415, f"Files of type {mime_type} are not allowed")
+        return ContentInspection(
+            content_type,
+            size_limit=self._size_limit(mime_type),
+            scanner=self._scanner,
+            queue_size=config.scan_queue,
+            timeout=config.scan_timeout,
+        )
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..entities.outbox import OutboxEntity
+from ..repositories.outbox import OutboxRepository
+from ..utils import singleton
+
+Sender = Callable[[str, dict[str, Any]], None]
+
+
+@singleton
+class OutboxService:
+    """
+    Relays events stored in the outbox to the broker.
+
+    Delivery is at least once: events are deleted only after they were
+    sent, so a relay failing in between sends them again on the next run.
+    """
+
+    @staticmethod
+    def _send_all(send: Sender, events: Sequence[OutboxEntity]) -> None:
+        for event in events:
+            send(event.task, event.payload)
+
+    async def relay(self, db: AsyncSession, send: Sender, batch_size: int = 100) -> int:
+        """
+        Send one batch of the oldest events and delete them from the outbox.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            send (Sender): Blocking callable publishing a task with its keyword
+                arguments; it runs in a worker thread.
+            batch_size (int, optional): The maximum number of events to send. Defaults to 100.
+
+        Returns:
+            int: The number of relayed events.
+        """
+        events = await OutboxRepository.get_batch(db, limit=batch_size)
+        if not events:
+            await db.commit()
+            return 0
+        await asyncio.to_thread(self._send_all, send, events)
+        await OutboxRepository.delete_by_ids(db, [event.id for event in events])
+        return len(events)
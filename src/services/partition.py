@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.logger import logger
+from ..core.partitioning import RANGE, add_months, month_start
+from ..repositories.partition import PartitionRepository
+from ..utils import singleton
+
+
+@dataclass
+class PartitionReport:
+    created: list[date] = field(default_factory=list)
+    dropped: list[date] = field(default_factory=list)
+
+
+@singleton
+class PartitionService:
+    """
+    Maintains the month partitions of `file_meta` partitioned by `created_at`.
+
+    Partitions are created ahead of the current month, so that new records
+    do not land in the default partition. A past month whose files are all
+    purged is detached and dropped, which removes its records at the cost
+    of a catalog change instead of a `DELETE` of every row.
+    """
+
+    async def maintain(
+        self,
+        db: AsyncSession,
+        months_ahead: int = 3,
+        drop_purged: bool = False,
+        now: datetime | None = None,
+    ) -> PartitionReport:
+        """
+        Create missing month partitions and drop purged ones.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            months_ahead (int, optional): The number of months after the current
+                one to create partitions for. Defaults to 3.
+            drop_purged (bool, optional): Whether to drop the partitions of past
+                months whose files are all purged. Defaults to False.
+            now (datetime | None, optional): The current time. Defaults to None.
+
+        Returns:
+            PartitionReport: The months whose partitions were created and dropped.
+        """
+        report = PartitionReport()
+        if await PartitionRepository.get_scheme(db) != RANGE:
+            return report
+
+        current = month_start(now or datetime.now(timezone.utc))
+        months = await PartitionRepository.get_months(db)
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in months:
+                await PartitionRepository.create_month(db, month)
+                logger.info(f"Partitions: file_meta of {month:%Y-%m} created")
+                report.created.append(month)
+
+        if drop_purged:
+            for month in months:
+                if month >= current or not await PartitionRepository.is_purged(
+                    db, month
+                ):
+                    continue
+                await PartitionRepository.drop_month(db, month)
+                logger.info(f"Partitions: purged file_meta of {month:%Y-%m} dropped")
+                report.dropped.append(month)
+        return report
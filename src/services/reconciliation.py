@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.logger import logger
+from ..repositories.file_meta import FileMetaRepository
+from ..repositories.reconciliation import ReconciliationRepository
+from ..storage import COLD, HOT, ObjectInfo, ObjectNotFound, StorageBackend, StorageTier
+from ..utils import singleton
+
+
+@dataclass
+class ReconciliationReport:
+    objects: int = 0
+    orphan_objects: int = 0
+    missing_objects: int = 0
+    stale_uploads: int = 0
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@singleton
+class ReconciliationService:
+    """
+    Finds objects without metadata and metadata without objects.
+
+    Each storage location is listed in key order and merge-joined with the
+    records read in the same order along the `internal_id` index, so memory
+    stays bounded by `batch_size` whatever the number of keys. Objects and
+    records younger than `min_age` are skipped, as they may belong to an
+    upload or a purge in progress. Every candidate is confirmed with a
+    point lookup before it is reported, which keeps a difference between
+    the database collation and the storage key order from causing deletes.
+    """
+
+    @staticmethod
+    async def _records(
+        db: AsyncSession,
+        tiers: Sequence[StorageTier],
+        start_after: str | None,
+        batch_size: int,
+    ) -> AsyncIterator[Row[Tuple[str, UUID, datetime]]]:
+        after_key, after_id = start_after, None
+        while True:
+            rows = await FileMetaRepository.get_internal_ids(
+                db, tiers, after_key, after_id, limit=batch_size
+            )
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            after_key, after_id = rows[-1][0], rows[-1][1]
+
+    async def _flush_orphans(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        tier: StorageTier,
+        keys: list[str],
+        delete: bool,
+        report: ReconciliationReport,
+    ) -> None:
+        existing = await FileMetaRepository.get_existing_internal_ids(db, keys)
+        orphans = [key for key in keys if key not in existing]
+        for key in orphans:
+            logger.warning(f"Reconciliation: object {key} ({tier}) has no metadata")
+        report.orphan_objects += len(orphans)
+        if delete and orphans:
+            await storage.delete_many(orphans, tier=tier)
+
+    async def _check_missing(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        key: str,
+        _id: UUID,
+        delete: bool,
+        report: ReconciliationReport,
+    ) -> None:
+        for tier in (HOT, COLD):
+            try:
+                await storage.head(key, tier=tier)
+            except ObjectNotFound:
+                continue
+            logger.warning(f"Reconciliation: file {_id} is stored in the {tier} tier")
+            return
+        logger.warning(f"Reconciliation: object {key} of file {_id} is missing")
+        report.missing_objects += 1
+        if delete:
+            await FileMetaRepository.mark_purged(db, [_id])
+
+    async def _reconcile_location(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        tiers: Sequence[StorageTier],
+        settled_before: datetime,
+        delete: bool,
+        batch_size: int,
+        report: ReconciliationReport,
+    ) -> None:
+        location = ",".join(tiers)
+        start_after = await ReconciliationRepository.get_checkpoint(db, location)
+        if start_after is not None:
+            logger.info(f"Reconciliation of {location} resumes after {start_after}")
+
+        objects = storage.list_objects(tiers[0], start_after=start_after)
+        records = self._records(db, tiers, start_after, batch_size)
+        obj: ObjectInfo | None = await anext(objects, None)
+        record = await anext(records, None)
+        matched: str | None = None
+        candidates: list[str] = []
+        processed = 0
+
+        while obj is not None or record is not None:
+            if obj is not None and (record is None or obj.key < record[0]):
+                key = obj.key
+                if key != matched:
+                    report.objects += 1
+                    if _aware(obj.last_modified) < settled_before:
+                        candidates.append(key)
+                obj = await anext(objects, None)
+            elif record is not None and (obj is None or obj.key > record[0]):
+                key, _id, created_at = record
+                if _aware(created_at) < settled_before:
+                    await self._check_missing(db, storage, key, _id, delete, report)
+                record = await anext(records, None)
+            else:
+                assert obj is not None and record is not None
+                # Keep the object until all records sharing its key are read
+                key = matched = record[0]
+                report.objects += 1
+                record = await anext(records, None)
+
+            processed += 1
+            if processed % batch_size == 0:
+                await self._flush_orphans(
+                    db, storage, tiers[0], candidates, delete, report
+                )
+                candidates = []
+                await ReconciliationRepository.save_checkpoint(db, location, key)
+
+        await self._flush_orphans(db, storage, tiers[0], candidates, delete, report)
+        await ReconciliationRepository.delete_checkpoint(db, location)
+
+    async def _abort_stale_uploads(
+        self, storage: StorageBackend, initiated_before: datetime, delete: bool
+    ) -> int:
+        stale = 0
+        async for upload in storage.list_multipart_uploads():
+            if _aware(upload.initiated) >= initiated_before:
+                continue
+            stale += 1
+            logger.warning(
+                f"Reconciliation: upload {upload.upload_id} of {upload.key} "
+                f"started at {upload.initiated} is incomplete"
+            )
+            if delete:
+                await storage.abort_multipart_upload(upload.key, upload.upload_id)
+        return stale
+
+    async def reconcile(
+        self,
+        db: AsyncSession,
+        storage: StorageBackend,
+        min_age: timedelta,
+        stale_upload_age: timedelta,
+        delete: bool = False,
+        batch_size: int = 1000,
+    ) -> ReconciliationReport:
+        """
+        Compare the storage with the metadata and report the differences.
+
+        Args:
+            db (AsyncSession): The asynchronous database session to use.
+            storage (StorageBackend): The storage to reconcile.
+            min_age (timedelta): Objects and records younger than this are skipped.
+            stale_upload_age (timedelta): Age after which an incomplete multipart
+                upload is considered abandoned.
+            delete (bool, optional): Whether to delete orphan objects, mark files
+                with missing objects as purged and abort stale uploads, instead of
+                only reporting them. Defaults to False.
+            batch_size (int, optional): The number of keys processed between
+                checkpoints. Defaults to 1000.
+
+        Returns:
+            ReconciliationReport: The numbers of checked objects and found differences.
+        """
+        now = datetime.now(timezone.utc)
+        report = ReconciliationReport()
+        for tiers in storage.tier_groups():
+            await self._reconcile_location(
+                db, storage, tiers, now - min_age, delete, batch_size, report
+            )
+        report.stale_uploads = await self._abort_stale_uploads(
+            storage, now - stale_upload_age, delete
+        )
+        return report
@@ -0,0 +1,25 @@
+from .base import (
+    COLD,
+    HOT,
+    ChecksumMismatch,
+    MultipartUploadInfo,
+    ObjectHead,
+    ObjectInfo,
+    ObjectNotFound,
+    StorageBackend,
+    StorageTier,
+    UploadedPart,
+)
+
+__all__ = [
+    "COLD",
+    "ChecksumMismatch",
+    "HOT",
+    "MultipartUploadInfo",
+    "ObjectHead",
+    "ObjectInfo",
+    "ObjectNotFound",
+    "StorageBackend",
+    "StorageTier",
+    "UploadedPart",
+]
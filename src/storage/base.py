@@ -0,0 +1,217 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Literal, Sequence
+
+from .checksum import ChecksumAlgorithm
+
+StorageTier = Literal["hot", "cold"]
+HOT: StorageTier = "hot"
+COLD: StorageTier = "cold"
+
+
+class ObjectNotFound(Exception):
+    """Raised when the requested object does not exist in the storage."""
+
+
+class ChecksumMismatch(Exception):
+    """Raised when stored data does not match the checksum sent with it."""
+
+
+@dataclass
+class ObjectHead:
+    size: int
+    content_type: str | None = None
+    etag: str | None = None
+    last_modified: datetime | None = None
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    last_modified: datetime
+
+
+@dataclass
+class MultipartUploadInfo:
+    key: str
+    upload_id: str
+    initiated: datetime
+
+
+@dataclass
+class UploadedPart:
+    part_number: int
+    etag: str
+    checksum_algorithm: ChecksumAlgorithm | None = None
+    checksum: str | None = None
+
+
+class StorageBackend(ABC):
+    """
+    Interface of an object storage engine used by `FileService`.
+
+    Objects are addressed by key and written through multipart uploads:
+    `create_multipart_upload`, any number of `upload_part` calls and then
+    `complete_multipart_upload` or `abort_multipart_upload`. New objects
+    are always written to the hot tier and can later be moved to the cold
+    one; every read-side method takes the tier the object currently is in.
+    """
+
+    chunk_size: int = 5 * 1024 * 1024
+
+    @abstractmethod
+    async def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str | None = None,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+    ) -> str:
+        """
+        Start a multipart upload and return its identifier. Parts of the
+        upload are then sent with `checksum_algorithm` checksums.
+        """
+
+    @abstractmethod
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+        checksum: str | None = None,
+    ) -> UploadedPart:
+        """
+        Store one part of a multipart upload. `checksum` is the base64 encoded
+        digest of `data`.
+
+        Raises:
+            ChecksumMismatch: If `data` does not match `checksum`.
+        """
+
+    @abstractmethod
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: Sequence[UploadedPart]
+    ) -> None:
+        """Assemble the uploaded parts into the object `key`."""
+
+    @abstractmethod
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Drop a multipart upload together with its parts."""
+
+    @abstractmethod
+    async def head(self, key: str, tier: StorageTier = HOT) -> ObjectHead:
+        """
+        Return the object's metadata.
+
+        Raises:
+            ObjectNotFound: If the object does not exist.
+        """
+
+    @abstractmethod
+    def read(
+        self,
+        key: str,
+        offset: int = 0,
+        length: int | None = None,
+        tier: StorageTier = HOT,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream `length` bytes of the object starting at `offset`, in chunks of
+        at most `chunk_size` bytes. Reads till the end when `length` is None.
+        """
+
+    async def read_ahead(
+        self,
+        key: str,
+        size: int,
+        part_size: int,
+        window: int,
+        tier: StorageTier = HOT,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream the first `size` bytes of the object like `read`, but fetch
+        them as ranged reads of `part_size` bytes, `window` of them
+        concurrently ahead of the consumer. Parts are yielded in order, so
+        at most `window + 1` parts are held in memory.
+        """
+
+        async def fetch(offset: int) -> list[bytes]:
+            length = min(part_size, size - offset)
+            return [chunk async for chunk in self.read(key, offset, length, tier)]
+
+        offsets = iter(range(0, size, part_size))
+        pending: deque[asyncio.Task[list[bytes]]] = deque()
+        try:
+            for offset in offsets:
+                pending.append(asyncio.create_task(fetch(offset)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                chunks = await pending.popleft()
+                following = next(offsets, None)
+                if following is not None:
+                    pending.append(asyncio.create_task(fetch(following)))
+                for chunk in chunks:
+                    yield chunk
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @abstractmethod
+    def list_objects(
+        self, tier: StorageTier = HOT, start_after: str | None = None
+    ) -> AsyncIterator[ObjectInfo]:
+        """
+        Stream the objects of the tier in ascending order of the UTF-8 encoded
+        keys, starting after the key `start_after`.
+        """
+
+    @abstractmethod
+    def list_multipart_uploads(self) -> AsyncIterator[MultipartUploadInfo]:
+        """Stream the multipart uploads that were neither completed nor aborted."""
+
+    def tier_groups(self) -> Sequence[tuple[StorageTier, ...]]:
+        """
+        Group tiers by the namespace their objects share. `list_objects` of
+        the first tier of a group returns the objects of the whole group.
+        """
+        return ((HOT,), (COLD,))
+
+    @abstractmethod
+    async def delete_many(self, keys: Sequence[str], tier: StorageTier = HOT) -> None:
+        """Delete the given objects. Missing keys are ignored."""
+
+    @abstractmethod
+    async def move(self, key: str, source: StorageTier, target: StorageTier) -> None:
+        """
+        Move the object between tiers. The object stays readable in `source`
+        until it is available in `target`.
+
+        Raises:
+            ObjectNotFound: If the object does not exist in `source`.
+        """
+
+    @abstractmethod
+    async def copy(
+        self, source_key: str, target_key: str, tier: StorageTier = HOT
+    ) -> None:
+        """
+        Copy the object `source_key` of the tier to the new hot object
+        `target_key` inside the storage, without streaming it through the
+        service.
+
+        Raises:
+            ObjectNotFound: If the object does not exist in the tier.
+        """
+
+    @abstractmethod
+    async def presign(
+        self, key: str, expires_in: int = 3600, tier: StorageTier = HOT
+    ) -> str:
+        """Return a URL the object can be downloaded from without the service."""
@@ -0,0 +1,47 @@
+import hashlib
+from base64 import b64encode
+from typing import Literal, Protocol
+
+ChecksumAlgorithm = Literal["md5", "crc32c", "sha256"]
+
+# Algorithm names used in the `Digest` HTTP header (RFC 3230)
+DIGEST_NAMES: dict[str, str] = {
+    "md5": "md5",
+    "crc32c": "crc32c",
+    "sha256": "sha-256",
+}
+
+
+class Hasher(Protocol):
+    def update(self, data: bytes, /) -> None: ...
+
+    def digest(self) -> bytes: ...
+
+
+class _Crc32c:
+    def __init__(self) -> None:
+        try:
+            from crc32c import crc32c
+        except ImportError as e:
+            raise RuntimeError(
+                "CRC32C checksums require the optional `crc32c` package"
+            ) from e
+        self._crc32c = crc32c
+        self._value = 0
+
+    def update(self, data: bytes, /) -> None:
+        self._value = self._crc32c(data, self._value)
+
+    def digest(self) -> bytes:
+        return self._value.to_bytes(4, "big")
+
+
+def new_hasher(algorithm: ChecksumAlgorithm) -> Hasher:
+    """Create an incremental hasher for the given algorithm."""
+    if algorithm == "crc32c":
+        return _Crc32c()
+    return hashlib.new(algorithm)
+
+
+def to_base64(digest: bytes) -> str:
+    return b64encode(digest).decode("ascii")
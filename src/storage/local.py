@@ -0,0 +1,338 @@
+import asyncio
+import errno
+import hashlib
+import mmap
+import os
+import shutil
+from datetime import datetime, timezone
+from mimetypes import guess_type
+from pathlib import Path
+from stat import S_ISREG
+from typing import AsyncIterator, Sequence
+from uuid import uuid4
+
+from .base import (
+    COLD,
+    HOT,
+    ChecksumMismatch,
+    MultipartUploadInfo,
+    ObjectHead,
+    ObjectInfo,
+    ObjectNotFound,
+    StorageBackend,
+    StorageTier,
+    UploadedPart,
+)
+from .checksum import ChecksumAlgorithm, new_hasher, to_base64
+
+_UPLOADS_DIR = ".uploads"
+_COLD_DIR = ".cold"
+# File of an upload directory holding the key of the object being uploaded
+_UPLOAD_KEY_FILE = "key"
+_LIST_BATCH_SIZE = 1000
+
+
+def _copy_file(src: int, dst: int, size: int) -> None:
+    """Append `size` bytes of `src` to `dst` in kernel space when possible."""
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(dst, src, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError:
+        if offset:
+            raise
+        os.lseek(src, 0, os.SEEK_SET)
+        while chunk := os.read(src, 1024 * 1024):
+            os.write(dst, chunk)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Storage engine keeping objects as plain files under `root`.
+
+    Parts of a multipart upload are written to a per-upload directory and
+    concatenated with `os.sendfile` on completion. The object then appears
+    under its key through an atomic rename, so readers never see partial
+    files. Reads are served from a read-only memory map.
+
+    Cold objects live under `cold_root`, which may point to cheaper disks;
+    it defaults to a subdirectory of `root`.
+
+    Objects are never modified in place, so copies are hard links when
+    both files are on the same filesystem.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        chunk_size: int = 5 * 1024 * 1024,
+        cold_root: str | Path | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.cold_root = Path(cold_root) if cold_root else self.root / _COLD_DIR
+        self.chunk_size = chunk_size
+        (self.root / _UPLOADS_DIR).mkdir(parents=True, exist_ok=True)
+        self.cold_root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, tier: StorageTier = HOT) -> Path:
+        if (
+            not key
+            or key.startswith(".")
+            or os.sep in key
+            or (os.altsep is not None and os.altsep in key)
+        ):
+            raise ValueError(f"Invalid object key: {key!r}")
+        return (self.cold_root if tier == COLD else self.root) / key
+
+    def _upload_dir(self, upload_id: str) -> Path:
+        path = self.root / _UPLOADS_DIR / upload_id
+        if not path.is_dir():
+            raise ObjectNotFound(upload_id)
+        return path
+
+    async def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str | None = None,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+    ) -> str:
+        self._path(key)
+        upload_id = uuid4().hex
+        await asyncio.to_thread(self._create_upload_dir, upload_id, key)
+        return upload_id
+
+    def _create_upload_dir(self, upload_id: str, key: str) -> None:
+        path = self.root / _UPLOADS_DIR / upload_id
+        path.mkdir()
+        (path / _UPLOAD_KEY_FILE).write_text(key, encoding="utf-8")
+
+    @staticmethod
+    def _write_part(
+        path: Path,
+        data: bytes,
+        checksum_algorithm: ChecksumAlgorithm | None,
+        checksum: str | None,
+    ) -> str:
+        md5 = hashlib.md5(data).digest()
+        if checksum_algorithm and checksum:
+            if checksum_algorithm == "md5":
+                digest = md5
+            else:
+                hasher = new_hasher(checksum_algorithm)
+                hasher.update(data)
+                digest = hasher.digest()
+            if to_base64(digest) != checksum:
+                raise ChecksumMismatch(path.name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return md5.hex()
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+        checksum: str | None = None,
+    ) -> UploadedPart:
+        path = self._upload_dir(upload_id) / str(part_number)
+        etag = await asyncio.to_thread(
+            self._write_part, path, data, checksum_algorithm, checksum
+        )
+        return UploadedPart(part_number, f'"{etag}"', checksum_algorithm, checksum)
+
+    @staticmethod
+    def _assemble(
+        upload_dir: Path, parts: Sequence[UploadedPart], target: Path
+    ) -> None:
+        tmp = upload_dir / "object"
+        with open(tmp, "wb") as out:
+            for part in sorted(parts, key=lambda p: p.part_number):
+                with open(upload_dir / str(part.part_number), "rb") as src:
+                    size = os.fstat(src.fileno()).st_size
+                    _copy_file(src.fileno(), out.fileno(), size)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, target)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: Sequence[UploadedPart]
+    ) -> None:
+        upload_dir = self._upload_dir(upload_id)
+        await asyncio.to_thread(self._assemble, upload_dir, parts, self._path(key))
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        await asyncio.to_thread(
+            shutil.rmtree, self.root / _UPLOADS_DIR / upload_id, True
+        )
+
+    async def head(self, key: str, tier: StorageTier = HOT) -> ObjectHead:
+        try:
+            stat = await asyncio.to_thread(os.stat, self._path(key, tier))
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+        return ObjectHead(
+            size=stat.st_size,
+            content_type=guess_type(key)[0],
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        )
+
+    async def read(
+        self,
+        key: str,
+        offset: int = 0,
+        length: int | None = None,
+        tier: StorageTier = HOT,
+    ) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(open, self._path(key, tier), "rb")
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if length is None else min(size, offset + length)
+            if offset >= end:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                pos = offset
+                while pos < end:
+                    stop = min(pos + self.chunk_size, end)
+                    yield await asyncio.to_thread(mm.__getitem__, slice(pos, stop))
+                    pos = stop
+
+    @staticmethod
+    def _list_names(directory: Path, start_after: str | None) -> list[str]:
+        return sorted(
+            name
+            for name in os.listdir(directory)
+            if not name.startswith(".") and (start_after is None or name > start_after)
+        )
+
+    @staticmethod
+    def _stat_files(directory: Path, names: list[str]) -> list[ObjectInfo]:
+        objects = []
+        for name in names:
+            try:
+                stat = os.stat(directory / name)
+            except FileNotFoundError:
+                continue
+            if S_ISREG(stat.st_mode):
+                objects.append(
+                    ObjectInfo(
+                        name,
+                        stat.st_size,
+                        datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                    )
+                )
+        return objects
+
+    async def list_objects(
+        self, tier: StorageTier = HOT, start_after: str | None = None
+    ) -> AsyncIterator[ObjectInfo]:
+        """
+        List the tier directory. Unlike S3 pages, the names of the whole
+        directory are read and sorted at once.
+        """
+        directory = self.cold_root if tier == COLD else self.root
+        names = await asyncio.to_thread(self._list_names, directory, start_after)
+        for start in range(0, len(names), _LIST_BATCH_SIZE):
+            end = start + _LIST_BATCH_SIZE
+            for info in await asyncio.to_thread(
+                self._stat_files, directory, names[start:end]
+            ):
+                yield info
+
+    def _list_uploads(self) -> list[MultipartUploadInfo]:
+        uploads = []
+        for path in sorted((self.root / _UPLOADS_DIR).iterdir()):
+            try:
+                key_file = path / _UPLOAD_KEY_FILE
+                key = key_file.read_text(encoding="utf-8")
+                initiated = key_file.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            uploads.append(
+                MultipartUploadInfo(
+                    key,
+                    path.name,
+                    datetime.fromtimestamp(initiated, tz=timezone.utc),
+                )
+            )
+        return uploads
+
+    async def list_multipart_uploads(self) -> AsyncIterator[MultipartUploadInfo]:
+        for upload in await asyncio.to_thread(self._list_uploads):
+            yield upload
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    async def delete_many(self, keys: Sequence[str], tier: StorageTier = HOT) -> None:
+        await asyncio.to_thread(self._unlink, [self._path(key, tier) for key in keys])
+
+    @staticmethod
+    def _move(source: Path, target: Path) -> None:
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            tmp = target.with_name(f".{target.name}.{uuid4().hex}")
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, target)
+            source.unlink()
+
+    async def move(self, key: str, source: StorageTier, target: StorageTier) -> None:
+        if source == target:
+            return
+        try:
+            await asyncio.to_thread(
+                self._move, self._path(key, source), self._path(key, target)
+            )
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+
+    @staticmethod
+    def _copy(source: Path, target: Path) -> None:
+        tmp = target.with_name(f".{target.name}.{uuid4().hex}")
+        try:
+            os.link(source, tmp)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            try:
+                shutil.copyfile(source, tmp)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+        os.replace(tmp, target)
+
+    async def copy(
+        self, source_key: str, target_key: str, tier: StorageTier = HOT
+    ) -> None:
+        try:
+            await asyncio.to_thread(
+                self._copy, self._path(source_key, tier), self._path(target_key)
+            )
+        except FileNotFoundError as e:
+            raise ObjectNotFound(source_key) from e
+
+    async def presign(
+        self, key: str, expires_in: int = 3600, tier: StorageTier = HOT
+    ) -> str:
+        """
+        Return a `file://` URI of the object. It is only usable by consumers
+        sharing the filesystem and does not expire.
+        """
+        return self._path(key, tier).resolve().as_uri()
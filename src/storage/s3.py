@@ -0,0 +1,307 @@
+import asyncio
+from typing import Any, AsyncIterator, Sequence
+
+from botocore.exceptions import ClientError
+
+from .base import (
+    COLD,
+    HOT,
+    ChecksumMismatch,
+    MultipartUploadInfo,
+    ObjectHead,
+    ObjectInfo,
+    ObjectNotFound,
+    StorageBackend,
+    StorageTier,
+    UploadedPart,
+)
+from .checksum import ChecksumAlgorithm
+
+_NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+_BAD_DIGEST_CODES = {"BadDigest", "InvalidDigest"}
+# Multipart upload `ChecksumAlgorithm` values and part checksum parameters
+_CHECKSUM_ALGORITHMS = {"crc32c": "CRC32C", "sha256": "SHA256"}
+_CHECKSUM_PARAMS = {
+    "md5": "ContentMD5",
+    "crc32c": "ChecksumCRC32C",
+    "sha256": "ChecksumSHA256",
+}
+_DELETE_BATCH_SIZE = 1000
+_LIST_PAGE_SIZE = 1000
+# Parts of a multipart copy in flight at once
+_COPY_CONCURRENCY = 8
+
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in _NOT_FOUND_CODES
+
+
+class S3Storage(StorageBackend):
+    """
+    Storage engine on top of an aioboto3 S3 client.
+
+    The cold tier is `cold_bucket_name` when it is set, otherwise cold
+    objects stay in the main bucket under `cold_storage_class`.
+
+    Copies are made by S3 itself: with `copy_object` for objects of up to
+    `copy_part_size` bytes, and with parallel `upload_part_copy` ranges of
+    that size for larger ones.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket_name: str,
+        chunk_size: int = 5 * 1024 * 1024,
+        cold_bucket_name: str | None = None,
+        cold_storage_class: str = "STANDARD_IA",
+        copy_part_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.client = client
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+        self.cold_bucket_name = cold_bucket_name
+        self.cold_storage_class = cold_storage_class
+        self.copy_part_size = copy_part_size
+
+    def _bucket(self, tier: StorageTier) -> str:
+        if tier == COLD and self.cold_bucket_name:
+            return self.cold_bucket_name
+        return self.bucket_name
+
+    async def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str | None = None,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+    ) -> str:
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+        if checksum_algorithm in _CHECKSUM_ALGORITHMS:
+            params["ChecksumAlgorithm"] = _CHECKSUM_ALGORITHMS[checksum_algorithm]
+        mpu = await self.client.create_multipart_upload(**params)
+        return mpu["UploadId"]
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes,
+        checksum_algorithm: ChecksumAlgorithm | None = None,
+        checksum: str | None = None,
+    ) -> UploadedPart:
+        params = {}
+        if checksum_algorithm and checksum:
+            params[_CHECKSUM_PARAMS[checksum_algorithm]] = checksum
+        try:
+            part = await self.client.upload_part(
+                Bucket=self.bucket_name,
+                Key=key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=data,
+                **params,
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _BAD_DIGEST_CODES:
+                raise ChecksumMismatch(f"{key} part {part_number}") from e
+            raise
+        return UploadedPart(part_number, part["ETag"], checksum_algorithm, checksum)
+
+    @staticmethod
+    def _completed_part(part: UploadedPart) -> dict:
+        completed = {"PartNumber": part.part_number, "ETag": part.etag}
+        if part.checksum and part.checksum_algorithm in _CHECKSUM_ALGORITHMS:
+            completed[_CHECKSUM_PARAMS[part.checksum_algorithm]] = part.checksum
+        return completed
+
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: Sequence[UploadedPart]
+    ) -> None:
+        await self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [self._completed_part(part) for part in parts]},
+        )
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        await self.client.abort_multipart_upload(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id
+        )
+
+    async def head(self, key: str, tier: StorageTier = HOT) -> ObjectHead:
+        try:
+            head = await self.client.head_object(Bucket=self._bucket(tier), Key=key)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ObjectNotFound(key) from e
+            raise
+        return ObjectHead(
+            size=head["ContentLength"],
+            content_type=head.get("ContentType"),
+            etag=head.get("ETag"),
+            last_modified=head.get("LastModified"),
+        )
+
+    async def read(
+        self,
+        key: str,
+        offset: int = 0,
+        length: int | None = None,
+        tier: StorageTier = HOT,
+    ) -> AsyncIterator[bytes]:
+        params = {"Bucket": self._bucket(tier), "Key": key}
+        if length is not None:
+            if length <= 0:
+                return
+            params["Range"] = f"bytes={offset}-{offset + length - 1}"
+        elif offset:
+            params["Range"] = f"bytes={offset}-"
+
+        try:
+            response = await self.client.get_object(**params)
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ObjectNotFound(key) from e
+            raise
+        async with response["Body"] as stream:
+            async for chunk in stream.iter_chunks(self.chunk_size):
+                yield chunk
+
+    async def list_objects(
+        self, tier: StorageTier = HOT, start_after: str | None = None
+    ) -> AsyncIterator[ObjectInfo]:
+        params: dict[str, Any] = {
+            "Bucket": self._bucket(tier),
+            "MaxKeys": _LIST_PAGE_SIZE,
+        }
+        if start_after:
+            params["StartAfter"] = start_after
+        while True:
+            page = await self.client.list_objects_v2(**params)
+            for item in page.get("Contents", []):
+                yield ObjectInfo(item["Key"], item["Size"], item["LastModified"])
+            if not page.get("IsTruncated"):
+                return
+            params["ContinuationToken"] = page["NextContinuationToken"]
+
+    async def list_multipart_uploads(self) -> AsyncIterator[MultipartUploadInfo]:
+        params: dict[str, Any] = {
+            "Bucket": self.bucket_name,
+            "MaxUploads": _LIST_PAGE_SIZE,
+        }
+        while True:
+            page = await self.client.list_multipart_uploads(**params)
+            for upload in page.get("Uploads", []):
+                yield MultipartUploadInfo(
+                    upload["Key"], upload["UploadId"], upload["Initiated"]
+                )
+            if not page.get("IsTruncated"):
+                return
+            params["KeyMarker"] = page["NextKeyMarker"]
+            params["UploadIdMarker"] = page["NextUploadIdMarker"]
+
+    def tier_groups(self) -> Sequence[tuple[StorageTier, ...]]:
+        if self.cold_bucket_name:
+            return ((HOT,), (COLD,))
+        return ((HOT, COLD),)
+
+    async def delete_many(self, keys: Sequence[str], tier: StorageTier = HOT) -> None:
+        for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+            end = start + _DELETE_BATCH_SIZE
+            batch = keys[start:end]
+            await self.client.delete_objects(
+                Bucket=self._bucket(tier),
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+
+    async def move(self, key: str, source: StorageTier, target: StorageTier) -> None:
+        if source == target:
+            return
+        source_bucket, target_bucket = self._bucket(source), self._bucket(target)
+        try:
+            await self.client.copy_object(
+                Bucket=target_bucket,
+                Key=key,
+                CopySource={"Bucket": source_bucket, "Key": key},
+                StorageClass=self.cold_storage_class if target == COLD else "STANDARD",
+                MetadataDirective="COPY",
+            )
+        except ClientError as e:
+            if _is_not_found(e):
+                raise ObjectNotFound(key) from e
+            raise
+        if source_bucket != target_bucket:
+            await self.delete_many([key], tier=source)
+
+    async def _copy_part(
+        self,
+        source: dict[str, str],
+        key: str,
+        upload_id: str,
+        part_number: int,
+        start: int,
+        end: int,
+        semaphore: asyncio.Semaphore,
+    ) -> UploadedPart:
+        async with semaphore:
+            part = await self.client.upload_part_copy(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                CopySource=source,
+                CopySourceRange=f"bytes={start}-{end - 1}",
+            )
+        return UploadedPart(part_number, part["CopyPartResult"]["ETag"])
+
+    async def copy(
+        self, source_key: str, target_key: str, tier: StorageTier = HOT
+    ) -> None:
+        source = {"Bucket": self._bucket(tier), "Key": source_key}
+        head = await self.head(source_key, tier=tier)
+        if head.size <= self.copy_part_size:
+            await self.client.copy_object(
+                Bucket=self.bucket_name,
+                Key=target_key,
+                CopySource=source,
+                StorageClass="STANDARD",
+                MetadataDirective="COPY",
+            )
+            return
+
+        upload_id = await self.create_multipart_upload(target_key, head.content_type)
+        semaphore = asyncio.Semaphore(_COPY_CONCURRENCY)
+        try:
+            parts = await asyncio.gather(
+                *(
+                    self._copy_part(
+                        source,
+                        target_key,
+                        upload_id,
+                        part_number,
+                        start,
+                        min(start + self.copy_part_size, head.size),
+                        semaphore,
+                    )
+                    for part_number, start in enumerate(
+                        range(0, head.size, self.copy_part_size), start=1
+                    )
+                )
+            )
+            await self.complete_multipart_upload(target_key, upload_id, parts)
+        except Exception as e:
+            await self.abort_multipart_upload(target_key, upload_id)
+            raise e
+
+    async def presign(
+        self, key: str, expires_in: int = 3600, tier: StorageTier = HOT
+    ) -> str:
+        return await self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self._bucket(tier), "Key": key},
+            ExpiresIn=expires_in,
+        )
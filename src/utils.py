@@ -1,3 +1,9 @@
+import os
+import time
+from datetime import datetime, timezone
+from uuid import UUID
+
+
 def singleton(cls):
     instances = {}
 
@@ -7,3 +13,21 @@ def singleton(cls):
         return instances[cls]
 
     return get_instance
+
+
+def uuid7(timestamp: datetime | None = None) -> UUID:
+    """UUID версии 7: миллисекунды Unix-времени и 74 случайных бита (RFC 9562)"""
+    if timestamp is None:
+        ms = time.time_ns() // 1_000_000
+    else:
+        ms = int(timestamp.timestamp() * 1000)
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76 | (rand >> 62 & 0xFFF) << 64
+    value |= 0b10 << 62 | rand & 0x3FFF_FFFF_FFFF_FFFF
+    return UUID(int=value)
+
+
+def uuid7_time(value: UUID) -> datetime:
+    """Время создания UUID версии 7"""
+    return datetime.fromtimestamp((value.int >> 80) / 1000, timezone.utc)
@@ -0,0 +1,43 @@
+from uuid import uuid4
+
+from src.api.server import app
+from src.core.config import LimitsConfig
+from src.core.limiter import AdmissionController
+
+
+async def test_upload_rejected_before_body_is_read():
+    """Test that an upload over the limit is answered without reading its body"""
+    controller = AdmissionController()
+    controller.configure(LimitsConfig(max_transfers=1, retry_after=5))
+    slot = await controller.admit(uuid4())
+    received, sent = [], []
+
+    async def receive():
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/file/",
+        "raw_path": b"/api/v1/file/",
+        "root_path": "",
+        "query_string": f"owner_id={uuid4()}".encode(),
+        "headers": [(b"content-type", b"multipart/form-data; boundary=x")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        await slot.release()
+        controller.configure(LimitsConfig())
+
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"5") in sent[0]["headers"]
+    assert not received
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[2]
+# The subprocess builds the config, whatever the environment of the tests
+ENV = {**os.environ, "CONFIG_FILE": str(ROOT / "configs" / "config.example.yaml")}
+
+
+def test_api_does_not_import_worker():
+    """Test that the API process does not load the Celery application or worker"""
+    code = (
+        "import sys, src;"
+        "src.rest_app;"
+        "print(sorted(m for m in ('celery', 'celery.worker', 'src.celery.app')"
+        " if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+        env=ENV,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,34 @@
+from typing import Any
+
+import pytest
+import uvicorn
+
+from src.api import run
+from src.core.config import ServerConfig
+
+
+def test_run_uvicorn_settings(monkeypatch: pytest.MonkeyPatch):
+    """Test that the server settings are passed to uvicorn"""
+    calls: list[tuple[str, dict[str, Any]]] = []
+    monkeypatch.setattr(
+        uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs))
+    )
+
+    run.run_uvicorn(
+        ServerConfig(workers=4, keep_alive=30, backlog=4096, limit_concurrency=500)
+    )
+
+    [(app, kwargs)] = calls
+    assert app == run.APP
+    assert kwargs["workers"] == 4
+    assert kwargs["timeout_keep_alive"] == 30
+    assert kwargs["backlog"] == 4096
+    assert kwargs["limit_concurrency"] == 500
+
+
+def test_zero_workers_means_one_per_core(monkeypatch: pytest.MonkeyPatch):
+    """Test that `workers: 0` starts one process per CPU core"""
+    monkeypatch.setattr(run.os, "cpu_count", lambda: 6)
+
+    assert run.get_workers(ServerConfig(workers=0)) == 6
+    assert run.get_workers(ServerConfig(workers=2)) == 2
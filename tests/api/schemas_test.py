@@ -0,0 +1,14 @@
+from src.api.schemas.v1.file import accepts_encoding
+
+
+def test_accepts_encoding():
+    """Test that q-values of the Accept-Encoding header are respected"""
+    assert accepts_encoding("gzip, deflate, br", "gzip")
+    assert accepts_encoding("br;q=1.0, GZIP;q=0.5", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("", "gzip")
+    assert not accepts_encoding("identity", "gzip")
+    assert not accepts_encoding("gzip;q=0", "gzip")
+    assert not accepts_encoding("gzip; q=0.000, *", "gzip")
+    assert not accepts_encoding("*;q=0", "gzip")
+    assert not accepts_encoding("gzip;q=high", "gzip")
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[2]
+# The subprocess builds the config, whatever the environment of the tests
+ENV = {**os.environ, "CONFIG_FILE": str(ROOT / "configs" / "config.example.yaml")}
+
+
+def test_worker_does_not_import_fastapi():
+    """Test that the worker process loads neither FastAPI nor the API application"""
+    code = (
+        "import sys, src, src.celery.tasks;"
+        "src.worker_app;"
+        "print(sorted(m for m in ('fastapi', 'starlette', 'src.api.server')"
+        " if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+        env=ENV,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.celery.runtime import WorkerRuntime
+
+
+@pytest.fixture
+def runtime():
+    runtime = WorkerRuntime()
+    runtime.start()
+    yield runtime
+    runtime.stop()
+
+
+def test_run_reuses_loop(runtime: WorkerRuntime):
+    """Test that all coroutines run on the same long-lived loop"""
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = runtime.run(current_loop())
+    second = runtime.run(current_loop())
+
+    assert first is second
+    assert first.is_running()
+
+
+def test_run_propagates_exceptions(runtime: WorkerRuntime):
+    """Test that an exception raised by the coroutine reaches the caller"""
+
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        runtime.run(fail())
+
+
+def test_run_from_threads_is_concurrent(runtime: WorkerRuntime):
+    """Test that tasks submitted from several threads overlap on the loop"""
+
+    async def sleep():
+        await asyncio.sleep(0.2)
+
+    threads = [threading.Thread(target=runtime.run, args=(sleep(),)) for _ in range(5)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - started < 0.6
+
+
+def test_stop_and_restart():
+    """Test that the runtime can be started again after a stop"""
+    runtime = WorkerRuntime()
+    runtime.start()
+    runtime.stop()
+    assert not runtime.running
+
+    assert runtime.run(asyncio.sleep(0, result=42)) == 42
+    assert runtime.running
+    runtime.stop()
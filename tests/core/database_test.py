@@ -0,0 +1,117 @@
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import database
+from src.entities import Base
+from src.entities.file_meta import FileMetaEntity
+from src.repositories.file_meta import FileMetaRepository
+
+
+async def create_db(uri: str) -> None:
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+async def add_file(uri: str, owner_id: UUID, title: str) -> UUID:
+    """Insert a record into one database only, as if a replica lagged behind"""
+    _id = uuid4()
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(FileMetaEntity),
+            {
+                "id": _id,
+                "internal_id": title,
+                "owner_id": owner_id,
+                "title": title,
+                "size": 1,
+            },
+        )
+    await engine.dispose()
+    return _id
+
+
+async def get_titles(owner_id: UUID) -> list[str]:
+    async for db in database.get_db():
+        files, _ = await FileMetaRepository.get_list(db, owner_id=owner_id)
+        return [file.title for file in files]
+    return []
+
+
+@pytest.fixture
+async def uris(tmp_path: Path):
+    """Primary and replica SQLite files, routed by `get_db`"""
+    primary, replica = (f"sqlite+aiosqlite:///{tmp_path / n}.db" for n in "pr")
+    for uri in (primary, replica):
+        await create_db(uri)
+    await database.init_engine(primary, [replica], read_your_writes=60)
+    yield primary, replica
+    await database.close_engine()
+
+
+async def test_reads_go_to_replica(uris):
+    """Test that repository reads use the replica and plain queries the primary"""
+    primary, replica = uris
+    owner_id = uuid4()
+    await add_file(primary, owner_id, "primary.txt")
+    replica_id = await add_file(replica, owner_id, "replica.txt")
+
+    assert await get_titles(owner_id) == ["replica.txt"]
+    async for db in database.get_db():
+        assert (await FileMetaRepository.get_by_id(db, replica_id)).id == replica_id
+        keys = ["primary.txt", "replica.txt"]
+        assert await FileMetaRepository.get_existing_internal_ids(db, keys) == {
+            "primary.txt"
+        }
+
+
+async def test_read_your_writes(uris):
+    """Test that a file and its owner are read from the primary after a change"""
+    primary, replica = uris
+    owner_id, other_owner_id = uuid4(), uuid4()
+    await add_file(replica, other_owner_id, "replica.txt")
+
+    async for db in database.get_db():
+        obj = await FileMetaRepository.create(db, "key", owner_id, "created.txt")
+    async for db in database.get_db():
+        assert (await FileMetaRepository.get_by_id(db, obj.id)).title == "created.txt"
+
+    assert await get_titles(owner_id) == ["created.txt"]
+    assert await get_titles(other_owner_id) == ["replica.txt"]
+
+
+async def test_session_reads_primary_after_write(uris):
+    """Test that a session which wrote does not read from a replica"""
+    primary, replica = uris
+    owner_id = uuid4()
+    await add_file(primary, owner_id, "primary.txt")
+    await add_file(replica, owner_id, "replica.txt")
+
+    async for db in database.get_db():
+        await FileMetaRepository.delete_by_id(db, uuid4())
+        files, _ = await FileMetaRepository.get_list(db, owner_id=owner_id)
+        assert [file.title for file in files] == ["primary.txt"]
+
+
+async def test_round_robin_skips_unavailable(tmp_path: Path):
+    """Test that replicas are used in turn and failing ones are skipped"""
+    first, second = (f"sqlite+aiosqlite:///{tmp_path / n}.db" for n in "ab")
+    missing = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'c.db'}"
+    pool = database.ReplicaPool([first, missing, second])
+    await pool.start()
+    try:
+        assert [pool.pick().url.database for _ in range(4)] == [  # type:ignore
+            str(tmp_path / f"{n}.db") for n in "abab"
+        ]
+
+        (tmp_path / "missing").mkdir()
+        await pool.check()
+        assert len(pool.healthy) == 3
+    finally:
+        await pool.close()
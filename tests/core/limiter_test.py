@@ -0,0 +1,75 @@
+from uuid import uuid4
+
+import pytest
+
+from src.core.config import LimitsConfig
+from src.core.limiter import (
+    AdmissionController,
+    AdmissionRejected,
+    LocalLimiterBackend,
+)
+
+
+@pytest.fixture
+def controller() -> AdmissionController:
+    controller = AdmissionController()
+    controller.configure(
+        LimitsConfig(max_transfers=3, max_transfers_per_owner=2, retry_after=5)
+    )
+    return controller
+
+
+async def test_admit_per_owner_limit(controller: AdmissionController):
+    """Test that an owner over its limit is rejected with 429"""
+    owner_id = uuid4()
+    await controller.admit(owner_id)
+    await controller.admit(owner_id)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.admit(owner_id)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.retry_after == 5
+
+
+async def test_admit_global_limit(controller: AdmissionController):
+    """Test that transfers over the global limit are rejected with 503"""
+    for _ in range(3):
+        await controller.admit(uuid4())
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.admit(uuid4())
+    assert exc_info.value.status_code == 503
+
+
+async def test_release_frees_slot(controller: AdmissionController):
+    """Test that releasing a slot admits the next transfer"""
+    owner_id = uuid4()
+    async with await controller.admit(owner_id):
+        await controller.admit(owner_id)
+    slot = await controller.admit(owner_id)
+    await slot.release()
+    await slot.release()
+
+    await controller.admit(owner_id)
+
+
+async def test_rejected_owner_does_not_hold_global_slot(
+    controller: AdmissionController,
+):
+    """Test that a 429 rejection gives the global slot back"""
+    owner_id = uuid4()
+    await controller.admit(owner_id)
+    await controller.admit(owner_id)
+    with pytest.raises(AdmissionRejected):
+        await controller.admit(owner_id)
+
+    await controller.admit(uuid4())
+
+
+async def test_token_bucket_wait():
+    """Test that consuming over the burst asks the caller to wait"""
+    backend = LocalLimiterBackend()
+
+    assert await backend.consume("key", 100, rate=100, burst=100) == 0
+    wait = await backend.consume("key", 50, rate=100, burst=100)
+    assert 0.45 < wait <= 0.5
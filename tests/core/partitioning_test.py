@@ -0,0 +1,38 @@
+from datetime import date, datetime, timezone
+
+from src.core.partitioning import (
+    add_months,
+    in_month_sql,
+    month_bounds_sql,
+    month_partition,
+    month_start,
+    parse_month_partition,
+)
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2024, 2, 29, 23, 59, tzinfo=timezone.utc)) == date(
+        2024, 2, 1
+    )
+    assert add_months(date(2024, 11, 1), 1) == date(2024, 12, 1)
+    assert add_months(date(2024, 11, 1), 2) == date(2025, 1, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_month_partition_names():
+    assert month_partition(date(2024, 3, 1)) == "file_meta_y2024m03"
+    assert parse_month_partition("file_meta_y2024m03") == date(2024, 3, 1)
+    assert parse_month_partition("file_meta_default") is None
+    assert parse_month_partition("file_meta_p03") is None
+    assert parse_month_partition("file_meta_y2024m13") is None
+
+
+def test_month_bounds():
+    assert month_bounds_sql(date(2024, 12, 1)) == (
+        "FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')"
+    )
+    # Rows are moved to the partition by the same UTC bounds
+    assert in_month_sql(date(2024, 12, 1)) == (
+        "created_at >= '2024-12-01 00:00:00+00' "
+        "AND created_at < '2025-01-01 00:00:00+00'"
+    )
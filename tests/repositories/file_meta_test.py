@@ -1,10 +1,13 @@
-from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
 import pytest
+from sqlalchemy import event, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entities.file_meta import FileMetaEntity
+from src.entities.outbox import OutboxEntity
 from src.repositories.file_meta import FileMetaRepository
 
 
@@ -184,3 +187,360 @@ async def test_get_list_show_deleted(db: AsyncSession):
     )
 
     assert len(files_shown) > len(files_hidden)
+
+
+async def test_expire_due(db: AsyncSession):
+    """Test that expired files are hidden, then marked deleted with a purge event"""
+    owner_id = uuid4()
+    now = datetime.now(timezone.utc)
+    expired, future, permanent = [
+        await FileMetaRepository.create(
+            db=db,
+            internal_id=f"expiry{i}",
+            owner_id=owner_id,
+            title=f"file{i}.txt",
+            size=1000,
+            expires_at=expires_at,
+        )
+        for i, expires_at in enumerate(
+            [now - timedelta(hours=1), now + timedelta(hours=1), None]
+        )
+    ]
+
+    files, count = await FileMetaRepository.get_list(db, owner_id=owner_id)
+    assert {file.id for file in files} == {future.id, permanent.id}
+    assert count == 2
+    _, count = await FileMetaRepository.get_list(
+        db, owner_id=owner_id, show_deleted=True
+    )
+    assert count == 3
+
+    assert await FileMetaRepository.expire_due(db, now) == [expired.id]
+    assert await FileMetaRepository.expire_due(db, now) == []
+
+    await db.refresh(expired)
+    assert expired.is_deleted is True
+    events = (await db.execute(select(OutboxEntity))).scalars().all()
+    assert {"file_id": str(expired.id)} in [event.payload for event in events]
+
+
+async def test_expire_retained(db: AsyncSession):
+    """Test that retention deletes only old files of the given owner"""
+    owner_id, other_owner_id = uuid4(), uuid4()
+    now = datetime.now(timezone.utc)
+    old, new, other = [
+        await FileMetaRepository.create(
+            db=db, internal_id=f"retained{i}", owner_id=_id, title="f.txt", size=1
+        )
+        for i, _id in enumerate([owner_id, owner_id, other_owner_id])
+    ]
+    for obj in (old, other):
+        obj.created_at = now - timedelta(days=10)
+    await db.commit()
+
+    ids = await FileMetaRepository.expire_retained(
+        db, owner_id, now - timedelta(days=7), limit=10
+    )
+
+    assert ids == [old.id]
+    files, _ = await FileMetaRepository.get_list(db, owner_id=owner_id)
+    assert [file.id for file in files] == [new.id]
+
+
+async def test_record_access(db: AsyncSession, file_meta: FileMetaEntity):
+    """Test applying batched read statistics"""
+    accessed_at = datetime.now(timezone.utc)
+    await FileMetaRepository.record_access(db, {file_meta.id: (3, accessed_at)})
+    await FileMetaRepository.record_access(db, {file_meta.id: (2, accessed_at)})
+
+    await db.refresh(file_meta)
+    assert file_meta.read_count == 5
+    assert file_meta.last_accessed_at is not None
+
+
+async def test_get_cold_candidates(db: AsyncSession):
+    """Test selecting hot files not read since a given time"""
+    owner_id = uuid4()
+    stale = await FileMetaRepository.create(
+        db=db, internal_id="stale", owner_id=owner_id, title="stale.txt"
+    )
+    fresh = await FileMetaRepository.create(
+        db=db, internal_id="fresh", owner_id=owner_id, title="fresh.txt"
+    )
+    now = datetime.now(timezone.utc)
+    await FileMetaRepository.record_access(
+        db, {stale.id: (1, now - timedelta(days=60)), fresh.id: (1, now)}
+    )
+
+    candidates = await FileMetaRepository.get_cold_candidates(
+        db, now - timedelta(days=30), limit=1000
+    )
+
+    ids = {obj.id for obj in candidates}
+    assert stale.id in ids
+    assert fresh.id not in ids
+
+
+async def test_set_tier(db: AsyncSession, file_meta: FileMetaEntity):
+    """Test recording a tier change and restarting the read counter"""
+    await FileMetaRepository.record_access(
+        db, {file_meta.id: (7, datetime.now(timezone.utc))}
+    )
+    await FileMetaRepository.set_tier(db, file_meta.id, "cold")
+
+    await db.refresh(file_meta)
+    assert file_meta.tier == "cold"
+    assert file_meta.read_count == 0
+
+    hot_candidates = await FileMetaRepository.get_hot_candidates(db, 1, limit=1000)
+    assert file_meta.id not in {obj.id for obj in hot_candidates}
+
+
+async def test_get_checksum_sample(db: AsyncSession):
+    """Test that the sample wraps around the primary key"""
+    owner_id = uuid4()
+    for i in range(3):
+        await FileMetaRepository.create(
+            db=db,
+            internal_id=f"sample{i}",
+            owner_id=owner_id,
+            title=f"file{i}.txt",
+            checksum_algorithm="sha256",
+            checksum="00",
+        )
+
+    sample = await FileMetaRepository.get_checksum_sample(
+        db, UUID(int=2**128 - 1), limit=3
+    )
+
+    assert len(sample) == 3
+    assert all(obj.checksum is not None for obj in sample)
+
+
+@pytest.fixture
+async def search_files(db: AsyncSession) -> tuple[UUID, list[FileMetaEntity]]:
+    """Create files of one owner with distinct titles, types, sizes and dates"""
+    owner_id = uuid4()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    specs = [
+        ("Report_2025.pdf", "application/pdf", 100, 0),
+        ("report-draft.docx", "application/msword", 2000, 1),
+        ("holiday.png", "image/png", 30000, 2),
+        ("100%_done.jpg", "image/jpeg", 400000, 3),
+        ("notes.txt", "text/plain", 5, 3),
+    ]
+    files = []
+    for title, format, size, day in specs:
+        file = FileMetaEntity(
+            owner_id=owner_id,
+            title=title,
+            format=format,
+            size=size,
+            created_at=base + timedelta(days=day),
+        )
+        db.add(file)
+        files.append(file)
+    await db.commit()
+    return owner_id, files
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({"q": "REPORT"}, ["report-draft.docx", "Report_2025.pdf"]),
+        ({"q": "%"}, ["100%_done.jpg"]),
+        ({"q": "t_d"}, []),
+        ({"format": "image/*"}, ["100%_done.jpg", "holiday.png"]),
+        ({"format": "image/png"}, ["holiday.png"]),
+        (
+            {"size_min": 100, "size_max": 30000},
+            ["holiday.png", "report-draft.docx", "Report_2025.pdf"],
+        ),
+        (
+            {
+                "created_from": datetime(2026, 1, 2, tzinfo=timezone.utc),
+                "created_to": datetime(2026, 1, 4, tzinfo=timezone.utc),
+            },
+            ["holiday.png", "report-draft.docx"],
+        ),
+    ],
+)
+async def test_search_filters(db: AsyncSession, search_files, filters, expected):
+    """Test search by title substring, MIME type, size and date ranges"""
+    owner_id, _ = search_files
+
+    records = await FileMetaRepository.search(db, owner_id=owner_id, **filters)
+
+    assert [r.title for r in records] == expected
+
+
+async def test_search_keyset_pagination(db: AsyncSession, search_files):
+    """Test that pages continue after the last record, ties broken by ID"""
+    owner_id, files = search_files
+    expected = sorted(files, key=lambda f: (f.created_at, f.id), reverse=True)
+
+    seen: list[FileMetaEntity] = []
+    after = None
+    while True:
+        page = await FileMetaRepository.search(
+            db, owner_id=owner_id, after=after, limit=2
+        )
+        seen += page
+        if len(page) < 2:
+            break
+        after = (page[-1].created_at, page[-1].id)
+
+    assert [r.id for r in seen] == [f.id for f in expected]
+
+
+async def test_search_skips_deleted(db: AsyncSession, search_files):
+    """Test that deleted files are not found"""
+    owner_id, files = search_files
+    await FileMetaRepository.delete_by_id(db, files[0].id)
+
+    records = await FileMetaRepository.search(db, owner_id=owner_id, q="report")
+
+    assert [r.title for r in records] == ["report-draft.docx"]
+
+
+async def test_create_with_tags(db: AsyncSession):
+    """Test that tags and attributes are stored with the record"""
+    file = await FileMetaRepository.create(
+        db=db,
+        internal_id="tagged",
+        owner_id=uuid4(),
+        title="tagged.txt",
+        tags={"project": "apollo", "draft": None},
+    )
+    db.expunge_all()
+
+    loaded = await FileMetaRepository.get_by_id(db, file.id)
+    assert [(t.key, t.value) for t in loaded.tags] == [
+        ("draft", None),
+        ("project", "apollo"),
+    ]
+
+
+async def test_update_tags(db: AsyncSession):
+    """Test adding, changing and removing tags"""
+    file = await FileMetaRepository.create(
+        db=db,
+        internal_id="tagged",
+        owner_id=uuid4(),
+        title="tagged.txt",
+        tags={"project": "apollo", "draft": None, "year": "2025"},
+    )
+
+    await FileMetaRepository.update_tags(
+        db, file.id, {"project": "gemini", "reviewed": None}, remove_tags=["draft"]
+    )
+    db.expunge_all()
+
+    loaded = await FileMetaRepository.get_by_id(db, file.id)
+    assert {t.key: t.value for t in loaded.tags} == {
+        "project": "gemini",
+        "reviewed": None,
+        "year": "2025",
+    }
+
+
+async def test_get_list_by_tags(db: AsyncSession):
+    """Test that listing returns files having all requested tags"""
+    owner_id = uuid4()
+    files: list[tuple[str, dict[str, str | None]]] = [
+        ("a.txt", {"project": "apollo", "draft": None}),
+        ("b.txt", {"project": "apollo"}),
+        ("c.txt", {"project": "gemini", "draft": None}),
+    ]
+    for title, tags in files:
+        await FileMetaRepository.create(
+            db=db, internal_id=title, owner_id=owner_id, title=title, tags=tags
+        )
+
+    async def titles(tags):
+        files, count = await FileMetaRepository.get_list(
+            db, owner_id=owner_id, tags=tags
+        )
+        assert count == len(files)
+        return sorted(f.title for f in files)
+
+    assert await titles({"project": "apollo"}) == ["a.txt", "b.txt"]
+    assert await titles({"draft": None}) == ["a.txt", "c.txt"]
+    assert await titles({"project": "apollo", "draft": None}) == ["a.txt"]
+    assert await titles({"project": "mercury"}) == []
+
+
+async def test_get_list_loads_tags_in_one_query(db: AsyncSession):
+    """Test that tags of a whole page are loaded by a single batched query"""
+    owner_id = uuid4()
+    for i in range(5):
+        await FileMetaRepository.create(
+            db=db,
+            internal_id=f"file{i}",
+            owner_id=owner_id,
+            title=f"file{i}.txt",
+            tags={"n": str(i)},
+        )
+    db.expunge_all()
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.bind.sync_engine  # type:ignore[union-attr]
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        files, _ = await FileMetaRepository.get_list(db, owner_id=owner_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert sorted(str(f.tags[0].value) for f in files) == ["0", "1", "2", "3", "4"]
+    assert len([s for s in statements if "FROM file_tag" in s]) == 1
+
+
+async def test_lookup_by_id_near_creation_time(db: AsyncSession, file_meta):
+    """Test that a creation time bound finds the record only around its time"""
+    near = datetime.now(timezone.utc)
+    far = near - timedelta(days=30)
+
+    assert (
+        await FileMetaRepository.get_by_id(db, file_meta.id, near)
+    ).id == file_meta.id
+    row = await FileMetaRepository.get_row_by_id(db, file_meta.id, near)
+    assert row.title == "test.txt"
+    with pytest.raises(NoResultFound):
+        await FileMetaRepository.get_by_id(db, file_meta.id, far)
+    with pytest.raises(NoResultFound):
+        await FileMetaRepository.get_row_by_id(db, file_meta.id, far)
+
+    await FileMetaRepository.delete_by_id(db, file_meta.id, created_near=far)
+    assert (await FileMetaRepository.get_by_id(db, file_meta.id)).is_deleted is False
+    await FileMetaRepository.delete_by_id(db, file_meta.id, created_near=near)
+    assert (await FileMetaRepository.get_by_id(db, file_meta.id)).is_deleted is True
+
+
+async def test_create_many(db: AsyncSession):
+    """Test that many records are created in order with their tags"""
+    owner_id = uuid4()
+    objs = await FileMetaRepository.create_many(
+        db,
+        [
+            {"internal_id": "a", "owner_id": owner_id, "title": "a.txt", "size": 1},
+            {
+                "internal_id": "b",
+                "owner_id": owner_id,
+                "title": "b.txt",
+                "tags": {"z": None, "k": "v"},
+            },
+        ],
+    )
+
+    assert [obj.title for obj in objs] == ["a.txt", "b.txt"]
+    assert [[(t.key, t.value) for t in obj.tags] for obj in objs] == [
+        [],
+        [("k", "v"), ("z", None)],
+    ]
+    files, count = await FileMetaRepository.get_list(db, owner_id=owner_id)
+    assert count == 2
+    assert {file.id for file in files} == {obj.id for obj in objs}
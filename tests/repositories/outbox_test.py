@@ -0,0 +1,52 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entities.outbox import OutboxEntity
+from src.repositories.file_meta import DELETE_FILE_TASK, FileMetaRepository
+from src.repositories.outbox import OutboxRepository
+
+
+@pytest.fixture(autouse=True)
+async def empty_outbox(db: AsyncSession):
+    """Start every test with an empty outbox"""
+    await db.execute(delete(OutboxEntity))
+    await db.commit()
+
+
+async def test_soft_delete_writes_event(db: AsyncSession):
+    """Test that marking a file as deleted stores the purge event"""
+    file = await FileMetaRepository.create(
+        db=db, internal_id="outbox1", owner_id=uuid4(), title="test.txt"
+    )
+
+    await FileMetaRepository.delete_by_id(db, file.id)
+
+    events = (await db.execute(select(OutboxEntity))).scalars().all()
+    assert [(e.task, e.payload) for e in events] == [
+        (DELETE_FILE_TASK, {"file_id": str(file.id)})
+    ]
+
+
+async def test_delete_missing_file_writes_nothing(db: AsyncSession):
+    """Test that deleting an unknown file does not produce an event"""
+    await FileMetaRepository.delete_by_id(db, uuid4())
+
+    assert (await db.execute(select(OutboxEntity))).scalars().all() == []
+
+
+async def test_get_batch_and_delete(db: AsyncSession):
+    """Test reading events in insertion order and deleting relayed ones"""
+    for i in range(5):
+        OutboxRepository.add(db, "task", {"n": i})
+    await db.commit()
+
+    batch = await OutboxRepository.get_batch(db, limit=3)
+    assert [e.payload["n"] for e in batch] == [0, 1, 2]
+
+    await OutboxRepository.delete_by_ids(db, [e.id for e in batch])
+
+    left = await OutboxRepository.get_batch(db)
+    assert [e.payload["n"] for e in left] == [3, 4]
@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+from src.storage.checksum import new_hasher, to_base64
+
+_CHECKSUM_PARAMS = {
+    "ContentMD5": "md5",
+    "ChecksumCRC32C": "crc32c",
+    "ChecksumSHA256": "sha256",
+}
+
+
+def _error(code: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class _Body:
+    def __init__(self, data: bytes, bandwidth: float = 0.0) -> None:
+        self._data = data
+        self._bandwidth = bandwidth
+
+    async def __aenter__(self) -> "_Body":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self._data
+
+    async def iter_chunks(self, chunk_size: int):
+        for pos in range(0, len(self._data), chunk_size):
+            chunk = self._data[pos : pos + chunk_size]
+            if self._bandwidth:
+                await asyncio.sleep(len(chunk) / self._bandwidth)
+            yield chunk
+
+
+class InMemoryS3Client:
+    """
+    In-memory stand-in for the subset of the aioboto3 S3 client the service
+    uses. `latency` seconds are awaited before every call to imitate a
+    remote endpoint, and object bodies are streamed at `bandwidth` bytes
+    per second each, like over a single connection.
+    """
+
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0) -> None:
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects: dict[tuple[str, str], dict[str, Any]] = {}
+        self.uploads: dict[str, dict[str, Any]] = {}
+
+    async def _delay(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def create_multipart_upload(self, Bucket, Key, **kwargs):
+        await self._delay()
+        upload_id = uuid4().hex
+        self.uploads[upload_id] = {
+            "Bucket": Bucket,
+            "Key": Key,
+            "Parts": {},
+            "ContentType": kwargs.get("ContentType"),
+            "Initiated": datetime.now(timezone.utc),
+        }
+        return {"UploadId": upload_id}
+
+    async def upload_part(self, Bucket, Key, PartNumber, UploadId, Body, **kwargs):
+        await self._delay()
+        if UploadId not in self.uploads:
+            raise _error("NoSuchUpload", "UploadPart")
+        data = bytes(Body)
+        for param, algorithm in _CHECKSUM_PARAMS.items():
+            if param in kwargs:
+                hasher = new_hasher(algorithm)  # type:ignore[arg-type]
+                hasher.update(data)
+                if to_base64(hasher.digest()) != kwargs[param]:
+                    raise _error("BadDigest", "UploadPart")
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.uploads[UploadId]["Parts"][PartNumber] = (etag, data)
+        return {"ETag": etag}
+
+    async def complete_multipart_upload(
+        self, Bucket, Key, UploadId, MultipartUpload, **kwargs
+    ):
+        await self._delay()
+        upload = self.uploads.pop(UploadId, None)
+        if upload is None:
+            raise _error("NoSuchUpload", "CompleteMultipartUpload")
+        chunks = []
+        for part in MultipartUpload["Parts"]:
+            etag, chunk = upload["Parts"][part["PartNumber"]]
+            if etag != part["ETag"]:
+                raise _error("InvalidPart", "CompleteMultipartUpload")
+            chunks.append(chunk)
+        data = b"".join(chunks)
+        self.put(Bucket, Key, data, upload["ContentType"])
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        await self._delay()
+        self.uploads.pop(UploadId, None)
+        return {}
+
+    def put(
+        self,
+        bucket: str,
+        key: str,
+        data: bytes,
+        content_type: str | None = None,
+        storage_class: str = "STANDARD",
+    ) -> None:
+        self.objects[(bucket, key)] = {
+            "Body": data,
+            "ContentType": content_type,
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "LastModified": datetime.now(timezone.utc),
+            "StorageClass": storage_class,
+        }
+
+    def _get(self, bucket: str, key: str, operation: str) -> dict[str, Any]:
+        obj = self.objects.get((bucket, key))
+        if obj is None:
+            raise _error("404" if operation == "HeadObject" else "NoSuchKey", operation)
+        return obj
+
+    async def head_object(self, Bucket, Key, **kwargs):
+        await self._delay()
+        obj = self._get(Bucket, Key, "HeadObject")
+        head = {
+            "ContentLength": len(obj["Body"]),
+            "ETag": obj["ETag"],
+            "LastModified": obj["LastModified"],
+        }
+        if obj["ContentType"]:
+            head["ContentType"] = obj["ContentType"]
+        if obj["StorageClass"] != "STANDARD":
+            head["StorageClass"] = obj["StorageClass"]
+        return head
+
+    async def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        await self._delay()
+        source = self._get(CopySource["Bucket"], CopySource["Key"], "CopyObject")
+        self.put(
+            Bucket,
+            Key,
+            source["Body"],
+            source["ContentType"],
+            kwargs.get("StorageClass", "STANDARD"),
+        )
+        return {"CopyObjectResult": {"ETag": source["ETag"]}}
+
+    async def upload_part_copy(
+        self, Bucket, Key, PartNumber, UploadId, CopySource, CopySourceRange, **kwargs
+    ):
+        await self._delay()
+        if UploadId not in self.uploads:
+            raise _error("NoSuchUpload", "UploadPartCopy")
+        source = self._get(CopySource["Bucket"], CopySource["Key"], "UploadPartCopy")
+        start, _, end = CopySourceRange.removeprefix("bytes=").partition("-")
+        data = source["Body"][int(start) : int(end) + 1]
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.uploads[UploadId]["Parts"][PartNumber] = (etag, data)
+        return {"CopyPartResult": {"ETag": etag}}
+
+    async def get_object(self, Bucket, Key, Range: str | None = None, **kwargs):
+        await self._delay()
+        data = self._get(Bucket, Key, "GetObject")["Body"]
+        if Range:
+            start, _, end = Range.removeprefix("bytes=").partition("-")
+            data = data[int(start) : int(end) + 1 if end else None]
+        return {"Body": _Body(data, self.bandwidth), "ContentLength": len(data)}
+
+    async def delete_objects(self, Bucket, Delete, **kwargs):
+        await self._delay()
+        for obj in Delete["Objects"]:
+            self.objects.pop((Bucket, obj["Key"]), None)
+        return {}
+
+    async def list_objects_v2(
+        self, Bucket, MaxKeys=1000, StartAfter="", ContinuationToken=None, **kwargs
+    ):
+        await self._delay()
+        after = ContinuationToken or StartAfter
+        keys = sorted(
+            key for bucket, key in self.objects if bucket == Bucket and key > after
+        )
+        page = keys[:MaxKeys]
+        response = {
+            "Contents": [
+                {
+                    "Key": key,
+                    "Size": len(self.objects[(Bucket, key)]["Body"]),
+                    "LastModified": self.objects[(Bucket, key)]["LastModified"],
+                }
+                for key in page
+            ],
+            "IsTruncated": len(keys) > MaxKeys,
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    async def list_multipart_uploads(
+        self, Bucket, MaxUploads=1000, KeyMarker="", UploadIdMarker="", **kwargs
+    ):
+        await self._delay()
+        uploads = sorted(
+            (upload["Key"], upload_id, upload["Initiated"])
+            for upload_id, upload in self.uploads.items()
+            if upload["Bucket"] == Bucket
+            and (upload["Key"], upload_id) > (KeyMarker, UploadIdMarker)
+        )
+        page = uploads[:MaxUploads]
+        response = {
+            "Uploads": [
+                {"Key": key, "UploadId": upload_id, "Initiated": initiated}
+                for key, upload_id, initiated in page
+            ],
+            "IsTruncated": len(uploads) > MaxUploads,
+        }
+        if response["IsTruncated"]:
+            response["NextKeyMarker"], response["NextUploadIdMarker"] = page[-1][:2]
+        return response
+
+    async def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600):
+        return f"https://s3.local/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+import pytest
+
+from src.repositories.file_meta import FileMetaRepository
+from src.services import access
+from src.services.access import AccessTracker
+
+
+async def test_failed_flush_keeps_reads(monkeypatch):
+    """Test that reads are written by the next flush when one fails"""
+    tracker = AccessTracker()
+    _id = uuid4()
+    written = []
+
+    async def get_db():
+        yield None
+
+    async def record_access(db, accesses):
+        if not written:
+            written.append(None)
+            raise ConnectionError("database is unavailable")
+        written.append(dict(accesses))
+
+    monkeypatch.setattr(access, "get_db", get_db)
+    monkeypatch.setattr(FileMetaRepository, "record_access", record_access)
+    tracker.record(_id)
+    tracker.record(_id)
+    with pytest.raises(ConnectionError):
+        await tracker.flush()
+    tracker.record(_id)
+    assert tracker.pending_reads(_id) == 3
+
+    await tracker.flush()
+    assert written[1][_id][0] == 3
+    assert tracker.pending_reads(_id) == 0
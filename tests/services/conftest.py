@@ -0,0 +1,22 @@
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from src.storage.local import LocalStorage
+from tests.repositories.conftest import auto_rollback, db, setup_database  # noqa: F401
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> LocalStorage:
+    return LocalStorage(tmp_path, chunk_size=1024)
+
+
+def make_upload(data: bytes, filename: str = "test.txt") -> UploadFile:
+    return UploadFile(
+        BytesIO(data),
+        filename=filename,
+        headers=Headers({"content-type": "text/plain"}),
+    )
@@ -0,0 +1,328 @@
+import hashlib
+from base64 import b64encode
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas.v1.file import FileResponse, dump_json
+from src.core.config import InspectionConfig
+from src.entities.file_meta import FileMetaEntity
+from src.repositories.file_meta import FileMetaRepository
+from src.services.file import FileService
+from src.services.inspection import EICAR, ContentInspector, ContentRejected
+from src.storage import COLD, HOT, StorageTier
+from src.storage.local import LocalStorage
+from src.utils import uuid7
+
+from .conftest import make_upload
+
+DATA = b"0123456789" * 1000
+
+
+@pytest.fixture
+def service() -> FileService:
+    service = FileService()
+    service.chunk_size = 4096
+    service.max_file_size = 0
+    service.checksum_algorithm = "sha256"
+    service.export_batch_size = 1000
+    service.read_ahead_part_size = 8 * 1024 * 1024
+    service.read_ahead_window = 4
+    return service
+
+
+async def test_upload_stores_checksum(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that the full-object digest is computed while uploading"""
+    obj = await service.upload(db, storage, uuid4(), "test.txt", make_upload(DATA))
+
+    assert obj.size == len(DATA)
+    assert obj.checksum_algorithm == "sha256"
+    assert obj.checksum == hashlib.sha256(DATA).hexdigest()
+
+
+async def test_download_digest_headers(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that downloads carry Digest and ETag headers"""
+    obj = await service.upload(db, storage, uuid4(), "test.txt", make_upload(DATA))
+
+    chunk_generator, headers = await service.get(db, storage, obj.id)
+    content = b"".join([chunk async for chunk in chunk_generator()])
+
+    assert content == DATA
+    digest = b64encode(hashlib.sha256(DATA).digest()).decode()
+    assert headers["Digest"] == f"sha-256={digest}"
+    assert headers["ETag"] == f'"{obj.checksum}"'
+
+
+async def test_download_read_ahead(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that large files downloaded in parallel ranges keep their content"""
+    obj = await service.upload(db, storage, uuid4(), "test.txt", make_upload(DATA))
+    service.read_ahead_part_size = 3000
+
+    chunk_generator, _ = await service.get(db, storage, obj.id)
+    content = b"".join([chunk async for chunk in chunk_generator()])
+
+    assert content == DATA
+
+
+async def test_expire(db: AsyncSession, storage: LocalStorage, service: FileService):
+    """Test that expired files cannot be downloaded and are deleted by expiry"""
+    owner_id, retained_owner_id = uuid4(), uuid4()
+    now = datetime.now(timezone.utc)
+    expired = await service.upload(
+        db, storage, owner_id, "a.txt", make_upload(DATA), expires_at=now
+    )
+    kept = await service.upload(
+        db,
+        storage,
+        owner_id,
+        "b.txt",
+        make_upload(DATA),
+        expires_at=now + timedelta(hours=1),
+    )
+    retained = await service.upload(
+        db, storage, retained_owner_id, "c.txt", make_upload(DATA)
+    )
+
+    with pytest.raises(Exception, match="File not found"):
+        await service.get(db, storage, expired.id)
+    with pytest.raises(NoResultFound):
+        await service.copy(db, storage, expired.id)
+
+    expired_count = await service.expire(
+        db, now + timedelta(minutes=1), retention={retained_owner_id: timedelta(0)}
+    )
+
+    assert expired_count == 2
+    for obj, is_deleted in ((expired, True), (kept, False), (retained, True)):
+        await db.refresh(obj)
+        assert obj.is_deleted is is_deleted
+
+
+async def test_migrate_tiers_skips_failed_files(
+    db: AsyncSession, storage: LocalStorage, service: FileService, monkeypatch
+):
+    """Test that failed moves neither stop the batch nor come back on the next run"""
+    owner_id = uuid4()
+    moved, missing, broken, unrecorded = [
+        await service.upload(db, storage, owner_id, f"{i}.txt", make_upload(DATA))
+        for i in range(4)
+    ]
+    (storage.root / missing.internal_id).unlink()
+    await storage.move(unrecorded.internal_id, HOT, COLD)
+    move = storage.move
+
+    async def failing_move(key: str, source: StorageTier, target: StorageTier):
+        if key == broken.internal_id:
+            raise RuntimeError("copy rejected")
+        await move(key, source, target)
+
+    monkeypatch.setattr(storage, "move", failing_move)
+    accessed_before = datetime.now(timezone.utc)
+
+    await service.migrate_tiers(db, storage, accessed_before, limit=1000)
+
+    for obj, tier in ((moved, COLD), (unrecorded, COLD), (missing, HOT), (broken, HOT)):
+        await db.refresh(obj)
+        assert obj.tier == tier
+    candidates = await FileMetaRepository.get_cold_candidates(
+        db, accessed_before, limit=1000
+    )
+    assert not {missing.id, broken.id} & {obj.id for obj in candidates}
+
+
+async def test_scrub_detects_corruption(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that the scrubber reports objects not matching their checksum"""
+    obj = await service.upload(db, storage, uuid4(), "test.txt", make_upload(DATA))
+    assert await service.verify_checksum(storage, obj)
+
+    (storage.root / obj.internal_id).write_bytes(DATA[::-1])
+
+    assert not await service.verify_checksum(storage, obj)
+
+
+async def test_scrub_samples_recent_files(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that samples reach files created after older ones with UUIDv7 IDs"""
+    created_at = datetime.now(timezone.utc) - timedelta(days=365)
+    old = [
+        FileMetaEntity(
+            id=uuid7(created_at),
+            internal_id=f"old{i}",
+            owner_id=uuid4(),
+            title=f"old{i}.txt",
+            size=0,
+            created_at=created_at,
+            checksum_algorithm="sha256",
+            checksum="00",
+        )
+        for i in range(20)
+    ]
+    db.add_all(old)
+    await db.commit()
+    await service.upload(db, storage, uuid4(), "new.txt", make_upload(DATA))
+
+    samples = [
+        await FileMetaRepository.get_checksum_sample(
+            db, await service._sample_start(db), limit=1
+        )
+        for _ in range(20)
+    ]
+    old_ids = {obj.id for obj in old}
+    recent = [sample for sample in samples if sample[0].id not in old_ids]
+
+    for obj in old:
+        await db.delete(obj)
+    await db.commit()
+    assert len(recent) >= 15
+
+
+async def test_fast_responses_match_response_model(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that rows dumped with orjson give the bytes of the pydantic models"""
+    owner_id = uuid4()
+    tagged = await service.upload(
+        db, storage, owner_id, "a.txt", make_upload(DATA), tags={"x": "1", "y": None}
+    )
+    plain = await service.upload(db, storage, owner_id, "b.txt", make_upload(DATA))
+
+    info = await service.get_info_row(db, tagged.id)
+    assert (
+        dump_json(info)
+        == FileResponse.model_validate(tagged).model_dump_json().encode()
+    )
+
+    rows, count = await service.get_list_rows(db, owner_id=owner_id)
+    files, _ = await service.get_list(db, owner_id=owner_id)
+    assert count == 2
+    assert [row["id"] for row in rows] == [f.id for f in files]
+    for row, obj in zip(rows, files):
+        expected = FileResponse.model_validate(obj).model_dump_json().encode()
+        assert dump_json(row) == expected
+    assert {plain.id, tagged.id} == {row["id"] for row in rows}
+
+
+async def test_export_streams_batches(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that the export yields all matching files, oldest first, in batches"""
+    owner_id = uuid4()
+    uploaded = [
+        await service.upload(
+            db, storage, owner_id, f"{i}.txt", make_upload(DATA), tags={"i": str(i)}
+        )
+        for i in range(5)
+    ]
+    await service.delete(db, uploaded[4].id)
+    service.export_batch_size = 2
+
+    batches = [batch async for batch in service.export(db, owner_id=owner_id)]
+    assert [len(batch) for batch in batches] == [2, 2]
+    files = [f for batch in batches for f in batch]
+    assert files == sorted(files, key=lambda f: (f["created_at"], f["id"]))
+    assert {f["id"]: f["tags"] for f in files} == {
+        obj.id: {"i": str(i)} for i, obj in enumerate(uploaded[:4])
+    }
+
+    batches = [
+        batch
+        async for batch in service.export(
+            db, show_deleted=True, owner_id=owner_id, tags={"i": "4"}
+        )
+    ]
+    assert [[f["id"] for f in batch] for batch in batches] == [[uploaded[4].id]]
+
+
+async def test_copy_duplicates_object_and_metadata(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that a copy is a new file with its own object and the same metadata"""
+    obj = await service.upload(
+        db, storage, uuid4(), "test.txt", make_upload(DATA), tags={"x": "1"}
+    )
+    owner_id = uuid4()
+
+    copy = await service.copy(db, storage, obj.id, owner_id=owner_id)
+    await service.delete(db, obj.id)
+
+    assert copy.id != obj.id and copy.internal_id != obj.internal_id
+    assert (copy.owner_id, copy.title, copy.size) == (owner_id, obj.title, obj.size)
+    assert copy.checksum == obj.checksum
+    assert {tag.key: tag.value for tag in copy.tags} == {"x": "1"}
+    chunk_generator, _ = await service.get(db, storage, copy.id)
+    assert b"".join([chunk async for chunk in chunk_generator()]) == DATA
+
+    with pytest.raises(NoResultFound):
+        await service.copy(db, storage, obj.id)
+
+
+async def test_reassign_changes_owner_only(
+    db: AsyncSession, storage: LocalStorage, service: FileService
+):
+    """Test that reassigning a file keeps its object"""
+    obj = await service.upload(db, storage, uuid4(), "test.txt", make_upload(DATA))
+    internal_id, owner_id = obj.internal_id, uuid4()
+
+    moved = await service.reassign(db, obj.id, owner_id)
+
+    assert (moved.id, moved.owner_id, moved.internal_id) == (
+        obj.id,
+        owner_id,
+        internal_id,
+    )
+    files, count = await service.get_list(db, owner_id=owner_id)
+    assert count == 1 and files[0].id == obj.id
+
+
+@pytest.fixture
+def inspector():
+    yield ContentInspector()
+    ContentInspector().configure(InspectionConfig())
+
+
+async def test_upload_stores_detected_type(
+    db: AsyncSession, storage: LocalStorage, service: FileService, inspector
+):
+    """Test that the type of the content replaces the claimed one"""
+    png = b"\x89PNG\r\n\x1a\n" + DATA
+    obj = await service.upload(db, storage, uuid4(), "image.txt", make_upload(png))
+
+    assert obj.format == "image/png"
+    assert obj.internal_id.endswith(".png")
+
+
+async def test_upload_rejected_by_inspection(
+    db: AsyncSession, storage: LocalStorage, service: FileService, inspector
+):
+    """Test that rejected uploads are aborted and leave no record"""
+    inspector.configure(
+        InspectionConfig(
+            deny=["application/pdf"], max_size={"text/*": 5000}, scanner="eicar"
+        )
+    )
+    owner_id = uuid4()
+    uploads = [
+        (b"%PDF-1.4" + DATA, 415),
+        (DATA, 413),
+        (b"x" * 4090 + EICAR, 422),
+    ]
+    for data, status_code in uploads:
+        with pytest.raises(ContentRejected) as e:
+            await service.upload(db, storage, owner_id, "f.txt", make_upload(data))
+        assert e.value.status_code == status_code
+
+    files, count = await service.get_list(db, owner_id=owner_id)
+    assert count == 0
+    assert [u async for u in storage.list_multipart_uploads()] == []
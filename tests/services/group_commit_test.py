@@ -0,0 +1,87 @@
+import asyncio
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import database
+from src.entities import Base
+from src.services.group_commit import GroupCommitter
+
+
+@pytest.fixture
+async def committer(tmp_path: Path):
+    uri = f"sqlite+aiosqlite:///{tmp_path / 'group.db'}"
+    engine = create_async_engine(uri)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    await database.init_engine(uri)
+    GroupCommitter().start(window=0.05, max_batch=4)
+    yield GroupCommitter()
+    await GroupCommitter().stop()
+    await database.close_engine()
+
+
+def count_inserts() -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(database.engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO file_meta"):
+            statements.append(statement)
+
+    return statements
+
+
+async def test_concurrent_creates_share_one_insert(committer: GroupCommitter):
+    """Test that records submitted while a batch is written share one statement"""
+    owner_id = uuid4()
+    inserts = count_inserts()
+
+    objs = await asyncio.gather(
+        *(
+            committer.create(
+                internal_id=f"k{i}",
+                owner_id=owner_id,
+                title=f"{i}.txt",
+                tags={"i": str(i)},
+            )
+            for i in range(4)
+        )
+    )
+
+    # The first record does not wait, the others are collected meanwhile
+    assert len(inserts) == 2
+    assert [obj.title for obj in objs] == ["0.txt", "1.txt", "2.txt", "3.txt"]
+    assert [{t.key: t.value for t in obj.tags} for obj in objs] == [
+        {"i": str(i)} for i in range(4)
+    ]
+    assert len({obj.id for obj in objs}) == 4
+
+
+async def test_full_batch_is_written_without_waiting(committer: GroupCommitter):
+    """Test that `max_batch` records are flushed before the window ends"""
+    committer.start(window=60, max_batch=4)
+    creates = [
+        committer.create(internal_id=f"k{i}", owner_id=uuid4(), title=f"{i}.txt")
+        for i in range(5)
+    ]
+    objs = await asyncio.wait_for(asyncio.gather(*creates), 5)
+    assert len(objs) == 5
+
+
+async def test_failed_record_does_not_fail_batch(committer: GroupCommitter):
+    """Test that a batch with a bad record is retried record by record"""
+    results = await asyncio.gather(
+        committer.create(internal_id="first", owner_id=uuid4(), title="first.txt"),
+        committer.create(internal_id="good", owner_id=uuid4(), title="good.txt"),
+        committer.create(internal_id="bad", owner_id=uuid4(), title=None),
+        return_exceptions=True,
+    )
+
+    assert [r.title for r in results[:2]] == ["first.txt", "good.txt"]  # type:ignore
+    assert isinstance(results[2], IntegrityError)
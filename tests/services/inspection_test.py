@@ -0,0 +1,188 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+
+from src.core.config import InspectionConfig
+from src.services.inspection import (
+    EICAR,
+    ClamdScanner,
+    ContentInspection,
+    ContentInspector,
+    ContentRejected,
+    EicarScanner,
+    resolve_mime,
+    sniff_mime,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+
+
+@pytest.fixture
+def inspector():
+    yield ContentInspector()
+    ContentInspector().configure(InspectionConfig())
+
+
+async def iterate(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.parametrize(
+    "head, mime_type",
+    [
+        (PNG, "image/png"),
+        (b"%PDF-1.7\n", "application/pdf"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"\x00\x00\x00\x20ftypisom", "video/mp4"),
+        (
+            b"MZ\x90\x00\x03\x00\x00\x00",
+            "application/vnd.microsoft.portable-executable",
+        ),
+        (b"\xef\xbb\xbf  <!DOCTYPE html><html>", "text/html"),
+        (b"<svg xmlns='http://www.w3.org/2000/svg'/>", "image/svg+xml"),
+        ("plain text, не ASCII".encode()[:-1], "text/plain"),
+        (b"MZ is a plain line", "text/plain"),
+        (b"\x00\x01\x02\x03", None),
+        (b"", None),
+    ],
+)
+def test_sniff_mime(head: bytes, mime_type: str | None):
+    assert sniff_mime(head) == mime_type
+
+
+def test_resolve_mime():
+    """Test that detected types win unless the claimed one specialises them"""
+    assert resolve_mime("text/plain", "image/png") == "image/png"
+    assert resolve_mime("image/png", "text/html") == "text/html"
+    assert (
+        resolve_mime("text/csv; charset=utf-8", "text/plain")
+        == "text/csv; charset=utf-8"
+    )
+    assert resolve_mime("application/ld+json", "text/plain") == "application/ld+json"
+    docx = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    assert resolve_mime(docx, "application/zip") == docx
+    assert (
+        resolve_mime("application/epub+zip", "application/zip")
+        == "application/epub+zip"
+    )
+    assert resolve_mime("image/png", None) == "image/png"
+    assert resolve_mime(None, "image/png") == "image/png"
+
+
+def test_allow_deny_and_size_limits(inspector: ContentInspector):
+    inspector.configure(
+        InspectionConfig(
+            allow=["image/*", "text/plain"],
+            deny=["image/svg+xml"],
+            max_size={"*/*": 1000, "image/*": 100, "image/png": 10},
+        )
+    )
+    assert inspector.begin("text/plain", PNG).content_type == "image/png"
+    assert inspector.begin(None, PNG).size_limit == 10
+    assert inspector.begin("image/gif", b"GIF89a").size_limit == 100
+    assert inspector.begin("text/plain", b"text").size_limit == 1000
+
+    for claimed, head in [("image/png", b"<svg/>"), ("image/png", b"%PDF-1.4")]:
+        with pytest.raises(ContentRejected) as e:
+            inspector.begin(claimed, head)
+        assert e.value.status_code == 415
+
+    with pytest.raises(ContentRejected) as e:
+        inspector.begin(None, PNG).check_size(11)
+    assert e.value.status_code == 413
+
+
+async def test_eicar_scanner_finds_split_string():
+    scanner = EicarScanner()
+    middle = len(EICAR) // 2
+
+    assert await scanner.scan(iterate(b"x" * 100, EICAR[:middle], EICAR[middle:]))
+    assert await scanner.scan(iterate(b"x" * 100, EICAR[:middle])) is None
+
+
+async def test_inspection_rejects_found_threat():
+    inspection = ContentInspection("text/plain", scanner=EicarScanner())
+    for chunk in (b"clean ", EICAR, b" more"):
+        await inspection.feed(chunk)
+    with pytest.raises(ContentRejected) as e:
+        await inspection.finish()
+    assert e.value.status_code == 422
+
+
+async def test_inspection_does_not_wait_for_scanner():
+    """Test that chunks are queued while the scanner is busy"""
+    release = asyncio.Event()
+
+    class SlowScanner:
+        async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+            await release.wait()
+            async for _ in chunks:
+                pass
+            return None
+
+    inspection = ContentInspection("text/plain", scanner=SlowScanner(), queue_size=4)
+    for _ in range(4):
+        await asyncio.wait_for(inspection.feed(b"chunk"), 1)
+    release.set()
+    await inspection.feed(b"chunk")
+    await inspection.finish()
+
+
+async def test_inspection_fails_when_scanner_dies():
+    """Test that a full queue does not hang the upload once the scanner failed"""
+
+    class FailingScanner:
+        async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+            async for _ in chunks:
+                await asyncio.sleep(0.01)
+                raise ConnectionResetError("clamd went away")
+            return None
+
+    inspection = ContentInspection("text/plain", scanner=FailingScanner(), queue_size=1)
+    with pytest.raises(ContentRejected) as e:
+        for _ in range(10):
+            await asyncio.wait_for(inspection.feed(b"chunk"), 1)
+    assert e.value.status_code == 503
+
+
+async def test_inspection_times_out_stuck_scanner():
+    """Test that a scanner which stops reading fails the upload after the timeout"""
+
+    class StuckScanner:
+        async def scan(self, chunks: AsyncIterator[bytes]) -> str | None:
+            await asyncio.Event().wait()
+            return None
+
+    inspection = ContentInspection(
+        "text/plain", scanner=StuckScanner(), queue_size=1, timeout=0.05
+    )
+    with pytest.raises(ContentRejected) as e:
+        for _ in range(10):
+            await asyncio.wait_for(inspection.feed(b"chunk"), 1)
+    assert e.value.status_code == 503
+    await inspection.cancel()
+
+
+async def test_clamd_scanner():
+    """Test the INSTREAM exchange against a fake clamd"""
+    received: list[bytes] = []
+
+    async def clamd(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        assert await reader.readexactly(10) == b"zINSTREAM\x00"
+        data = b""
+        while size := int.from_bytes(await reader.readexactly(4), "big"):
+            data += await reader.readexactly(size)
+        received.append(data)
+        reply = b"stream: Eicar-Signature FOUND" if EICAR in data else b"stream: OK"
+        writer.write(reply + b"\x00")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(clamd, "127.0.0.1", 0)
+    scanner = ClamdScanner("127.0.0.1", server.sockets[0].getsockname()[1])
+    async with server:
+        assert await scanner.scan(iterate(b"a" * 100_000, b"b")) is None
+        assert await scanner.scan(iterate(EICAR)) == "Eicar-Signature"
+    assert received == [b"a" * 100_000 + b"b", EICAR]
@@ -0,0 +1,45 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entities.outbox import OutboxEntity
+from src.repositories.outbox import OutboxRepository
+from src.services.outbox import OutboxService
+
+
+@pytest.fixture(autouse=True)
+async def outbox(db: AsyncSession):
+    """Fill the outbox with three events"""
+    await db.execute(delete(OutboxEntity))
+    for i in range(3):
+        OutboxRepository.add(db, "task", {"n": i})
+    await db.commit()
+
+
+async def test_relay_sends_and_deletes(db: AsyncSession):
+    """Test that relayed events are sent in order and removed"""
+    sent: list[tuple[str, dict[str, Any]]] = []
+
+    relayed = await OutboxService().relay(
+        db, lambda task, kwargs: sent.append((task, kwargs)), batch_size=2
+    )
+    assert relayed == 2
+    assert sent == [("task", {"n": 0}), ("task", {"n": 1})]
+
+    assert await OutboxService().relay(db, lambda *args: None) == 1
+    assert await OutboxService().relay(db, lambda *args: None) == 0
+
+
+async def test_relay_keeps_events_when_broker_fails(db: AsyncSession):
+    """Test that events stay in the outbox if sending fails"""
+
+    def send(task: str, kwargs: dict[str, Any]) -> None:
+        raise ConnectionError("broker is down")
+
+    with pytest.raises(ConnectionError):
+        await OutboxService().relay(db, send)
+    await db.rollback()
+
+    assert len(await OutboxRepository.get_batch(db)) == 3
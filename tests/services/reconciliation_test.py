@@ -0,0 +1,134 @@
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entities.file_meta import FileMetaEntity
+from src.repositories.reconciliation import ReconciliationRepository
+from src.services.reconciliation import ReconciliationService
+from src.storage import ObjectNotFound
+from src.storage.local import LocalStorage
+
+OLD = datetime.now(timezone.utc) - timedelta(days=2)
+MIN_AGE = timedelta(hours=1)
+
+
+async def put_object(storage: LocalStorage, key: str, old: bool = True) -> None:
+    upload_id = await storage.create_multipart_upload(key)
+    part = await storage.upload_part(key, upload_id, 1, b"data")
+    await storage.complete_multipart_upload(key, upload_id, [part])
+    if old:
+        os.utime(storage.root / key, (OLD.timestamp(), OLD.timestamp()))
+
+
+async def add_file(db: AsyncSession, key: str) -> FileMetaEntity:
+    obj = FileMetaEntity(
+        internal_id=key, owner_id=uuid4(), title=key, size=4, created_at=OLD
+    )
+    db.add(obj)
+    await db.commit()
+    return obj
+
+
+@pytest.fixture
+async def layout(db: AsyncSession, storage: LocalStorage):
+    """
+    Objects `a` and `c` with metadata, an orphan `b`, a fresh orphan `d`
+    and metadata of `e` without an object.
+    """
+    prefix = uuid4().hex
+    keys = {name: f"{prefix}-{name}" for name in "abcde"}
+    for name in "abc":
+        await put_object(storage, keys[name])
+    await put_object(storage, keys["d"], old=False)
+    for name in "ace":
+        keys[f"{name}_id"] = str((await add_file(db, keys[name])).id)
+    yield keys
+
+    await db.rollback()
+    await db.execute(
+        delete(FileMetaEntity).where(FileMetaEntity.internal_id.startswith(prefix))
+    )
+    await db.commit()
+
+
+async def reconcile(db, storage, delete=False, batch_size=1000):
+    return await ReconciliationService().reconcile(
+        db,
+        storage,
+        min_age=MIN_AGE,
+        stale_upload_age=MIN_AGE,
+        delete=delete,
+        batch_size=batch_size,
+    )
+
+
+async def test_report_only(db: AsyncSession, storage: LocalStorage, layout):
+    """Test that differences are reported without changing anything"""
+    report = await reconcile(db, storage)
+
+    assert report.objects == 4
+    assert report.orphan_objects == 1
+    assert report.missing_objects == 1
+    assert (await storage.head(layout["b"])).size == 4
+    missing = await db.get(FileMetaEntity, UUID(layout["e_id"]))
+    assert missing is not None and missing.deleted_at is None
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+async def test_delete(db: AsyncSession, storage: LocalStorage, layout, batch_size):
+    """Test that orphans are deleted and lost files are marked as purged"""
+    report = await reconcile(db, storage, delete=True, batch_size=batch_size)
+
+    assert (report.orphan_objects, report.missing_objects) == (1, 1)
+    with pytest.raises(ObjectNotFound):
+        await storage.head(layout["b"])
+    for name in "acd":
+        await storage.head(layout[name])
+
+    db.expire_all()
+    missing = await db.get(FileMetaEntity, UUID(layout["e_id"]))
+    assert missing is not None
+    assert missing.is_deleted is True and missing.deleted_at is not None
+
+
+async def test_object_in_other_tier_is_not_missing(
+    db: AsyncSession, storage: LocalStorage, layout
+):
+    """Test that an object found in the other tier is not reported as missing"""
+    await put_object(storage, layout["e"])
+    await storage.move(layout["e"], "hot", "cold")
+
+    report = await reconcile(db, storage)
+
+    assert report.missing_objects == 0
+
+
+async def test_resume_from_checkpoint(db: AsyncSession, storage: LocalStorage, layout):
+    """Test that a pass resumes after the saved key and clears the checkpoint"""
+    await ReconciliationRepository.save_checkpoint(db, "hot", layout["b"])
+
+    report = await reconcile(db, storage)
+
+    assert report.objects == 2
+    assert report.orphan_objects == 0
+    assert report.missing_objects == 1
+    assert await ReconciliationRepository.get_checkpoint(db, "hot") is None
+
+
+async def test_stale_uploads(db: AsyncSession, storage: LocalStorage):
+    """Test that only abandoned multipart uploads are aborted"""
+    stale = await storage.create_multipart_upload("stale.txt")
+    os.utime(
+        storage.root / ".uploads" / stale / "key", (OLD.timestamp(), OLD.timestamp())
+    )
+    fresh = await storage.create_multipart_upload("fresh.txt")
+
+    report = await reconcile(db, storage, delete=True)
+
+    assert report.stale_uploads == 1
+    uploads = [upload.upload_id async for upload in storage.list_multipart_uploads()]
+    assert uploads == [fresh]
@@ -0,0 +1,271 @@
+import asyncio
+
+import pytest
+
+from src.storage import COLD, HOT, ChecksumMismatch, ObjectNotFound, StorageBackend
+from src.storage.checksum import new_hasher, to_base64
+
+from .conftest import CHUNK_SIZE, COPY_PART_SIZE
+
+
+async def put(storage: StorageBackend, key: str, *chunks: bytes) -> None:
+    upload_id = await storage.create_multipart_upload(key, "text/plain")
+    parts = [
+        await storage.upload_part(key, upload_id, number, chunk)
+        for number, chunk in enumerate(chunks, start=1)
+    ]
+    await storage.complete_multipart_upload(key, upload_id, parts)
+
+
+async def read_all(storage: StorageBackend, key: str, **kwargs) -> bytes:
+    return b"".join([chunk async for chunk in storage.read(key, **kwargs)])
+
+
+async def test_multipart_write_and_read(storage: StorageBackend):
+    """Test that parts are assembled in order"""
+    await put(storage, "object.txt", b"a" * 3000, b"b" * 3000, b"c" * 10)
+
+    data = await read_all(storage, "object.txt")
+    assert data == b"a" * 3000 + b"b" * 3000 + b"c" * 10
+
+
+async def test_read_is_chunked(storage: StorageBackend):
+    """Test that reads yield chunks of at most chunk_size bytes"""
+    await put(storage, "object.txt", b"x" * (CHUNK_SIZE * 3 + 1))
+
+    chunks = [chunk async for chunk in storage.read("object.txt")]
+    assert all(len(chunk) <= CHUNK_SIZE for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == CHUNK_SIZE * 3 + 1
+
+
+@pytest.mark.parametrize(
+    "offset,length,expected",
+    [(0, 4, b"0123"), (6, None, b"6789"), (8, 10, b"89"), (3, 0, b"")],
+)
+async def test_ranged_read(storage: StorageBackend, offset, length, expected):
+    """Test reading a byte range of an object"""
+    await put(storage, "object.txt", b"0123456789")
+
+    data = await read_all(storage, "object.txt", offset=offset, length=length)
+    assert data == expected
+
+
+@pytest.mark.parametrize(
+    "size,part_size,window",
+    [(10, 4, 2), (CHUNK_SIZE * 5 + 3, CHUNK_SIZE, 3), (CHUNK_SIZE * 2, CHUNK_SIZE, 8)],
+)
+async def test_read_ahead(storage: StorageBackend, size, part_size, window):
+    """Test that parts read ahead are yielded in order"""
+    data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    await put(storage, "object.txt", data)
+
+    chunks = storage.read_ahead("object.txt", size, part_size, window)
+    assert b"".join([chunk async for chunk in chunks]) == data
+
+
+async def test_read_ahead_close_cancels_reads(storage: StorageBackend):
+    """Test that closing a read ahead early leaves no reads running"""
+    await put(storage, "object.txt", b"x" * (CHUNK_SIZE * 8))
+    tasks = asyncio.all_tasks()
+
+    chunks = storage.read_ahead("object.txt", CHUNK_SIZE * 8, CHUNK_SIZE, 4)
+    assert await anext(chunks)
+    await chunks.aclose()
+
+    assert asyncio.all_tasks() == tasks
+
+
+async def test_head(storage: StorageBackend):
+    """Test object metadata"""
+    await put(storage, "object.txt", b"hello")
+
+    head = await storage.head("object.txt")
+    assert head.size == 5
+    assert head.content_type == "text/plain"
+    assert head.etag
+
+
+async def test_head_not_found(storage: StorageBackend):
+    """Test that a missing object raises ObjectNotFound"""
+    with pytest.raises(ObjectNotFound):
+        await storage.head("missing.txt")
+
+
+async def test_read_not_found(storage: StorageBackend):
+    """Test that reading a missing object raises ObjectNotFound"""
+    with pytest.raises(ObjectNotFound):
+        await read_all(storage, "missing.txt")
+
+
+async def test_abort_leaves_no_object(storage: StorageBackend):
+    """Test that an aborted upload is not visible"""
+    upload_id = await storage.create_multipart_upload("object.txt")
+    await storage.upload_part("object.txt", upload_id, 1, b"data")
+    await storage.abort_multipart_upload("object.txt", upload_id)
+
+    with pytest.raises(ObjectNotFound):
+        await storage.head("object.txt")
+
+
+async def test_overwrite_replaces_object(storage: StorageBackend):
+    """Test that completing an upload replaces the previous object"""
+    await put(storage, "object.txt", b"old content")
+    await put(storage, "object.txt", b"new")
+
+    assert await read_all(storage, "object.txt") == b"new"
+
+
+async def test_delete_many(storage: StorageBackend):
+    """Test batch delete, ignoring missing keys"""
+    await put(storage, "a.txt", b"a")
+    await put(storage, "b.txt", b"b")
+    await put(storage, "c.txt", b"c")
+
+    await storage.delete_many(["a.txt", "b.txt", "missing.txt"])
+
+    for key in ("a.txt", "b.txt"):
+        with pytest.raises(ObjectNotFound):
+            await storage.head(key)
+    assert (await storage.head("c.txt")).size == 1
+
+
+async def test_presign(storage: StorageBackend):
+    """Test that a presigned URL references the object"""
+    await put(storage, "object.txt", b"data")
+
+    url = await storage.presign("object.txt", expires_in=60)
+    assert "object.txt" in url
+
+
+async def test_move_between_tiers(storage: StorageBackend):
+    """Test that a moved object is readable in the target tier"""
+    await put(storage, "object.txt", b"cold data")
+
+    await storage.move("object.txt", HOT, COLD)
+    assert await read_all(storage, "object.txt", tier=COLD) == b"cold data"
+    assert (await storage.head("object.txt", tier=COLD)).size == 9
+
+    await storage.move("object.txt", COLD, HOT)
+    assert await read_all(storage, "object.txt") == b"cold data"
+
+
+async def test_delete_in_tier(storage: StorageBackend):
+    """Test deleting an object from the cold tier"""
+    await put(storage, "object.txt", b"data")
+    await storage.move("object.txt", HOT, COLD)
+
+    await storage.delete_many(["object.txt"], tier=COLD)
+
+    with pytest.raises(ObjectNotFound):
+        await storage.head("object.txt", tier=COLD)
+
+
+async def test_move_not_found(storage: StorageBackend):
+    """Test that moving a missing object raises ObjectNotFound"""
+    with pytest.raises(ObjectNotFound):
+        await storage.move("missing.txt", HOT, COLD)
+
+
+@pytest.mark.parametrize("size", [10, COPY_PART_SIZE, COPY_PART_SIZE * 2 + 1])
+async def test_copy(storage: StorageBackend, size: int):
+    """Test that a copy has the content and type of its source and outlives it"""
+    data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    await put(storage, "source.txt", data)
+
+    await storage.copy("source.txt", "copy.txt")
+    await storage.delete_many(["source.txt"])
+
+    assert await read_all(storage, "copy.txt") == data
+    head = await storage.head("copy.txt")
+    assert head.size == size
+    assert head.content_type == "text/plain"
+    assert [upload async for upload in storage.list_multipart_uploads()] == []
+
+
+async def test_copy_from_cold_tier(storage: StorageBackend):
+    """Test that copies of cold objects are written to the hot tier"""
+    await put(storage, "source.txt", b"cold data")
+    await storage.move("source.txt", HOT, COLD)
+
+    await storage.copy("source.txt", "copy.txt", tier=COLD)
+
+    assert await read_all(storage, "copy.txt") == b"cold data"
+    assert await read_all(storage, "source.txt", tier=COLD) == b"cold data"
+
+
+async def test_copy_not_found(storage: StorageBackend):
+    """Test that copying a missing object raises ObjectNotFound"""
+    with pytest.raises(ObjectNotFound):
+        await storage.copy("missing.txt", "copy.txt")
+
+
+@pytest.mark.parametrize("algorithm", ["md5", "crc32c", "sha256"])
+async def test_part_checksum(storage: StorageBackend, algorithm):
+    """Test that parts are accepted with a matching checksum only"""
+    hasher = new_hasher(algorithm)
+    hasher.update(b"checked data")
+    checksum = to_base64(hasher.digest())
+
+    upload_id = await storage.create_multipart_upload("object.txt", None, algorithm)
+    with pytest.raises(ChecksumMismatch):
+        await storage.upload_part(
+            "object.txt", upload_id, 1, b"corrupted data", algorithm, checksum
+        )
+    part = await storage.upload_part(
+        "object.txt", upload_id, 1, b"checked data", algorithm, checksum
+    )
+    await storage.complete_multipart_upload("object.txt", upload_id, [part])
+
+    assert await read_all(storage, "object.txt") == b"checked data"
+
+
+async def test_list_objects_sorted(storage: StorageBackend, monkeypatch):
+    """Test that listing pages through the keys in ascending order"""
+    monkeypatch.setattr("src.storage.s3._LIST_PAGE_SIZE", 2)
+    monkeypatch.setattr("src.storage.local._LIST_BATCH_SIZE", 2)
+    for key in ["c.txt", "a.txt", "e.txt", "b.txt", "d.txt"]:
+        await put(storage, key, key.encode())
+    upload_id = await storage.create_multipart_upload("f.txt")
+    await storage.upload_part("f.txt", upload_id, 1, b"incomplete")
+
+    objects = [info async for info in storage.list_objects()]
+    assert [info.key for info in objects] == [
+        "a.txt",
+        "b.txt",
+        "c.txt",
+        "d.txt",
+        "e.txt",
+    ]
+    assert objects[0].size == 5
+    assert objects[0].last_modified is not None
+
+    after = [info.key async for info in storage.list_objects(start_after="c.txt")]
+    assert after == ["d.txt", "e.txt"]
+
+
+async def test_list_objects_by_tier_group(storage: StorageBackend):
+    """Test that the tier groups together list every object once"""
+    await put(storage, "hot.txt", b"hot")
+    await put(storage, "cold.txt", b"cold")
+    await storage.move("cold.txt", HOT, COLD)
+
+    keys = [
+        info.key
+        for tiers in storage.tier_groups()
+        async for info in storage.list_objects(tiers[0])
+    ]
+    assert sorted(keys) == ["cold.txt", "hot.txt"]
+
+
+async def test_list_multipart_uploads(storage: StorageBackend):
+    """Test that only unfinished uploads are listed"""
+    await put(storage, "done.txt", b"done")
+    upload_id = await storage.create_multipart_upload("pending.txt")
+    await storage.upload_part("pending.txt", upload_id, 1, b"part")
+
+    uploads = [upload async for upload in storage.list_multipart_uploads()]
+    assert [(u.key, u.upload_id) for u in uploads] == [("pending.txt", upload_id)]
+    assert uploads[0].initiated is not None
+
+    await storage.abort_multipart_upload("pending.txt", upload_id)
+    assert [upload async for upload in storage.list_multipart_uploads()] == []
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pytest
+
+from src.storage import StorageBackend
+from src.storage.local import LocalStorage
+from src.storage.s3 import S3Storage
+from tests.s3_stub import InMemoryS3Client
+
+CHUNK_SIZE = 1024
+# Objects larger than this are copied by S3 in parallel parts
+COPY_PART_SIZE = 4 * CHUNK_SIZE
+
+
+@pytest.fixture(params=["local", "s3", "s3_storage_class"])
+def storage(request, tmp_path: Path) -> StorageBackend:
+    """Every storage engine, so that each test runs against all of them."""
+    if request.param == "local":
+        return LocalStorage(tmp_path, chunk_size=CHUNK_SIZE)
+    if request.param == "s3":
+        return S3Storage(
+            InMemoryS3Client(),
+            "test_bucket",
+            chunk_size=CHUNK_SIZE,
+            cold_bucket_name="cold_bucket",
+            copy_part_size=COPY_PART_SIZE,
+        )
+    return S3Storage(
+        InMemoryS3Client(),
+        "test_bucket",
+        chunk_size=CHUNK_SIZE,
+        copy_part_size=COPY_PART_SIZE,
+    )
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta, timezone
+
+from src.utils import uuid7, uuid7_time
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_uuid7_time():
+    timestamp = datetime(2024, 5, 17, 12, 30, 15, 123000, tzinfo=timezone.utc)
+
+    assert uuid7_time(uuid7(timestamp)) == timestamp
+    assert abs(uuid7_time(uuid7()) - datetime.now(timezone.utc)) < timedelta(seconds=1)
+
+
+def test_uuid7_sorts_by_time():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = [uuid7(start + timedelta(milliseconds=i)) for i in range(100)]
+
+    assert sorted(values) == values
+    assert len(set(uuid7(start) for _ in range(100))) == 100